@@ -0,0 +1,109 @@
+"""Minimal in-process ASGI driver for the benchmarks.
+
+Unlike the httpx/Starlette test clients it records when every body chunk
+leaves the app, so time-to-first-byte of a streaming response can be
+measured without a network socket.
+"""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Response:
+    __slots__ = ("status", "headers", "chunks", "started", "first_byte", "finished")
+
+    def __init__(self, started: float):
+        self.status = 0
+        self.headers: Dict[str, str] = {}
+        self.chunks: List[Tuple[float, bytes]] = []
+        self.started = started
+        self.first_byte: Optional[float] = None
+        self.finished = started
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(chunk for _, chunk in self.chunks)
+
+    @property
+    def ttfb(self) -> float:
+        return (self.first_byte or self.finished) - self.started
+
+    @property
+    def ttfc(self) -> float:
+        """Time to the first SSE event whose delta carries content. The role
+        event goes out before the crew starts, so ``ttfb`` never shows it."""
+        buffer = b""
+        for at, chunk in self.chunks:
+            buffer += chunk
+            *events, buffer = buffer.split(b"\n\n")
+            for event in events:
+                if event.startswith(b"data: {"):
+                    choices = json.loads(event[6:]).get("choices") or [{}]
+                    if choices[0].get("delta", {}).get("content"):
+                        return at - self.started
+        return self.elapsed
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished - self.started
+
+
+async def request(app, method: str, path: str, body: Any = None) -> Response:
+    payload = b"" if body is None else json.dumps(body).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+        "headers": [(b"host", b"testserver"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode())],
+    }
+    response = Response(time.perf_counter())
+    sent = False
+    disconnect = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response.status = message["status"]
+            response.headers = {k.decode(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk:
+                now = time.perf_counter()
+                if response.first_byte is None:
+                    response.first_byte = now
+                response.chunks.append((now, chunk))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnect.set()
+    response.finished = time.perf_counter()
+    return response
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Run the app's startup and shutdown around a block."""
+    messages: asyncio.Queue = asyncio.Queue()
+    replies: asyncio.Queue = asyncio.Queue()
+    await messages.put({"type": "lifespan.startup"})
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}},
+                                    messages.get, replies.put))
+    await replies.get()
+    try:
+        yield app
+    finally:
+        await messages.put({"type": "lifespan.shutdown"})
+        await replies.get()
+        await task
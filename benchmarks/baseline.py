@@ -0,0 +1,57 @@
+"""JSON baselines for benchmark results and regression checks.
+
+Results are ``{scenario: {metric: value}}``. Metrics listed in
+``HIGHER_IS_BETTER`` regress when they drop, and ``COUNTS`` (errors)
+regress on any increase, from zero too; every other metric regresses when
+it grows by more than the tolerance.
+"""
+import json
+import platform
+import time
+from typing import Dict, List
+
+# "requests" is how many requests succeeded
+HIGHER_IS_BETTER = {"throughput_rps", "hit_ratio", "requests"}
+COUNTS = {"errors"}
+
+Results = Dict[str, Dict[str, float]]
+
+
+def save(path: str, results: Results, **meta):
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "meta": meta,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(document, handle, indent=2, sort_keys=True)
+
+
+def load(path: str) -> Results:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)["results"]
+
+
+def compare(current: Results, baseline: Results, tolerance: float = 0.1) -> List[str]:
+    """Human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    for scenario, metrics in sorted(baseline.items()):
+        for metric, before in sorted(metrics.items()):
+            after = current.get(scenario, {}).get(metric)
+            if after is None:
+                continue
+            if metric in COUNTS:
+                if after > before:
+                    regressions.append(f"{scenario}.{metric}: {before:.4g} -> {after:.4g}")
+                continue
+            if not before:
+                continue
+            change = (after - before) / before
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > tolerance:
+                regressions.append(
+                    f"{scenario}.{metric}: {before:.4g} -> {after:.4g} ({change:+.1%})"
+                )
+    return regressions
@@ -0,0 +1,170 @@
+"""Crew overhead of the three apps, run end to end against the stand-in.
+
+Starts ``standin.py`` in this process, then runs each app in its own
+subprocess with its OpenAI, Serper and browserless endpoints pointed at
+the stand-in and its caches and stores in a fresh temporary directory:
+
+    surprise  SurpriseTravelCrew().crew().kickoff(...)
+    trip      TripCrew(...).run()
+    book      BookFlow().kickoff()
+
+For each app it reports wall time, LLM calls, prompt and completion
+tokens, tool calls (searches, browserless and page reads) and the
+subprocess's peak RSS. With ``--latency 0`` (the default) and synthetic
+answers, wall time is the apps' own orchestration cost. ``--save`` writes
+a JSON baseline and ``--compare`` exits non-zero when a metric regresses
+past ``--tolerance``.
+
+    python benchmarks/bench_apps.py
+    python benchmarks/bench_apps.py --mode record --cassette benchmarks/cassettes/{app}.jsonl
+    python benchmarks/bench_apps.py --mode replay --cassette benchmarks/cassettes/{app}.jsonl
+    python benchmarks/bench_apps.py --save benchmarks/baseline-apps.json
+    python benchmarks/bench_apps.py --compare benchmarks/baseline-apps.json
+
+Recording needs the real ``OPENAI_API_KEY``, ``SERPER_API_KEY`` and
+``BROWSERLESS_API_KEY`` in the environment; ``{app}`` in the cassette path
+gives each app its own file.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS)
+sys.path.insert(0, BENCHMARKS)
+
+import baseline  # noqa: E402
+import standin  # noqa: E402
+
+APPS = ("surprise", "trip", "book")
+SOURCES = {
+    "surprise": os.path.join(ROOT, "surprise_trip", "src"),
+    "trip": os.path.join(ROOT, "trip_planner"),
+    "book": os.path.join(ROOT, "write_a_book_with_flows", "src"),
+}
+
+
+def run_app(app: str):
+    """Child process: run one app once."""
+    sys.path.insert(0, SOURCES[app])
+    if app == "surprise":
+        from surprise_travel.batch import crew_inputs
+        from surprise_travel.crew import SurpriseTravelCrew
+
+        result = SurpriseTravelCrew().crew().kickoff(inputs=crew_inputs({
+            "origin": "Boston", "destination": "Lisbon", "age": 34, "dates": "May 3-10",
+            "duration": "7 days", "hotel_style": "boutique"}))
+        assert result.json_dict, result.raw
+    elif app == "trip":
+        from main import TripCrew
+
+        TripCrew("Boston", "Lisbon, Porto", "May 3-10", "food, history").run()
+    else:
+        from write_a_book_with_flows.main import BookFlow
+
+        flow = BookFlow()
+        flow.kickoff()
+        assert flow.state.book, "no chapters written"
+
+
+def child_env(base: str, real_keys: bool) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_BASE": f"{base}/v1",
+        "OPENAI_BASE_URL": f"{base}/v1",
+        "SERPER_BASE_URL": base,
+        "BROWSERLESS_URL": base,
+        "OTEL_SDK_DISABLED": "true",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "TRAVEL_SEARCH_CACHE_MODE": "off",
+        "PYTHONUNBUFFERED": "1",
+    })
+    if not real_keys:
+        for key in ("OPENAI_API_KEY", "SERPER_API_KEY", "BROWSERLESS_API_KEY"):
+            env[key] = "standin"
+    return env
+
+
+def measure(app: str, server: "standin.StandIn", real_keys: bool, timeout: float = 600) -> dict:
+    server.reset()
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "output.log")
+        with open(log_path, "w", encoding="utf-8") as log:
+            started = time.perf_counter()
+            child = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--run", app],
+                cwd=directory, env=child_env(server.base, real_keys),
+                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            )
+            # crewai waits forever on an async task that raised, so a run has a deadline
+            deadline = threading.Timer(timeout, child.kill)
+            deadline.start()
+            _, status, usage = os.wait4(child.pid, 0)
+            elapsed = time.perf_counter() - started
+            deadline.cancel()
+            child.returncode = os.waitstatus_to_exitcode(status)
+        if child.returncode:
+            with open(log_path, encoding="utf-8", errors="replace") as log:
+                tail = log.read()[-3000:]
+            raise SystemExit(f"{app} failed with exit code {child.returncode}:\n{tail}")
+    stats = server.stats()
+    return {
+        "wall_s": round(elapsed, 3),
+        "llm_calls": stats["llm_calls"],
+        "prompt_tokens": stats["prompt_tokens"],
+        "completion_tokens": stats["completion_tokens"],
+        "tool_calls": stats["tool_calls"],
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "misses": stats["misses"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    standin.add_arguments(parser)
+    parser.add_argument("--apps", default=",".join(APPS), help="comma-separated subset of " + ", ".join(APPS))
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before an app run is killed")
+    parser.add_argument("--run", choices=APPS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        return run_app(args.run)
+
+    results = {}
+    print(f"{'app':<10}{'wall s':>8}{'LLM calls':>11}{'prompt tok':>12}{'compl tok':>11}"
+          f"{'tool calls':>12}{'peak RSS MB':>13}")
+    for app in args.apps.split(","):
+        cassette = args.cassette.format(app=app) if args.cassette else None
+        server = standin.StandIn(
+            standin.backend_for(args.mode, cassette, tool_calls=args.tool_calls),
+            args.latency, args.tokens_per_second, args.tool_latency, args.replay_timing,
+        ).start()
+        try:
+            result = measure(app, server, args.mode == "record", args.timeout)
+        finally:
+            server.stop()
+        if result.pop("misses"):
+            print(f"warning: {app} made requests that are not in {cassette}", file=sys.stderr)
+        results[app] = result
+        print(f"{app:<10}{result['wall_s']:>8.2f}{result['llm_calls']:>11}{result['prompt_tokens']:>12}"
+              f"{result['completion_tokens']:>11}{result['tool_calls']:>12}{result['peak_rss_mb']:>13.1f}")
+
+    if args.save:
+        baseline.save(args.save, results, mode=args.mode, latency=args.latency)
+        print(f"saved {args.save}")
+    if args.compare:
+        regressions = baseline.compare(results, baseline.load(args.compare), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Batch trip planning throughput at different concurrencies.
+
+Runs ``surprise_travel.batch.run_batch`` over generated profiles with the
+stub LLM and reports profiles per second and CPU seconds per profile at
+each concurrency. It then fails a few profiles, reruns the batch against the
+same output, and checks that only the failures run again.
+
+    python benchmarks/bench_batch.py [profiles] [latency]
+"""
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "surprise_trip", "src"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("SERPER_API_KEY", "offline")
+
+from stub_llm import StubLLM  # noqa: E402
+from surprise_travel.batch import completed_ids, default_crew, read_profiles, run_batch  # noqa: E402
+
+CITIES = ["Lisbon", "Tokyo", "Oaxaca", "Tbilisi", "Hanoi", "Porto", "Kyoto", "Seville"]
+
+
+def profiles(count: int, broken: int = 0):
+    """``count`` profiles; every ``broken``-th one has no dates and fails."""
+    for number in range(count):
+        yield {"id": f"p{number}", "origin": "Boston", "destination": CITIES[number % len(CITIES)],
+               "age": 30 + number % 20, "duration": "3 days", "hotel_style": "boutique",
+               "dates": "" if broken and number % broken == 0 else "June 1-4"}
+
+
+def stub_crew(latency: float):
+    def make_crew(seeded=False):
+        crew = default_crew(seeded)
+        for agent in crew.agents:
+            agent.llm = StubLLM(latency)
+        return crew
+    return make_crew
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    default_crew()  # build the template before timing
+    for concurrency in (1, 4, 8):
+        out = io.StringIO()
+        wall, cpu = time.perf_counter(), time.process_time()
+        counts = run_batch(profiles(count), out, concurrency, make_crew=stub_crew(latency), progress=None)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        assert counts["ok"] == count, counts
+        print(f"concurrency {concurrency}: {count / wall:6.2f} profiles/s "
+              f"{cpu / count * 1000:7.1f} ms CPU/profile")
+
+    path = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"bench_batch_{os.getpid()}.jsonl")
+    try:
+        with open(path, "w") as out:
+            first = run_batch(profiles(count, broken=3), out, 4, make_crew=stub_crew(latency), progress=None)
+        with open(path, "a") as out:
+            second = run_batch(profiles(count), out, 4, skip=completed_ids(path),
+                               make_crew=stub_crew(latency), progress=None)
+        with open(path) as written:
+            assert len(completed_ids(path)) == count and len(list(read_profiles(written))) == count + first["error"]
+        print(f"resume: first run {first}, second run {second}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
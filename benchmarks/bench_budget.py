@@ -0,0 +1,133 @@
+"""A 7-day trip budget: one expression per tool call versus ``calculate_budget``.
+
+Builds the budget the travel concierge writes (lodging, food, transport,
+activities for two travelers, a foreign currency, three what-if
+scenarios) two ways:
+
+- ``calculate``: every figure is its own ``CalculatorTools.calculate``
+  call, the way the agent had to: each line item, each day, each
+  category, the totals, and every scenario's items and total again. Run
+  once re-parsing every expression (the old behaviour) and once with the
+  parsed-expression cache warm;
+- ``calculate_budget``: one call with the line items and scenarios.
+
+Reports tool calls (each is an LLM round trip for the agent), CPU time
+per budget, and the wall time per budget once each round trip costs
+``--round-trip`` seconds.
+
+    python benchmarks/bench_budget.py [--repeat 200 --round-trip 2]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "trip_planner"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from tools.calculator_tools import CalculatorTools, parse_expression  # noqa: E402
+
+DAYS, NIGHTS, TRAVELERS, EUR = 7, 6, 2, 1.08
+ITEMS = [
+    {"name": "Hotel", "category": "Lodging", "amount": 120, "per": "night", "currency": "EUR"},
+    {"name": "City tax", "category": "Lodging", "amount": 2, "per": "person night", "currency": "EUR"},
+    {"name": "Breakfast", "category": "Food", "amount": 12, "per": "person day", "currency": "EUR"},
+    {"name": "Lunch and dinner", "category": "Food", "amount": "18+32", "per": "person day", "currency": "EUR"},
+    {"name": "Flights", "category": "Transport", "amount": 420, "per": "person"},
+    {"name": "Transit pass", "category": "Transport", "amount": 6.6, "per": "person day", "currency": "EUR"},
+    {"name": "Airport taxi", "category": "Transport", "amount": 35, "per": "one-off", "currency": "EUR", "day": 7},
+    {"name": "Museum pass", "category": "Activities", "amount": "3*15", "per": "person", "currency": "EUR",
+     "day": 3},
+    {"name": "Fado night", "category": "Activities", "amount": 40, "per": "person", "currency": "EUR", "day": 5},
+    {"name": "Sintra day trip", "category": "Activities", "amount": 65, "per": "person", "currency": "EUR",
+     "day": 4},
+    {"name": "Travel insurance", "category": "Other", "amount": 48, "per": "person"},
+]
+SCENARIOS = [
+    {"name": "3 travelers", "travelers": 3},
+    {"name": "luxury hotel", "scale": {"Lodging": 2.5}},
+    {"name": "weak dollar", "rates": {"EUR": 1.2}},
+]
+
+
+def item_expression(item, nights=NIGHTS, days=DAYS, travelers=TRAVELERS, rate=EUR, scale=1):
+    factors = [f"({item['amount']})"]
+    per = item["per"]
+    factors += [str(nights)] if "night" in per else []
+    factors += [str(days)] if "day" in per else []
+    factors += [str(travelers)] if "person" in per else []
+    factors += [str(rate)] if item.get("currency") == "EUR" else []
+    factors += [str(scale)] if scale != 1 else []
+    return "*".join(factors)
+
+
+def expressions():
+    """The calculations of the budget, one per tool call."""
+    calls = [item_expression(item) for item in ITEMS]
+    for day in range(1, DAYS + 1):
+        terms = []
+        for item in ITEMS:
+            daily = item_expression(item, nights=1, days=1)
+            if "night" in item["per"] and day <= NIGHTS or "day" in item["per"]:
+                terms.append(daily)
+            elif "night" not in item["per"] and "day" not in item["per"] and item.get("day", 1) == day:
+                terms.append(daily)
+        calls.append("+".join(terms))
+    for category in dict.fromkeys(item["category"] for item in ITEMS):
+        calls.append("+".join(item_expression(item) for item in ITEMS if item["category"] == category))
+    total = "+".join(item_expression(item) for item in ITEMS)
+    calls += [total, f"({total})/{TRAVELERS}"]
+    for scenario in SCENARIOS:
+        scenario_items = [item_expression(item, travelers=scenario.get("travelers", TRAVELERS),
+                                          rate=scenario.get("rates", {}).get("EUR", EUR),
+                                          scale=scenario.get("scale", {}).get(item["category"], 1))
+                          for item in ITEMS]
+        calls += scenario_items + ["+".join(scenario_items)]
+    return calls
+
+
+def per_budget(run, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        run()
+    return (time.process_time() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--round-trip", type=float, default=2.0, help="seconds per LLM tool iteration")
+    args = parser.parse_args()
+    calculate = CalculatorTools.calculate.func
+    budget = CalculatorTools.calculate_budget.func
+    calls = expressions()
+
+    def cold():
+        for expression in calls:
+            parse_expression.cache_clear()
+            calculate(expression)
+
+    def warm():
+        for expression in calls:
+            calculate(expression)
+
+    def engine():
+        return budget(ITEMS, DAYS, TRAVELERS, NIGHTS, "USD", {"EUR": EUR}, SCENARIOS)
+
+    assert not engine().startswith("Error"), engine()
+    total = calculate("+".join(item_expression(item) for item in ITEMS))
+    assert f"Total: {total:,.2f}" in engine(), (total, engine().splitlines()[0])
+
+    print(f"{DAYS}-day budget, {len(ITEMS)} line items, {len(SCENARIOS)} scenarios;"
+          f" {args.round_trip:g}s per LLM round trip")
+    print(f"{'path':<28}{'tool calls':>11}{'CPU ms':>10}{'wall s':>10}")
+    for label, run, count in (("calculate, re-parsing", cold, len(calls)),
+                              ("calculate, cached parse", warm, len(calls)),
+                              ("calculate_budget", engine, 1)):
+        cpu = per_budget(run, args.repeat)
+        print(f"{label:<28}{count:>11}{cpu * 1000:>10.3f}{count * args.round_trip + cpu:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
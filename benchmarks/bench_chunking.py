@@ -0,0 +1,108 @@
+"""Chunks and tokens per scraped page, before and after ``tools.chunking``.
+
+For every page of a corpus, compares what the summarizer used to get (all
+elements joined and cut every 8000 characters) with ``Chunker.chunks``.
+Reports chunks (one LLM call each) and estimated tokens per page, the
+reduction, and the chunker's cost per page.
+
+The corpus is saved HTML pages, one site per directory, given on the
+command line and turned into elements with ``tools.html_text``. Without
+arguments it generates ``sites`` travel sites of ``pages`` articles each,
+shaped like extracted elements: navigation and related-article
+lists, a cookie banner, a newsletter box and a footer on every page, a
+header, and an article body that is sometimes printed twice (page plus
+print view).
+
+    python benchmarks/bench_chunking.py [--sites 8 --pages 25] [site_dir ...]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "trip_planner"))
+
+from tools.chunking import Chunker, tokens  # noqa: E402
+from tools.html_text import html_elements  # noqa: E402
+
+PLACES = ["Alfama", "the Baixa", "Belém", "the riverfront", "the old market", "the castle", "the cathedral",
+          "the botanical garden", "the harbour", "the hilltop viewpoint"]
+SENTENCES = [
+    "Start early at {place}, before the tour groups arrive.",
+    "A day ticket covers the trams, the funiculars and the ferry to {place}.",
+    "The best pastries are at a small bakery two streets behind {place}.",
+    "Most museums near {place} close on Mondays, so plan around it.",
+    "In summer the walk up to {place} is hot; take water and go after five.",
+    "Dinner is late here: few restaurants around {place} fill up before nine.",
+    "Tickets for {place} are cheaper online and skip the queue.",
+    "The view from {place} at sunset is worth the climb.",
+]
+BOILERPLATE = [
+    ("NarrativeText", "We use cookies to improve your experience, personalise content and analyse our traffic. "
+                      "By continuing to browse you accept our use of cookies. Manage your preferences."),
+    ("NarrativeText", "Sign up for our weekly newsletter and get the best travel deals, guides and inspiration "
+                      "straight to your inbox. No spam, unsubscribe at any time."),
+    ("Footer", "© 2024 Travel Guides Ltd. All rights reserved. Privacy policy · Terms · Contact"),
+]
+
+
+def generated_site(rng: random.Random, site: int, pages: int):
+    nav = [("ListItem", item) for item in ("Home", "Destinations", "Hotels", "Flights", "Deals", "Sign in")]
+    related = [("ListItem", f"The {n} best things to do in city {site} this year") for n in (10, 15, 25)]
+    for page in range(pages):
+        body = []
+        for _ in range(rng.randint(8, 30)):
+            body.append(("NarrativeText", " ".join(
+                rng.choice(SENTENCES).format(place=rng.choice(PLACES)) + f" ({site}-{page}-{len(body)})"
+                for _ in range(rng.randint(3, 7)))))
+        elements = [("Header", f"Travel Guides · city {site}"), *nav, ("Title", f"Guide {page} to city {site}"),
+                    *body, *related, *BOILERPLATE]
+        if rng.random() < 0.2:
+            elements += [("Title", "Print this guide"), *body]
+        yield f"https://guides-{site}.example.com/city/{page}", elements
+
+
+def saved_site(directory: str):
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as page:
+            elements = list(html_elements([page.read()]))
+        yield f"https://{os.path.basename(directory)}/{name}", elements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=25)
+    parser.add_argument("directories", nargs="*", help="saved HTML pages, one directory per site")
+    args = parser.parse_args()
+    rng = random.Random(5)
+    if args.directories:
+        corpus = [page for directory in args.directories for page in saved_site(directory)]
+    else:
+        corpus = [page for site in range(args.sites) for page in generated_site(rng, site, args.pages)]
+
+    chunker = Chunker()
+    before = [0, 0]
+    after = [0, 0]
+    spent = 0.0
+    for url, elements in corpus:
+        text = "\n\n".join(text for _, text in elements)
+        before[0] += len(range(0, len(text), 8000))
+        before[1] += tokens(text)
+        started = time.perf_counter()
+        chunks = list(chunker.chunks(url, elements))
+        spent += time.perf_counter() - started
+        after[0] += len(chunks)
+        after[1] += sum(tokens(chunk) for chunk in chunks)
+    pages = len(corpus)
+    print(f"{pages} pages")
+    print(f"8000-char slices: {before[0] / pages:5.2f} chunks/page {before[1] / pages:8.0f} tokens/page")
+    print(f"chunker:          {after[0] / pages:5.2f} chunks/page {after[1] / pages:8.0f} tokens/page"
+          f"  ({spent / pages * 1000:.2f} ms/page)")
+    print(f"reduction:        {1 - after[0] / before[0]:5.0%} LLM calls       {1 - after[1] / before[1]:5.0%} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Wall time of one SurpriseTravelCrew run with a stub LLM.
+
+Runs the real crew offline (see ``stub_llm.py``) twice: once with every
+task forced to run one after another, and once with the dependency graph
+declared in ``tasks.yaml``, where the two research tasks run concurrently
+and the itinerary compiler waits for both. Each task makes one LLM call,
+so the second run should be about one call's latency faster.
+
+    python benchmarks/bench_crew_concurrency.py [latency-per-llm-call]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "surprise_trip", "src"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("SERPER_API_KEY", "offline")
+
+from stub_llm import StubLLM  # noqa: E402
+from surprise_travel.crew import SurpriseTravelCrew  # noqa: E402
+from travel_api.crew_runner import crew_inputs  # noqa: E402
+
+DETAILS = {
+    "origin": "Boston", "destination": "Lisbon", "age": "31", "interests": "food, history",
+    "budget": "$2500", "duration": "3 days", "hotel_preference": "boutique",
+}
+
+
+def run(latency: float, sequential: bool) -> float:
+    crew = SurpriseTravelCrew().crew()
+    crew.verbose = False
+    llm = StubLLM(latency)
+    for agent in crew.agents:
+        agent.llm = llm
+        agent.verbose = False
+    if sequential:
+        for task in crew.tasks:
+            task.async_execution = False
+    started = time.perf_counter()
+    result = crew.kickoff(inputs=crew_inputs(DETAILS))
+    elapsed = time.perf_counter() - started
+    assert result.json_dict and result.json_dict["day_plans"], result.raw
+    return elapsed
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    sequential = run(latency, sequential=True)
+    graph = run(latency, sequential=False)
+    print(f"LLM latency per call:         {latency:6.2f} s")
+    print(f"all tasks sequential:         {sequential:6.2f} s")
+    print(f"declared graph (concurrent):  {graph:6.2f} s")
+    print(f"saved:                        {sequential - graph:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
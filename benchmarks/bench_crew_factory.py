@@ -0,0 +1,75 @@
+"""Per-request crew setup: building SurpriseTravelCrew vs copying a template.
+
+Times ``SurpriseTravelCrew().crew()`` against ``crew_factory().crew()`` and
+measures the memory each allocates (tracemalloc). Then it kicks off two
+factory crews concurrently with the stub LLM for different destinations,
+and checks that neither sees the other's inputs and that the template is
+left untouched.
+
+    python benchmarks/bench_crew_factory.py [crews]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "surprise_trip", "src"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("SERPER_API_KEY", "offline")
+
+from stub_llm import StubLLM  # noqa: E402
+from surprise_travel.crew import SurpriseTravelCrew  # noqa: E402
+from surprise_travel.factory import crew_factory  # noqa: E402
+from travel_api.crew_runner import crew_inputs  # noqa: E402
+
+
+def per_crew(build, count: int):
+    started = time.perf_counter()
+    for _ in range(count):
+        build()
+    elapsed = (time.perf_counter() - started) / count
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def kickoff(destination: str) -> str:
+    crew = crew_factory().crew()
+    crew.verbose = False
+    llm = StubLLM(0.2)
+    for agent in crew.agents:
+        agent.llm = llm
+        agent.verbose = False
+    details = {"origin": "Boston", "destination": destination, "age": "30", "interests": "food",
+               "budget": "$2000", "duration": "3 days", "hotel_preference": "boutique"}
+    crew.kickoff(inputs=crew_inputs(details))
+    return crew.tasks[0].description
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    crew_factory().template  # parse configs before timing
+    SurpriseTravelCrew().crew()
+    for label, build in (("SurpriseTravelCrew().crew()", lambda: SurpriseTravelCrew().crew()),
+                         ("crew_factory().crew()", lambda: crew_factory().crew())):
+        elapsed, peak = per_crew(build, count)
+        print(f"{label:<30} {elapsed * 1000:7.2f} ms/crew {peak / 1024:8.1f} KiB allocated")
+
+    with ThreadPoolExecutor(2) as pool:
+        lisbon, tokyo = pool.map(kickoff, ["Lisbon", "Tokyo"])
+    template = crew_factory().template.tasks[0].description
+    assert "Lisbon" in lisbon and "Tokyo" not in lisbon, lisbon
+    assert "Tokyo" in tokyo and "Lisbon" not in tokyo, tokyo
+    assert "{destination}" in template, template
+    print("concurrent crews isolated, template untouched")
+
+
+if __name__ == "__main__":
+    main()
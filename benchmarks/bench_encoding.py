@@ -0,0 +1,74 @@
+"""Cost of encoding OpenAI-compatible responses.
+
+Compares building the pydantic response models and calling
+``model_dump_json`` (the old path) with ``encoding.completion_json`` for
+a rendered itinerary, and ``json.dumps`` with the compiled string encoder
+for one SSE chunk. Also times a whole non-streaming request served from
+the response cache, so only the request path is left.
+
+    python benchmarks/bench_encoding.py
+"""
+import asyncio
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("TRAVEL_CREW_BACKEND", "stub")
+os.environ.setdefault("TRAVEL_STUB_LATENCY", "0")
+
+from asgi import lifespan, request  # noqa: E402
+from travel_api.crew_runner import stub_itinerary  # noqa: E402
+from travel_api.encoding import completion_json  # noqa: E402
+from travel_api.streaming import ChunkEncoder  # noqa: E402
+from watson_x_api import (  # noqa: E402
+    app, ChatCompletionChoice, ChatCompletionResponse, ChatMessage, generate_travel_response, legacy_details,
+)
+
+N = 20_000
+DETAILS = legacy_details({"destination": "Lisbon", "duration": "5 days"})
+TEXT = generate_travel_response(DETAILS, stub_itinerary(DETAILS))
+PROGRESS = "✅ Activity Planner finished activity planning\n🔎 Restaurant Scout: serper_search\n"
+BODY = {"messages": [{"role": "user", "content": "5 days in Lisbon from Boston, budget $2,500"}]}
+
+
+def models():
+    return ChatCompletionResponse(
+        id="chatcmpl-1234abcd", created=1_700_000_000, model="travel-agent",
+        choices=[ChatCompletionChoice(index=0, message=ChatMessage(role="assistant", content=TEXT),
+                                      finish_reason="stop")],
+    ).model_dump_json()
+
+
+def template():
+    return completion_json("chatcmpl-1234abcd", 1_700_000_000, "travel-agent", TEXT, 12)
+
+
+def per_call(func) -> float:
+    return min(timeit.repeat(func, number=N, repeat=5)) / N * 1e6
+
+
+async def cached_request(count: int = 2000) -> float:
+    async with lifespan(app):
+        await request(app, "POST", "/chat/completions", BODY)  # fill the cache
+        started = asyncio.get_running_loop().time()
+        for _ in range(count):
+            await request(app, "POST", "/chat/completions", BODY)
+        return (asyncio.get_running_loop().time() - started) / count * 1e6
+
+
+def main():
+    assert json.loads(template())["choices"][0]["message"]["content"] == TEXT
+    encoder = ChunkEncoder("chatcmpl-1234abcd", "travel-agent", 1_700_000_000)
+    prefix, suffix = encoder._content_prefix, encoder._content_suffix
+    print(f"response text: {len(TEXT)} chars")
+    print(f"completion, models + model_dump_json: {per_call(models):7.2f} us")
+    print(f"completion, byte template:            {per_call(template):7.2f} us")
+    print(f"chunk, json.dumps:                    {per_call(lambda: prefix + json.dumps(PROGRESS).encode() + suffix):7.2f} us")
+    print(f"chunk, ChunkEncoder.content:          {per_call(lambda: encoder.content(PROGRESS)):7.2f} us")
+    print(f"cached /chat/completions request:     {asyncio.run(cached_request()):7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Throughput of the crew worker pool in stub-LLM mode.
+
+Submits a burst of trips through ``CrewExecutor`` with the ``stub`` runner
+(``TRAVEL_STUB_LATENCY`` seconds per task) and reports trips per second and
+the worst event-loop stall seen while they run, for several pool sizes.
+
+    python benchmarks/bench_executor.py [trips] [latency]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from travel_api.crew_runner import run_stub
+from travel_api.executor import CrewExecutor
+
+DETAILS = {
+    'origin': 'Boston', 'destination': 'Tokyo', 'age': '29',
+    'interests': 'food', 'budget': '$3000', 'duration': '5 days',
+    'hotel_preference': 'boutique',
+}
+
+
+async def loop_lag(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - started - 0.01)
+    return worst
+
+
+async def burst(workers: int, trips: int) -> tuple:
+    executor = CrewExecutor(run_stub, workers=workers, queue_depth=trips, timeout=None)
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(executor.run(dict(DETAILS)) for _ in range(trips)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    executor.shutdown()
+    return elapsed, await lag
+
+
+def main():
+    trips = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    os.environ["TRAVEL_STUB_LATENCY"] = sys.argv[2] if len(sys.argv) > 2 else "0.05"
+    print(f"{trips} trips, {os.environ['TRAVEL_STUB_LATENCY']}s per task")
+    print(f"{'workers':>8} {'seconds':>8} {'trips/s':>8} {'max loop stall ms':>18}")
+    for workers in (1, 4, 16, 64):
+        elapsed, lag = asyncio.run(burst(workers, trips))
+        print(f"{workers:>8} {elapsed:>8.2f} {trips / elapsed:>8.1f} {lag * 1000:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Micro-benchmark for travel detail extraction.
+
+Times ``TravelDetailExtractor.extract`` against synthetic gazetteers of
+growing size and conversations of growing length. Time per request should
+not move with the gazetteer size, and time per KB of conversation should
+stay flat as the conversation grows.
+
+    python benchmarks/bench_extraction.py
+"""
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from travel_api.extraction import BUNDLED_GAZETTEER, Gazetteer, TravelDetailExtractor
+
+GAZETTEER_SIZES = [0, 10_000, 50_000, 200_000]
+CONVERSATION_TURNS = [1, 10, 100]
+
+TURNS = [
+    "Hi! I'm planning a surprise trip for my partner from New York.",
+    "We'd love to visit Tokyo for about 7 days, budget is $4,500.",
+    "She is 29 years old and really into food, anime and museums.",
+    "A boutique hotel near Shinjuku would be perfect, nothing too fancy.",
+    "Could you also suggest some day trips? Maybe hiking near Kyoto.",
+]
+
+
+def synthetic_gazetteer(extra: int, seed: int = 7) -> Gazetteer:
+    rng = random.Random(seed)
+    gazetteer = Gazetteer().load(BUNDLED_GAZETTEER)
+    for _ in range(extra):
+        words = rng.randint(1, 3)
+        name = " ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))).title()
+            for _ in range(words)
+        )
+        gazetteer.add(name, name)
+    return gazetteer
+
+
+def conversation(turns: int):
+    return [TURNS[i % len(TURNS)] for i in range(turns)]
+
+
+def bench(extractor: TravelDetailExtractor, messages, number: int) -> float:
+    timer = timeit.Timer(lambda: extractor.extract(messages))
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main():
+    print(f"{'gazetteer':>10} {'turns':>6} {'KB':>7} {'us/request':>11} {'us/KB':>8}")
+    for size in GAZETTEER_SIZES:
+        extractor = TravelDetailExtractor(synthetic_gazetteer(size))
+        for turns in CONVERSATION_TURNS:
+            messages = conversation(turns)
+            kb = sum(len(m) for m in messages) / 1024
+            seconds = bench(extractor, messages, number=max(1, 2000 // turns))
+            print(f"{extractor.gazetteer.size:>10} {turns:>6} {kb:>7.1f} "
+                  f"{seconds * 1e6:>11.1f} {seconds * 1e6 / kb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
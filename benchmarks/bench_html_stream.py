@@ -0,0 +1,179 @@
+"""Scraping large pages: whole-body extraction versus the streaming path.
+
+A local server answers browserless' ``/content`` with generated travel
+pages of 2, 8 and 32 MB (navigation, scripts, footer and thousands of
+paragraphs), sent at ``--rate`` MB/s. Each page is read two ways:
+
+- ``whole``: the old path: ``response.text``, every element extracted,
+  joined, then cut into 8000-character slices;
+- ``stream``: ``BrowserTools.page_paragraphs`` through
+  ``page_store().stream`` into ``chunker().chunks``, as the tool does,
+  first from the server and then from the page store.
+
+Reports the time to the first chunk and to the last, and the peak Python
+allocation (tracemalloc, in a separate pass). Peak memory on the
+streaming path should not grow with the page.
+
+Then the 2 and 8 MB pages are streamed into the summarizers, with a stub LLM taking
+``--latency`` seconds per chunk so the page downloads faster than it is
+summarized:
+
+- ``summarize/map``: the pool's ``map`` over the chunks, which reads the
+  whole page ahead into the executor's queue;
+- ``summarize``: ``tools.summarizer.summarize``, as the tool calls it.
+
+    python benchmarks/bench_html_stream.py [--rate 20 --latency 0.2]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "trip_planner"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ["BROWSERLESS_API_KEY"] = "offline"
+os.environ["TRAVEL_PAGE_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "pages.db")
+os.environ["TRAVEL_PAGE_STORE_BYTES"] = str(1 << 30)
+
+from crewai.utilities.events.event_listener import event_listener  # noqa: E402
+from stub_llm import StubLLM  # noqa: E402
+from tools import summarizer  # noqa: E402
+from tools.browser_tools import BrowserTools  # noqa: E402
+from tools.chunking import Chunker, text_elements  # noqa: E402
+from tools.html_text import html_elements  # noqa: E402
+from tools.http_session import session, timeout  # noqa: E402
+from tools.page_store import page_store  # noqa: E402
+
+HEAD = (b"<html><head><title>Lisbon guide</title><script>" + b"var tracking = 1;" * 2000 + b"</script>"
+        b"<style>" + b"p { margin: 0 }" * 500 + b"</style></head><body><header><nav><ul>"
+        + b"".join(b"<li><a href='/%d'>Section %d</a></li>" % (i, i) for i in range(40))
+        + b"</ul></nav></header><main>")
+TAIL = b"</main><footer><p>Copyright Travel Guides. All rights reserved.</p></footer></body></html>"
+
+
+def page(megabytes: int) -> bytes:
+    parts, size, number = [HEAD], len(HEAD), 0
+    while size < megabytes << 20:
+        number += 1
+        part = (b"<h2>Stop %d</h2><p>Stop %d starts at the old market, where the stalls open at seven. "
+                b"Walk uphill through the lanes to the viewpoint, then take tram %d back to the river. "
+                b"Lunch at a tasca near the square costs about twelve euros with wine.</p>"
+                % (number, number, number % 30))
+        parts.append(part)
+        size += len(part)
+    parts.append(TAIL)
+    return b"".join(parts)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = {}
+    rate = 20.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        website = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))["url"]
+        body = Handler.pages[website.split("/")[3]]   # {base}/{megabytes}/...
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        block = 64 * 1024
+        for start in range(0, len(body), block):
+            self.wfile.write(body[start:start + block])
+            time.sleep(block / (Handler.rate * (1 << 20)))
+
+
+def whole(website, base):
+    response = session().post(f"{base}/content?token=offline", json={"url": website}, timeout=timeout())
+    text = "\n\n".join(text for _, text in html_elements([response.text]))
+    yield from [text[i:i + 8000] for i in range(0, len(text), 8000)]
+
+
+def streamed(website, base):
+    chunker = Chunker()
+    paragraphs = page_store().stream(website, lambda: BrowserTools.page_paragraphs(website))
+    yield from chunker.chunks(website, text_elements(paragraphs))
+
+
+def mapped(chunks, llm):
+    """The summarize step as it was: every chunk handed to the pool at once."""
+    return "\n\n".join(summarizer.summary_pool().map(lambda chunk: summarizer.summarize_chunk(chunk, llm),
+                                                      chunks))
+
+
+def timed(run):
+    started = time.perf_counter()
+    first, count = None, 0
+    for _ in run():
+        count += 1
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started, count
+
+
+def peak(run):
+    tracemalloc.start()
+    for _ in run():
+        pass
+    _, highest = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return highest / (1 << 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=20.0, help="MB/s the server sends")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stub LLM call")
+    args = parser.parse_args()
+    Handler.rate = args.rate
+    for megabytes in (2, 8, 32):
+        Handler.pages[str(megabytes)] = page(megabytes)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["BROWSERLESS_URL"] = base
+    print(f"server sends {args.rate:g} MB/s")
+    print(f"{'page':<8}{'path':<14}{'first chunk':>12}{'last chunk':>12}{'chunks':>8}{'peak MB':>9}")
+    for megabytes in (2, 8, 32):
+        page_url = f"{base}/{megabytes}"
+        # Streamed reads store the page, so each of them gets a URL of its own
+        timed(lambda: streamed(f"{page_url}/stored", base))
+        for label, run, urls in (
+            ("whole", whole, ("whole", "whole")),
+            ("stream", streamed, ("fresh-1", "fresh-2")),
+            ("stream/store", streamed, ("stored", "stored")),
+        ):
+            first, last, count = timed(lambda: run(f"{page_url}/{urls[0]}", base))
+            highest = peak(lambda: run(f"{page_url}/{urls[1]}", base))
+            print(f"{megabytes:>3} MB   {label:<14}{first:>11.2f}s{last:>11.2f}s{count:>8}{highest:>9.1f}")
+
+    llm = StubLLM(args.latency)
+    event_listener.formatter.verbose = False  # no task panels between the results
+    print(f"\nsummarizing, stub LLM {args.latency:g}s per chunk, {summarizer.workers()} workers")
+    print(f"{'page':<8}{'path':<16}{'total':>10}{'LLM calls':>11}{'peak MB':>9}")
+    for megabytes in (2, 8):
+        page_url = f"{base}/{megabytes}"
+        for label, summarize in (("summarize/map", mapped), ("summarize", summarizer.summarize)):
+            # Straight from the server each time, which is faster than the summarizers
+            run = lambda url: [summarize(streamed(url, base), llm)]  # noqa: E731
+            calls, started = llm.calls, time.perf_counter()
+            run(f"{page_url}/{label}-1")
+            elapsed, calls = time.perf_counter() - started, llm.calls - calls
+            highest = peak(lambda: run(f"{page_url}/{label}-2"))
+            print(f"{megabytes:>3} MB   {label:<16}{elapsed:>9.2f}s{calls:>11}{highest:>9.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Connection reuse of the crew's search and scrape tools.
+
+Starts a local HTTPS server with a throwaway self-signed certificate that
+answers like Serper and like a web page, then makes the same calls with
+the stock crewai_tools classes, which use module-level ``requests``, and
+with the pooled tools from ``surprise_travel.tools.registry``. Reports
+milliseconds per call and how many TCP+TLS connections the server
+accepted.
+
+    python benchmarks/bench_http_pool.py [calls]
+"""
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "surprise_trip", "src"))
+os.environ.setdefault("SERPER_API_KEY", "offline")
+
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+
+SEARCH = json.dumps({"organic": [
+    {"title": f"Result {i}", "link": f"https://example.com/{i}", "snippet": "Things to do."} for i in range(10)
+]}).encode()
+PAGE = b"<html><body>" + b"<p>Best pastries in Lisbon.</p>" * 200 + b"</body></html>"
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        with FakeHandler.lock:
+            FakeHandler.connections += 1
+        super().setup()
+
+    def _reply(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply(SEARCH, "application/json")
+
+    def do_GET(self):
+        self._reply(PAGE, "text/html; charset=utf-8")
+
+    def log_message(self, *args):
+        pass
+
+
+def self_signed(directory: str):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name)
+        .public_key(key.public_key()).serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as handle:
+        handle.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as handle:
+        handle.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                       serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+def start_server(cert_path: str, key_path: str) -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"https://127.0.0.1:{server.server_address[1]}"
+
+
+def measure(label: str, call, calls: int):
+    FakeHandler.connections = 0
+    started = time.perf_counter()
+    for i in range(calls):
+        call(i)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed / calls * 1000:8.2f} ms/call {FakeHandler.connections:6d} connections")
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    directory = tempfile.mkdtemp()
+    cert_path, key_path = self_signed(directory)
+    # Both requests' module functions and sessions trust this bundle.
+    os.environ["REQUESTS_CA_BUNDLE"] = cert_path
+    os.environ.setdefault("TRAVEL_PAGE_STORE_PATH", os.path.join(directory, "pages.db"))
+    base_url = start_server(cert_path, key_path)
+
+    from crewai_tools import ScrapeWebsiteTool, SerperDevTool
+    from surprise_travel.tools.registry import PooledScrapeWebsiteTool, PooledSerperDevTool
+
+    print(f"{calls} calls per row against {base_url}")
+    for label, search in (("search, crewai_tools", SerperDevTool(base_url=base_url)),
+                          ("search, pooled", PooledSerperDevTool(base_url=base_url))):
+        measure(label, lambda i: search._make_api_request(f"things to do {i}", "search"), calls)
+    for label, scrape in (("page read, crewai_tools", ScrapeWebsiteTool()),
+                          ("page read, pooled", PooledScrapeWebsiteTool())):
+        measure(label, lambda i: scrape._run(website_url=f"{base_url}/page/{i}"), calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Itinerary store: lookup latency at scale, hit rate and crew time saved.
+
+Fills a temporary store with ``plans`` synthetic itineraries over a few
+hundred destinations and times exact and near-duplicate reuse, seed and
+miss lookups. Next it replays a skewed stream of traveler profiles against
+an empty store, counting a full crew run as 90 s and a seeded one as 30 s,
+and reports the hit ratio and crew time saved. Finally it plans three
+profiles through ``batch.plan`` with the stub LLM (new, similar, identical)
+and shows how many LLM calls each needed.
+
+    python benchmarks/bench_itinerary_store.py [plans]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "surprise_trip", "src"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("SERPER_API_KEY", "offline")
+
+from stub_llm import ITINERARY, StubLLM  # noqa: E402
+from surprise_travel.itinerary_store import ItineraryStore, profile  # noqa: E402
+
+INTERESTS = ["food", "wine", "museums", "hiking", "beaches", "nightlife", "history", "architecture",
+             "markets", "music", "surfing", "art", "photography", "shopping", "cycling", "spas"]
+HOTELS = ["luxury", "boutique", "budget", "standard"]
+
+
+def random_profile(rng: random.Random, destinations: int):
+    # Popular destinations and short trips dominate, as in real traffic
+    return profile(
+        destination=f"City {int(rng.paretovariate(1.2)) % destinations}",
+        duration=f"{rng.choice([3, 3, 4, 5, 7, 7, 10])} days",
+        age=rng.randint(20, 69),
+        hotel=rng.choice(HOTELS),
+        interests=", ".join(rng.sample(INTERESTS, rng.randint(1, 3))),
+    )
+
+
+def timed(store, profiles):
+    samples = []
+    for wanted in profiles:
+        started = time.perf_counter()
+        store.lookup(wanted)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def lookups(count: int, directory: str):
+    rng = random.Random(7)
+    store = ItineraryStore(os.path.join(directory, "scale.db"))
+    started = time.perf_counter()
+    store._conn.execute("BEGIN")
+    stored = [random_profile(rng, 300) for _ in range(count)]
+    for wanted in stored:
+        store.save(wanted, ITINERARY, 90.0)
+    store._conn.execute("COMMIT")
+    print(f"stored {store.stats()['stored']} distinct plans in {time.perf_counter() - started:.1f}s")
+    for label, wanted in (
+        ("reuse", stored[:2000]),
+        ("near", [w._replace(interests=w.interests | {"spas"}) for w in stored[:2000] if len(w.interests) == 3]),
+        ("seed", [w._replace(hotel="hostel") for w in stored[:2000]]),
+        ("miss", [w._replace(destination="nowhere") for w in stored[:2000]]),
+    ):
+        p50, p99 = timed(store, wanted)
+        print(f"{label:<6} lookup p50 {p50:6.1f} µs  p99 {p99:6.1f} µs")
+
+
+def workload(requests: int, directory: str):
+    rng = random.Random(11)
+    store = ItineraryStore(os.path.join(directory, "workload.db"))
+    spent = 0.0
+    for _ in range(requests):
+        wanted = random_profile(rng, 40)
+        match = store.lookup(wanted)
+        if match is None:
+            spent += 90.0
+            store.save(wanted, ITINERARY, 90.0)
+        elif match.kind == "seed":
+            spent += 30.0
+            store.record(match, 30.0)
+            store.save(wanted, ITINERARY, 90.0)
+        else:
+            store.record(match, 0.0)
+    stats = store.stats()
+    print(f"{requests} requests: {stats['reused']} reused, {stats['seeded']} seeded, {stats['missed']} missed,"
+          f" hit ratio {stats['hit_ratio']:.0%}, crew time {spent / 3600:.1f} h"
+          f" instead of {requests * 90 / 3600:.1f} h")
+
+
+def crew_paths(directory: str):
+    from surprise_travel.batch import default_crew, plan
+
+    store = ItineraryStore(os.path.join(directory, "crew.db"))
+    llm = StubLLM(0.2)
+
+    def make_crew(seeded=False):
+        crew = default_crew(seeded)
+        for agent in crew.agents:
+            agent.llm = llm
+        return crew
+
+    base = {"origin": "Boston", "destination": "Lisbon", "age": 34, "dates": "May 3-10",
+            "duration": "7 days", "hotel_style": "boutique", "interests": "food, wine, history"}
+    for label, changes in (("new", {}), ("similar", {"hotel_style": "luxury", "interests": "food and markets"}),
+                           ("identical", {})):
+        calls = llm.calls
+        record = plan({**base, **changes}, make_crew, store)
+        assert record["status"] == "ok", record
+        print(f"{label:<10} source={record['source']:<6} {record['seconds']:.2f}s {llm.calls - calls} LLM calls")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    with tempfile.TemporaryDirectory() as directory:
+        lookups(count, directory)
+        workload(5000, directory)
+        crew_paths(directory)
+
+
+if __name__ == "__main__":
+    main()
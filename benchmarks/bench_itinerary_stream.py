@@ -0,0 +1,75 @@
+"""Streaming itinerary parsing: time to the first day and parser memory.
+
+First feeds 10-, 100- and 1000-day itineraries to ``ItineraryParser`` in
+16-character chunks, and reports the parse cost per KiB and the parser's
+peak allocation (tracemalloc). Peak memory should not grow with the
+number of days. Then it runs a crew whose stub LLM streams a 10-day
+itinerary over ``latency`` seconds, and reports when the first activity
+and the first full day were available compared with the end of the
+kickoff.
+
+    python benchmarks/bench_itinerary_stream.py [latency]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "surprise_trip", "src"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("SERPER_API_KEY", "offline")
+
+from stub_llm import StubLLM, itinerary  # noqa: E402
+from surprise_travel.batch import default_crew  # noqa: E402
+from surprise_travel.itinerary_stream import ItineraryParser, stream_itinerary  # noqa: E402
+from travel_api.crew_runner import crew_inputs  # noqa: E402
+
+
+def parse(text: str, chunk: int = 16):
+    parser = ItineraryParser()
+    days = 0
+    for i in range(0, len(text), chunk):
+        days += sum(event["type"] == "day" for event in parser.feed(text[i:i + chunk]))
+    return days
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    for days in (10, 100, 1000):
+        text = "Final Answer: " + json.dumps(itinerary(days), indent=2)
+        started = time.perf_counter()
+        assert parse(text) == days
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        parse(text)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{days:5d} days {len(text) / 1024:8.1f} KiB: {elapsed / len(text) * 1024 * 1000:.2f} ms/KiB,"
+              f" parser peak {peak / 1024:.1f} KiB")
+
+    crew = default_crew()
+    for agent in crew.agents:
+        agent.llm = StubLLM(latency if agent.role.strip() == "Itinerary Compiler" else 0.05, days=10)
+    seen = {}
+    started = time.perf_counter()
+
+    def on_event(event):
+        seen.setdefault(event["type"], time.perf_counter() - started)
+
+    with stream_itinerary(crew, on_event):
+        result = crew.kickoff(inputs=crew_inputs({
+            "origin": "Boston", "destination": "Lisbon", "age": "30", "interests": "food",
+            "budget": "$2000", "duration": "10 days", "hotel_preference": "boutique"}))
+    total = time.perf_counter() - started
+    assert len(result.json_dict["day_plans"]) == 10
+    print(f"10-day crew: first activity {seen['activity']:.2f}s, first day {seen['day']:.2f}s,"
+          f" kickoff done {total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
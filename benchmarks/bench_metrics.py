@@ -0,0 +1,33 @@
+"""Per-span overhead of the latency instrumentation.
+
+Compares an empty loop with the same loop wrapped in ``Histogram.time()``
+and with a bare ``observe()`` call, and prints nanoseconds per span.
+
+    python benchmarks/bench_metrics.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from travel_api.metrics import REGISTRY, stage_seconds
+
+N = 1_000_000
+
+
+def main():
+    histogram = stage_seconds.labels("bench")
+    baseline = min(timeit.repeat("pass", number=N, repeat=5))
+    span = min(timeit.repeat("with h.time(): pass", globals={"h": histogram}, number=N, repeat=5))
+    observe = min(timeit.repeat("h.observe(0.002)", globals={"h": histogram}, number=N, repeat=5))
+    labels = min(timeit.repeat("f.labels('bench')", globals={"f": stage_seconds}, number=N, repeat=5))
+    print(f"span (perf_counter x2 + observe): {(span - baseline) / N * 1e9:7.1f} ns")
+    print(f"observe only:                     {(observe - baseline) / N * 1e9:7.1f} ns")
+    print(f"label lookup:                     {(labels - baseline) / N * 1e9:7.1f} ns")
+    render = min(timeit.repeat(REGISTRY.render, number=100, repeat=3)) / 100
+    print(f"/metrics render:                  {render * 1e6:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
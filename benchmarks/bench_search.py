@@ -0,0 +1,91 @@
+"""SearchTools' Serper calls: one blocking request per query versus batches.
+
+Against ``fake_serper.FakeSerper`` (``--latency`` seconds per reply),
+runs ``--queries`` queries in batches of ``--batch``, the way an agent
+asks several related questions in a row:
+
+- ``sequential``: the old tool, one pooled ``requests`` POST per query;
+- ``batched``: ``SearchClient.search_many`` per batch.
+
+Then runs the batched client against a server where a share of requests
+is throttled (429), fails (5xx), returns garbage or stalls past the read
+timeout, and reports how many queries were answered, how many failed
+cleanly and how long the worst batch took.
+
+    python benchmarks/bench_search.py [--queries 64 --batch 4 --latency 0.05]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "trip_planner"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_serper import FakeSerper  # noqa: E402
+from tools.http_session import session, timeout  # noqa: E402
+from tools.search_client import SearchClient, parse  # noqa: E402
+
+
+def sequential(server, batches):
+    for batch in batches:
+        for query in batch:
+            response = session().post(f"{server.url}/search", json={"q": query},
+                                      headers={"X-API-KEY": "offline"}, timeout=timeout())
+            parse(query, response.json())
+
+
+def batched(client, batches):
+    worst, answers = 0.0, []
+    for batch in batches:
+        started = time.perf_counter()
+        answers += client.search_many(batch)
+        worst = max(worst, time.perf_counter() - started)
+    return answers, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    queries = [f"things to do in city {n} in spring" for n in range(args.queries)]
+    batches = [queries[i:i + args.batch] for i in range(0, len(queries), args.batch)]
+
+    server = FakeSerper(latency=args.latency).start()
+    client = SearchClient(server.url, "offline", concurrency=8)
+    print(f"{args.queries} queries in batches of {args.batch}, {args.latency * 1000:.0f} ms per reply")
+    for label, run in (("sequential", lambda: sequential(server, batches)),
+                       ("batched", lambda: batched(client, batches))):
+        server.reset()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        print(f"{label:<12}{elapsed:7.2f}s  {args.queries / elapsed:7.1f} queries/s"
+              f"  {server.stats['connections']} connections")
+    client.close()
+    server.stop()
+
+    faulty = FakeSerper(latency=args.latency, throttle=0.15, errors=0.1, stall=0.02, garbage=0.02,
+                        stall_seconds=5).start()
+    client = SearchClient(faulty.url, "offline", concurrency=8, retries=2, backoff=0.2, timeouts=(1.0, 1.0),
+                          deadline=3.0)
+    started = time.perf_counter()
+    answers, worst = batched(client, batches)
+    elapsed = time.perf_counter() - started
+    answered = sum(1 for answer in answers if answer.results)
+    print(f"with faults {elapsed:7.2f}s  {answered}/{len(answers)} answered, "
+          f"{len(answers) - answered} failed, worst batch {worst:.2f}s")
+    print("  server saw " + ", ".join(f"{count} {outcome}" for outcome, count in sorted(faulty.stats.items())))
+    errors = Counter(answer.error.rsplit(": ", 1)[-1] for answer in answers if answer.error)
+    for error, count in errors.most_common():
+        print(f"  {count} x {error}")
+    client.close()
+    faulty.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time-to-first-byte and total time of streaming ``/chat/completions``.
+
+Runs the app in-process with the ``stub`` crew backend and reports, for a
+cache miss and a cache hit: time to the first SSE chunk, time to the first
+progress line from the crew, total stream time and chunk count. The last
+line shows the delay the old word-by-word stream (50 ms per word) would
+have added on top of the crew run.
+
+    python benchmarks/bench_streaming.py [latency-per-task]
+"""
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("TRAVEL_CREW_BACKEND", "stub")
+os.environ["TRAVEL_STUB_LATENCY"] = sys.argv[1] if len(sys.argv) > 1 else "0.2"
+
+from asgi import lifespan, request  # noqa: E402
+from watson_x_api import app  # noqa: E402
+
+BODY = {
+    "stream": True,
+    "messages": [{"role": "user", "content": "Surprise me with 5 days in Lisbon from Boston, budget $2,500"}],
+}
+
+
+def answer_text(response) -> str:
+    text = []
+    for line in response.body.decode().splitlines():
+        if line.startswith("data: {"):
+            text.append(json.loads(line[6:])["choices"][0]["delta"].get("content", ""))
+    return "".join(text)
+
+
+def report(label, response):
+    progress = [t for t, chunk in response.chunks if b'"content"' in chunk]
+    first_progress = (progress[0] - response.started) if progress else float("nan")
+    print(f"{label:<10} {response.ttfb * 1000:>9.2f} {first_progress * 1000:>14.2f} "
+          f"{response.elapsed * 1000:>10.2f} {len(response.chunks):>7}")
+
+
+async def main():
+    async with lifespan(app):
+        print(f"{'':<10} {'ttfb ms':>9} {'1st content ms':>14} {'total ms':>10} {'chunks':>7}")
+        miss = await request(app, "POST", "/chat/completions", BODY)
+        report("miss", miss)
+        hit = await request(app, "POST", "/chat/completions", BODY)
+        report("hit", hit)
+        words = len(answer_text(hit).split())
+        print(f"word-by-word stream would add ~{words * 0.05:.1f}s of sleeps for ~{words} words")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
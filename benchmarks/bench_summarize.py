@@ -0,0 +1,83 @@
+"""Scraped-page summaries: chunk by chunk versus map-reduce on the pool.
+
+Summarizes pages with a stub LLM that takes ``latency`` seconds per call,
+first one chunk after another (as the tool used to, with a new agent per
+chunk), then through ``tools.summarizer.summarize``, then with merges
+forced by a small ``TRAVEL_SUMMARY_MAX_CHARS`` and, so that long pages
+merge in rounds, a small ``TRAVEL_SUMMARY_MERGE_CHARS``. Reports the tool's
+latency and LLM calls for each.
+
+Pages are saved HTML files given on the command line, turned into text
+with ``tools.html_text`` and cut into 8000-character chunks. Without
+files, it uses generated travel pages of 25, 100 and 400 KB.
+
+    python benchmarks/bench_summarize.py [--latency 0.5] [page.html ...]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "trip_planner"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+from crewai.utilities.events.event_listener import event_listener  # noqa: E402
+from stub_llm import StubLLM  # noqa: E402
+from tools import summarizer  # noqa: E402
+from tools.html_text import html_elements  # noqa: E402
+
+PARAGRAPH = ("The old town climbs from the river in narrow lanes lined with tiled houses, small taverns and "
+             "bakeries. Trams run every ten minutes and a day pass covers the funiculars. ")
+
+
+def generated(kb: int) -> str:
+    return "\n\n".join(PARAGRAPH for _ in range(kb * 1024 // (len(PARAGRAPH) + 2)))
+
+
+def saved(path: str) -> str:
+    with open(path, encoding="utf-8", errors="replace") as page:
+        return "\n\n".join(text for _, text in html_elements([page.read()]))
+
+
+def sequential(chunks, llm):
+    summaries = []
+    for chunk in chunks:
+        summarizer._local.agents = {}  # a new agent per chunk, as before
+        summaries.append(summarizer.summarize_chunk(chunk, llm))
+    return "\n\n".join(summaries)
+
+
+def timed(label, run, llm):
+    calls = llm.calls
+    started = time.perf_counter()
+    summary = run()
+    print(f"  {label:<12} {time.perf_counter() - started:6.2f}s  {llm.calls - calls:3d} LLM calls"
+          f"  {len(summary):6d} chars")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("pages", nargs="*", help="saved HTML pages")
+    args = parser.parse_args()
+    pages = [(os.path.basename(path), saved(path)) for path in args.pages] or [
+        (f"{kb} KB page", generated(kb)) for kb in (25, 100, 400)]
+    llm = StubLLM(args.latency)
+    event_listener.formatter.verbose = False  # no task panels between the results
+    print(f"stub LLM {args.latency}s per call, {summarizer.summary_pool()._max_workers} workers")
+    for name, text in pages:
+        chunks = [text[i:i + 8000] for i in range(0, len(text), 8000)]
+        print(f"{name}: {len(text) / 1024:.0f} KB, {len(chunks)} chunks")
+        timed("sequential", lambda: sequential(chunks, llm), llm)
+        timed("map", lambda: summarizer.summarize(chunks, llm), llm)
+        os.environ["TRAVEL_SUMMARY_MAX_CHARS"] = "200"
+        os.environ["TRAVEL_SUMMARY_MERGE_CHARS"] = "1000"
+        timed("map+reduce", lambda: summarizer.summarize(chunks, llm), llm)
+        del os.environ["TRAVEL_SUMMARY_MAX_CHARS"], os.environ["TRAVEL_SUMMARY_MERGE_CHARS"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""A local stand-in for Serper's /search, with latency and injected faults.
+
+Answers ``POST /search`` with ten organic results for the query after
+``latency`` seconds. A share of requests can fail instead, drawn from a
+seeded generator so runs repeat:
+
+- ``throttle``: 429 with ``Retry-After: 0.1``;
+- ``errors``: 500 or 503;
+- ``stall``: no reply for ``stall_seconds`` (longer than a client timeout);
+- ``garbage``: 200 with a body that is not JSON.
+
+Counts requests by outcome and the connections accepted (``stats``).
+
+    server = FakeSerper(latency=0.05, throttle=0.1).start()
+    os.environ["SERPER_BASE_URL"] = server.url
+
+or on its own: ``python benchmarks/fake_serper.py --port 8900 --throttle 0.1``
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def organic(query, count=10):
+    return {"searchParameters": {"q": query}, "organic": [
+        {"title": f"{query} - result {i}", "link": f"https://example.com/{i}?q={len(query)}",
+         "snippet": f"Everything about {query}: opening hours, prices and how to get there.", "position": i}
+        for i in range(1, count + 1)
+    ]}
+
+
+class FakeSerper():
+
+    def __init__(self, latency=0.05, throttle=0.0, errors=0.0, stall=0.0, garbage=0.0, stall_seconds=30.0,
+                 seed=7, port=0):
+        self.latency = latency
+        self.faults = (("throttle", throttle), ("error", errors), ("stall", stall), ("garbage", garbage))
+        self.stall_seconds = stall_seconds
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _outcome(self):
+        with self._lock:
+            draw = self._random.random()
+            for outcome, share in self.faults:
+                if draw < share:
+                    break
+                draw -= share
+            else:
+                outcome = "ok"
+            self.stats[outcome] += 1
+            return outcome
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                with fake._lock:
+                    fake.stats["connections"] += 1
+                super().setup()
+
+            def _reply(self, status, body, headers=()):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                if self.path.split("?")[0] != "/search":
+                    self._reply(404, b'{"message": "Not found"}')
+                    return
+                outcome = fake._outcome()
+                time.sleep(fake.stall_seconds if outcome == "stall" else fake.latency)
+                if outcome == "throttle":
+                    self._reply(429, b'{"message": "Too many requests"}', [("Retry-After", "0.1")])
+                elif outcome == "error":
+                    self._reply(fake._random.choice((500, 503)), b'{"message": "Server error"}')
+                elif outcome == "garbage":
+                    self._reply(200, b"<html>upstream proxy error</html>")
+                else:
+                    self._reply(200, json.dumps(organic(payload.get("q", ""))).encode())
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.05)
+    for fault in ("throttle", "errors", "stall", "garbage"):
+        parser.add_argument(f"--{fault}", type=float, default=0.0, help="share of requests")
+    args = parser.parse_args()
+    server = FakeSerper(args.latency, args.throttle, args.errors, args.stall, args.garbage, port=args.port)
+    print(f"fake Serper on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
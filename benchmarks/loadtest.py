@@ -0,0 +1,198 @@
+"""In-process load test for ``watson_x_api``.
+
+Drives the FastAPI app through the ASGI driver in ``asgi.py`` (no sockets)
+with a weighted mix of streaming and non-streaming ``/chat/completions``,
+``/plan-surprise-trip`` and ``/health`` requests at a fixed concurrency.
+The crew runs in ``stub`` mode, so only the request path is measured.
+
+Reports successful requests, errors, throughput and p50/p95/p99 latency
+per scenario, plus time to the first chunk with content for streams. ``--save`` writes a JSON baseline and
+``--compare`` exits non-zero when a metric regresses past ``--tolerance``.
+
+    python benchmarks/loadtest.py --requests 2000 --concurrency 64
+    python benchmarks/loadtest.py --save benchmarks/baseline-loadtest.json
+    python benchmarks/loadtest.py --compare benchmarks/baseline-loadtest.json
+
+``--url`` sends the same mix over HTTP to a running server instead, e.g.
+``python -m travel_api.serve`` with ``TRAVEL_CREW_BACKEND=stub``, to see
+how throughput scales with ``WEB_CONCURRENCY``.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+DESTINATIONS = ["Tokyo", "Paris", "Lisbon", "Rome", "Mexico City", "Seoul", "Cape Town", "Reykjavik"]
+
+# name: (weight, method, path)
+SCENARIOS = {
+    "chat": (45, "POST", "/chat/completions"),
+    "chat_stream": (30, "POST", "/chat/completions"),
+    "legacy": (15, "POST", "/plan-surprise-trip"),
+    "health": (10, "GET", "/health"),
+}
+
+
+def make_body(scenario: str, rng: random.Random, unique: float):
+    destination = rng.choice(DESTINATIONS)
+    days = rng.randint(3, 10)
+    # A fraction of requests carry a never-seen budget, so they miss the cache.
+    budget = rng.randint(1000, 10**6) if rng.random() < unique else 2500
+    if scenario == "legacy":
+        return {"destination": destination, "duration": f"{days} days", "budget": f"${budget}"}
+    if scenario.startswith("chat"):
+        return {
+            "stream": scenario == "chat_stream",
+            "messages": [
+                {"role": "system", "content": "You are a travel planning assistant."},
+                {"role": "user", "content": f"Plan a {days} day trip from Boston to {destination} "
+                                            f"with a budget of ${budget}. I love food and museums."},
+            ],
+        }
+    return None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+async def http_request(client, method: str, path: str, body=None):
+    from asgi import Response
+
+    response = Response(time.perf_counter())
+    async with client.stream(method, path, json=body) as reply:
+        response.status = reply.status_code
+        async for chunk in reply.aiter_raw():
+            now = time.perf_counter()
+            if response.first_byte is None:
+                response.first_byte = now
+            response.chunks.append((now, chunk))
+    response.finished = time.perf_counter()
+    return response
+
+
+@asynccontextmanager
+async def target(args):
+    """A ``request(method, path, body)`` callable for the app under test."""
+    if args.url:
+        import httpx
+
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=None) as client:
+            yield partial(http_request, client)
+    else:
+        from asgi import lifespan, request
+        from watson_x_api import app
+
+        async with lifespan(app):
+            yield partial(request, app)
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(args.seed)
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name][0] for name in names]
+    scenarios = rng.choices(names, weights, k=args.requests)
+    plan = [(name, make_body(name, rng, args.unique)) for name in scenarios]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    first_chunks: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    cursor = iter(range(len(plan)))
+
+    async def worker():
+        for index in cursor:
+            scenario, body = plan[index]
+            _, method, path = SCENARIOS[scenario]
+            response = await send(method, path, body)
+            if response.status != 200:
+                errors[scenario] += 1
+            latencies[scenario].append(response.elapsed)
+            if scenario == "chat_stream":
+                first_chunks[scenario].append(response.ttfc)
+
+    async with target(args) as send:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {}
+    for scenario in names + ["all"]:
+        values = latencies[scenario] if scenario != "all" else [v for vs in latencies.values() for v in vs]
+        if not values:
+            continue
+        failed = errors[scenario] if scenario != "all" else sum(errors.values())
+        metrics = {
+            "requests": len(values) - failed,
+            "errors": failed,
+            "throughput_rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+        if first_chunks.get(scenario):
+            metrics["ttfc_p50_ms"] = percentile(first_chunks[scenario], 50) * 1000
+            metrics["ttfc_p95_ms"] = percentile(first_chunks[scenario], 95) * 1000
+        results[scenario] = metrics
+    return results
+
+
+def print_results(results):
+    columns = ["requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "ttfc_p50_ms", "ttfc_p95_ms"]
+    print(f"{'scenario':<12}" + "".join(f"{c:>15}" for c in columns))
+    for scenario, metrics in results.items():
+        cells = "".join(f"{metrics[c]:>15.2f}" if c in metrics else f"{'-':>15}" for c in columns)
+        print(f"{scenario:<12}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--unique", type=float, default=0.3,
+                        help="fraction of trip requests that miss the response cache")
+    parser.add_argument("--stub-latency", default="0.02", help="seconds per stub crew task")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="load a running server instead of the in-process app")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    os.environ["TRAVEL_CREW_BACKEND"] = "stub"
+    os.environ["TRAVEL_STUB_LATENCY"] = args.stub_latency
+    os.environ.setdefault("TRAVEL_CREW_WORKERS", str(args.concurrency))
+    os.environ.setdefault("TRAVEL_CREW_QUEUE_DEPTH", str(args.requests))
+    os.environ.setdefault("TRAVEL_JOB_DB", os.path.join(tempfile.mkdtemp(), "jobs.db"))
+
+    results = asyncio.run(run(args))
+    print_results(results)
+
+    import baseline
+    if args.save:
+        baseline.save(args.save, results, requests=args.requests, concurrency=args.concurrency,
+                      unique=args.unique, stub_latency=args.stub_latency, url=args.url)
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        regressions = baseline.compare(results, baseline.load(args.compare), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
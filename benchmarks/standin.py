@@ -0,0 +1,532 @@
+"""Local stand-in for OpenAI, Serper and browserless, so the apps run offline.
+
+One HTTP server answers the three APIs the crews call:
+
+    POST /v1/chat/completions    OpenAI chat completions, streamed or not
+    POST /search, /news          Serper
+    POST /content                browserless
+    GET  /page?url=...           the pages search results link to
+    GET  /stats                  call and token counters; POST /stats resets them
+
+Point an app at it with ``OPENAI_API_BASE=<base>/v1``, ``SERPER_BASE_URL``
+and ``BROWSERLESS_URL`` set to ``<base>``. Search results are rewritten to
+link through ``/page``, so the pages agents scrape come from here as well.
+
+The answers depend on ``--mode``:
+
+- ``synthetic``: no network. The LLM plays a ReAct agent: it calls up to
+  ``--tool-calls`` of the tools listed in its prompt, one per call, then
+  gives a final answer. When the task asks for JSON in a given format
+  (``output_pydantic``), the answer is built from that format, so the
+  apps' models validate. Searches return ``n`` results and pages are
+  generated HTML.
+- ``record``: every call is forwarded to the real service, and the
+  response is appended to ``--cassette`` (JSON lines).
+- ``replay``: calls are answered from the cassette. Requests are matched
+  on their content, and the stand-in's own address is masked in requests
+  and replies, so a run replays in any order and on any port. Repeated requests get the
+  recorded responses in turn. A request missing from the cassette is a
+  404 and counts as a ``miss``.
+
+LLM answers take ``--latency`` seconds plus one second per
+``--tokens-per-second`` completion tokens; with ``--replay-timing``,
+replayed answers take as long as they did when recorded. Token counts are
+the upstream's ``usage`` when there is one, else about four characters
+per token.
+
+    python benchmarks/standin.py --mode synthetic --latency 0.5
+    python benchmarks/standin.py --mode record --cassette runs/surprise.jsonl
+    python benchmarks/standin.py --mode replay --cassette runs/surprise.jsonl
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from travel_api.encoding import estimate_tokens  # noqa: E402
+
+UPSTREAMS = {
+    "llm": "https://api.openai.com/v1",
+    "serper": "https://google.serper.dev",
+    "browserless": "https://chrome.browserless.io",
+}
+COUNTERS = ("llm_calls", "prompt_tokens", "completion_tokens", "tool_calls", "misses")
+MASK = "{standin}"
+
+
+class Miss(LookupError):
+    pass
+
+
+class Reply(NamedTuple):
+    body: Dict[str, Any]
+    seconds: float = 0.0      # how long the upstream took, for replay timing
+
+
+def request_key(kind: str, payload: Dict[str, Any], base: str) -> str:
+    """Cassette key: the request's content, without streaming options or our address."""
+    payload = {name: value for name, value in payload.items() if name not in ("stream", "stream_options")}
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False).replace(base, MASK)
+    return hashlib.sha256(f"{kind} {canonical}".encode("utf-8")).hexdigest()
+
+
+def masked(body: Dict[str, Any], base: str, unmask: bool = False) -> Dict[str, Any]:
+    """Swap our address for a placeholder in a recorded reply, or back."""
+    old, new = (MASK, base) if unmask else (base, MASK)
+    return json.loads(json.dumps(body, ensure_ascii=False).replace(old, new))
+
+
+def message_text(payload: Dict[str, Any], role: Optional[str] = None) -> List[str]:
+    texts = []
+    for message in payload.get("messages", []):
+        if role is not None and message.get("role") != role:
+            continue
+        content = message.get("content") or ""
+        if isinstance(content, list):  # content parts
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        texts.append(content)
+    return texts
+
+
+def page_url(base: str, url: str) -> str:
+    return f"{base}/page?url={quote(url, safe='')}"
+
+
+def original_url(url: str) -> str:
+    """The real address behind a ``/page`` link, or ``url`` itself."""
+    parts = urlsplit(url)
+    if parts.path == "/page":
+        return parse_qs(parts.query).get("url", [url])[0]
+    return url
+
+
+def route_links(results: Dict[str, Any], base: str) -> Dict[str, Any]:
+    """Send the links in Serper results through ``/page``."""
+    routed = dict(results)
+    for section in ("organic", "news"):
+        if isinstance(results.get(section), list):
+            routed[section] = [
+                {**item, "link": page_url(base, item["link"])} if "link" in item else item
+                for item in results[section]
+            ]
+    return routed
+
+
+class Cassette:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[str, int] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as recorded:
+                for line in recorded:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry["reply"])
+
+    def __len__(self) -> int:
+        return sum(len(replies) for replies in self._entries.values())
+
+    def take(self, key: str) -> Reply:
+        with self._lock:
+            replies = self._entries.get(key)
+            if not replies:
+                raise Miss(key)
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            return Reply(**replies[min(served, len(replies) - 1)])
+
+    def add(self, kind: str, key: str, reply: Reply):
+        line = json.dumps({"kind": kind, "key": key, "reply": reply._asdict()}, ensure_ascii=False)
+        with self._lock:
+            self._entries.setdefault(key, []).append(reply._asdict())
+            with open(self.path, "a", encoding="utf-8") as cassette:
+                cassette.write(line + "\n")
+
+
+class SyntheticBackend:
+    """Deterministic answers made up from the request alone."""
+
+    TOOL_RE = re.compile(r"^Tool Name: (.+)\nTool Arguments: (.+)$", re.MULTILINE)
+    TASK_RE = re.compile(r"Current Task: (.+)")
+    FORMAT_MARK = "contains only the content in the following format: "
+    URL_RE = re.compile(r"https?://[^\s\"'<>)\]]+")
+    WORDS = ("the old town has narrow streets with small restaurants serving local food and wine "
+             "while the museums along the river show art from every period of its history").split()
+
+    def __init__(self, tool_calls: int = 2, answer_tokens: int = 300, list_items: int = 3,
+                 results: int = 4, page_bytes: int = 20_000):
+        self.tool_calls = tool_calls
+        self.answer_tokens = answer_tokens
+        self.list_items = list_items
+        self.results = results
+        self.page_bytes = page_bytes
+
+    def handle(self, kind: str, payload: Dict[str, Any], base: str, auth: Dict[str, str]) -> Reply:
+        if kind == "llm":
+            return Reply({"content": self.answer(payload, base)})
+        if kind == "serper":
+            query = str(payload.get("q", ""))
+            organic = [
+                {"title": f"{query} - result {i}", "link": f"https://example.com/{i}/{quote(query)}",
+                 "snippet": " ".join(self.WORDS[:20]), "position": i + 1}
+                for i in range(int(payload.get("num") or self.results))
+            ]
+            return Reply({"searchParameters": payload, "organic": organic})
+        return Reply({"html": self.page(original_url(str(payload.get("url", ""))))})
+
+    def text(self, tokens: int) -> str:
+        count = max(1, tokens * 3 // 4)
+        return " ".join(self.WORDS[i % len(self.WORDS)] for i in range(count)).capitalize() + "."
+
+    def page(self, url: str) -> str:
+        paragraph = f"<p>{self.text(60)}</p>"
+        body = paragraph * max(1, self.page_bytes // len(paragraph))
+        return f"<html><head><title>{url}</title></head><body><h1>{url}</h1>{body}</body></html>"
+
+    def answer(self, payload: Dict[str, Any], base: str) -> str:
+        prompt = "\n".join(message_text(payload))
+        tools = self.TOOL_RE.findall(prompt)
+        # crewai appends each tool result to the agent's own message as "Observation:"
+        done = sum(text.count("\nObservation:") for text in message_text(payload, "assistant"))
+        if tools and done < self.tool_calls:
+            name, arguments = tools[done % len(tools)]
+            task = self.TASK_RE.search(prompt)
+            urls = self.URL_RE.findall("\n".join(message_text(payload, "assistant")))
+            try:
+                names = list(ast.literal_eval(arguments))
+            except (ValueError, SyntaxError):
+                names = ["query"]
+            values = {
+                arg: (urls[-1] if urls else page_url(base, "https://example.com/"))
+                if "url" in arg or "website" in arg else (task.group(1)[:60] if task else "travel")
+                for arg in names
+            }
+            return f"Thought: I need {name}\nAction: {name}\nAction Input: {json.dumps(values)}"
+        if self.FORMAT_MARK in prompt:
+            schema = _Schema(prompt.split(self.FORMAT_MARK, 1)[1], self.list_items, self.text(40))
+            answer = json.dumps(schema.sample())
+        else:
+            answer = self.text(self.answer_tokens)
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+class _Schema:
+    """Sample values for crewai's ``generate_model_description`` format."""
+
+    TOKEN_RE = re.compile(r'\s*("[^"]*"|\w+|\S)')
+    SCALARS = {"int": 1, "float": 4.5, "bool": True}
+
+    def __init__(self, text: str, list_items: int, words: str):
+        self.tokens = self.TOKEN_RE.findall(text)
+        self.position = 0
+        self.list_items = list_items
+        self.words = words
+
+    def next(self) -> str:
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+    def parse(self) -> Tuple[str, Any]:
+        token = self.next()
+        if token == "{":
+            fields = {}
+            while True:
+                name = self.next().strip('"')
+                self.next()  # ':'
+                fields[name] = self.parse()
+                if self.next() == "}":
+                    return "object", fields
+        args = []
+        if self.position < len(self.tokens) and self.tokens[self.position] == "[":
+            self.next()
+            while True:
+                args.append(self.parse())
+                if self.next() == "]":
+                    break
+        return token, args
+
+    def sample(self, node: Optional[Tuple[str, Any]] = None, field: str = "") -> Any:
+        kind, args = node or self.parse()
+        if kind == "object":
+            return {name: self.sample(value, name) for name, value in args.items()}
+        if kind == "List":
+            return [self.sample(args[0], field) for _ in range(self.list_items)]
+        if kind in ("Optional", "Union"):
+            return self.sample(args[0], field)
+        if kind == "Dict":
+            return {"key": self.sample(args[1], field)}
+        if kind in self.SCALARS:
+            return self.SCALARS[kind]
+        return f"{field.replace('_', ' ').capitalize()}: {self.words}" if field else self.words
+
+
+class RecordingBackend:
+    """Forwards to the real services and writes every reply to the cassette."""
+
+    def __init__(self, cassette: Cassette, upstreams: Dict[str, str] = UPSTREAMS):
+        import requests
+
+        self.cassette = cassette
+        self.upstreams = upstreams
+        self.session = requests.Session()
+
+    def handle(self, kind: str, payload: Dict[str, Any], base: str, auth: Dict[str, str]) -> Reply:
+        started = time.perf_counter()
+        if kind == "llm":
+            body = {name: value for name, value in payload.items() if name not in ("stream", "stream_options")}
+            response = self.session.post(f"{self.upstreams['llm']}/chat/completions", json=body,
+                                         headers={"Authorization": auth.get("authorization", "")}, timeout=600)
+            response.raise_for_status()
+            completion = response.json()
+            usage = completion.get("usage") or {}
+            result = {"content": completion["choices"][0]["message"].get("content") or "",
+                      "usage": [usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)]}
+        elif kind == "serper":
+            response = self.session.post(f"{self.upstreams['serper']}/{auth['path']}", json=payload,
+                                         headers={"X-API-KEY": auth.get("x-api-key", "")}, timeout=30)
+            response.raise_for_status()
+            result = response.json()
+        elif kind == "browserless":
+            response = self.session.post(
+                f"{self.upstreams['browserless']}/content?token={auth.get('token', '')}",
+                json={**payload, "url": original_url(str(payload.get("url", "")))}, timeout=60,
+            )
+            response.raise_for_status()
+            result = {"html": response.text}
+        else:
+            response = self.session.get(payload["url"], timeout=30, headers={"User-Agent": "Mozilla/5.0"})
+            result = {"html": response.text}
+        reply = Reply(result, round(time.perf_counter() - started, 3))
+        # Answers quote the links we handed out; replays run on other ports
+        self.cassette.add(kind, request_key(kind, payload, base), reply._replace(body=masked(result, base)))
+        return reply
+
+
+class ReplayBackend:
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def handle(self, kind: str, payload: Dict[str, Any], base: str, auth: Dict[str, str]) -> Reply:
+        reply = self.cassette.take(request_key(kind, payload, base))
+        return reply._replace(body=masked(reply.body, base, unmask=True))
+
+
+class StandIn:
+    def __init__(self, backend, latency: float = 0.0, tokens_per_second: float = 0.0,
+                 tool_latency: float = 0.0, replay_timing: bool = False, chunk_chars: int = 16,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.backend = backend
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.tool_latency = tool_latency
+        self.replay_timing = replay_timing
+        self.chunk_chars = chunk_chars
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.standin = self
+        self.base = f"http://{host}:{self.server.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, **amounts: int):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counters[name] += amount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def reset(self):
+        with self._lock:
+            self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def delay(self, reply: Reply, completion_tokens: int = 0) -> float:
+        if self.replay_timing and isinstance(self.backend, ReplayBackend):
+            return reply.seconds
+        if completion_tokens == 0:
+            return self.tool_latency
+        rate = completion_tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+        return self.latency + rate
+
+    def complete(self, payload: Dict[str, Any], auth: Dict[str, str]) -> Tuple[Reply, str, List[int]]:
+        reply = self.backend.handle("llm", payload, self.base, auth)
+        content = reply.body["content"]
+        usage = reply.body.get("usage") or [
+            sum(estimate_tokens(text) for text in message_text(payload)), estimate_tokens(content)
+        ]
+        self.count(llm_calls=1, prompt_tokens=usage[0], completion_tokens=usage[1])
+        return reply, content, usage
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def standin(self) -> StandIn:
+        return self.server.standin
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, value: Any):
+        self._send(status, json.dumps(value).encode("utf-8"))
+
+    def _auth(self, url) -> Dict[str, str]:
+        auth = {name.lower(): value for name, value in self.headers.items()}
+        auth["token"] = parse_qs(url.query).get("token", [""])[0]
+        auth["path"] = url.path.strip("/")
+        return auth
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            return self._json(200, self.standin.stats())
+        if url.path != "/page":
+            return self._json(404, {"error": f"no route for GET {url.path}"})
+        target = parse_qs(url.query).get("url", [""])[0]
+        self._tool("page", {"url": target}, url, lambda reply: (reply.body["html"].encode("utf-8"), "text/html"))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if url.path == "/stats":
+            self.standin.reset()
+            return self._json(200, self.standin.stats())
+        if url.path.rstrip("/").endswith("/chat/completions"):
+            return self._complete(payload, url)
+        if url.path == "/content":
+            return self._tool("browserless", payload, url,
+                              lambda reply: (reply.body["html"].encode("utf-8"), "text/html"))
+        if url.path in ("/search", "/news", "/images", "/places"):
+            return self._tool("serper", payload, url, lambda reply: (
+                json.dumps(route_links(reply.body, self.standin.base)).encode("utf-8"), "application/json"))
+        self._json(404, {"error": f"no route for POST {url.path}"})
+
+    def _tool(self, kind: str, payload: Dict[str, Any], url, render):
+        try:
+            reply = self.standin.backend.handle(kind, payload, self.standin.base, self._auth(url))
+        except Miss as miss:
+            self.standin.count(misses=1)
+            return self._json(404, {"error": f"{kind} request not in the cassette ({miss})"})
+        self.standin.count(tool_calls=1)
+        time.sleep(self.standin.delay(reply))
+        body, content_type = render(reply)
+        self._send(200, body, content_type)
+
+    def _complete(self, payload: Dict[str, Any], url):
+        try:
+            reply, content, usage = self.standin.complete(payload, self._auth(url))
+        except Miss as miss:
+            self.standin.count(misses=1)
+            return self._json(404, {"error": {"message": f"completion not in the cassette ({miss})",
+                                              "type": "invalid_request_error"}})
+        seconds = self.standin.delay(reply, usage[1])
+        head = {"id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "created": int(time.time()),
+                "model": payload.get("model", "standin")}
+        if not payload.get("stream"):
+            time.sleep(seconds)
+            return self._json(200, {
+                **head, "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": usage[0], "completion_tokens": usage[1],
+                          "total_tokens": usage[0] + usage[1]},
+            })
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        pieces = [content[i:i + self.standin.chunk_chars] for i in range(0, len(content), self.standin.chunk_chars)]
+        chunk = {**head, "object": "chat.completion.chunk"}
+        events = [{**chunk, "choices": [{"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}]}]
+        events += [{**chunk, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                   for piece in pieces]
+        events.append({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            events.append({**chunk, "choices": [], "usage": {
+                "prompt_tokens": usage[0], "completion_tokens": usage[1], "total_tokens": usage[0] + usage[1]}})
+        for event in events:
+            time.sleep(seconds / len(events))
+            self.wfile.write(b"data: " + json.dumps(event).encode("utf-8") + b"\n\n")
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def backend_for(mode: str, cassette: Optional[str], **synthetic):
+    if mode == "synthetic":
+        return SyntheticBackend(**synthetic)
+    if not cassette:
+        raise SystemExit(f"--mode {mode} needs --cassette")
+    if mode == "record":
+        return RecordingBackend(Cassette(cassette))
+    replayed = Cassette(cassette)
+    if not len(replayed):
+        raise SystemExit(f"{cassette} has no recorded calls")
+    return ReplayBackend(replayed)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--mode", choices=("synthetic", "record", "replay"), default="synthetic")
+    parser.add_argument("--cassette", help="JSONL file of recorded calls (record, replay)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per LLM call")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="completion speed added to --latency (0: instant)")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="seconds per search or page")
+    parser.add_argument("--replay-timing", action="store_true", help="replay calls as slowly as they were recorded")
+    parser.add_argument("--tool-calls", type=int, default=2, help="synthetic tool calls per agent task")
+
+
+def from_args(args, port: int = 0) -> StandIn:
+    backend = backend_for(args.mode, args.cassette, tool_calls=args.tool_calls)
+    return StandIn(backend, args.latency, args.tokens_per_second, args.tool_latency, args.replay_timing, port=port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in OpenAI, Serper and browserless server.")
+    add_arguments(parser)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    standin = from_args(args, args.port)
+    print(f"{args.mode} stand-in on {standin.base}\n"
+          f"  OPENAI_API_BASE={standin.base}/v1 SERPER_BASE_URL={standin.base} BROWSERLESS_URL={standin.base}")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
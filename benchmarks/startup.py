@@ -0,0 +1,111 @@
+"""Startup profile of the API and the CLIs.
+
+For each entry point, imports it in a fresh interpreter with
+``-X importtime`` and prints the total import time and the slowest
+top-level imports. Crew modules that should load lazily are flagged if
+they show up. Then it starts ``uvicorn watson_x_api:app`` and reports how
+long after process start ``/health`` first answers, with and without
+``TRAVEL_PREWARM``.
+
+    python benchmarks/startup.py [--top 8] [--skip-server]
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# label: (module, working directory, extra sys.path entry)
+ENTRY_POINTS = {
+    "watson_x_api": ("watson_x_api", ROOT, ROOT),
+    "surprise_travel CLI": ("surprise_travel.main", ROOT, os.path.join(ROOT, "surprise_trip", "src")),
+    "trip_planner CLI": ("main", os.path.join(ROOT, "trip_planner"), os.path.join(ROOT, "trip_planner")),
+    "write_a_book kickoff": ("write_a_book_with_flows.main", ROOT,
+                             os.path.join(ROOT, "write_a_book_with_flows", "src")),
+}
+LAZY = ("crewai", "crewai_tools", "langchain", "langchain_openai", "unstructured")
+
+
+def importtime(module: str, cwd: str, path: str):
+    env = {**os.environ, "PYTHONPATH": path, "TRAVEL_JOB_DB": os.path.join(tempfile.mkdtemp(), "jobs.db")}
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((int(cumulative_us), depth, name.strip()))
+    failed = result.returncode != 0 and result.stderr.strip().splitlines()[-1]
+    return wall, imports, failed
+
+
+def report(label: str, module: str, cwd: str, path: str, top: int):
+    wall, imports, failed = importtime(module, cwd, path)
+    print(f"\n{label} (import {module}): {wall:.2f} s wall")
+    if failed:
+        print(f"  import failed: {failed}")
+    top_level = sorted((entry for entry in imports if entry[1] == 1), reverse=True)
+    for cumulative, _, name in top_level[:top]:
+        print(f"  {cumulative / 1e6:7.3f} s  {name}")
+    loaded = sorted({name for _, _, name in imports if name in LAZY})
+    if loaded:
+        print(f"  loaded eagerly: {', '.join(loaded)}")
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def time_to_health(prewarm: bool, timeout: float = 60.0) -> float:
+    port = free_port()
+    env = {**os.environ, "TRAVEL_JOB_DB": os.path.join(tempfile.mkdtemp(), "jobs.db"),
+           "PYTHONPATH": os.path.join(ROOT, "surprise_trip", "src")}
+    if prewarm:
+        env["TRAVEL_PREWARM"] = "1"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "watson_x_api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                connection.request("GET", "/health")
+                if connection.getresponse().status == 200:
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        return float("nan")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--skip-server", action="store_true")
+    args = parser.parse_args()
+    for label, (module, cwd, path) in ENTRY_POINTS.items():
+        report(label, module, cwd, path, args.top)
+    if not args.skip_server:
+        print()
+        for prewarm in (False, True):
+            print(f"first /health after process start (prewarm={prewarm}): "
+                  f"{time_to_health(prewarm) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
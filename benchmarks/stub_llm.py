@@ -0,0 +1,81 @@
+"""Offline stand-in for the crew's LLM.
+
+``StubLLM`` answers every call with a ``Final Answer`` after sleeping for
+a fixed latency, so a crew runs end to end without network access or API
+keys, and its wall time depends only on how the tasks are scheduled. The
+itinerary compiler gets JSON that validates as an ``Itinerary``, with
+``days`` day plans.
+
+With ``stream`` set (``stream_itinerary`` sets it), the answer is also
+emitted as ``LLMStreamChunkEvent`` pieces spread over the latency, the way
+a streaming model delivers tokens.
+"""
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from crewai import BaseLLM
+from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+
+ITINERARY = {
+    "name": "The Great Benchmark Getaway",
+    "hotel": "Hotel Stub, 1 Main Street",
+    "day_plans": [
+        {
+            "date": "Day 1",
+            "flight": "BOS 08:00 -> LIS 19:30",
+            "restaurants": ["Taberna Stub"],
+            "activities": [{
+                "name": "Old town walk", "location": "Alfama", "description": "A slow walk uphill.",
+                "date": "Day 1", "cousine": "Portuguese", "why_its_suitable": "Easy first day.",
+                "reviews": ["Lovely"], "rating": 4.6,
+            }],
+        },
+    ],
+}
+
+
+def itinerary(days: int) -> Dict[str, Any]:
+    day = ITINERARY["day_plans"][0]
+    plans = [{**day, "date": f"Day {number}", "flight": day["flight"] if number == 1 else None}
+             for number in range(1, days + 1)]
+    return {**ITINERARY, "day_plans": plans}
+
+
+class StubLLM(BaseLLM):
+    def __init__(self, latency: float = 0.5, model: str = "stub", days: int = 1, chunk_chars: int = 16):
+        super().__init__(model=model)
+        self.latency = latency
+        self.days = days
+        self.chunk_chars = chunk_chars
+        self.stream = False
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        with self._lock:
+            self.calls += 1
+        prompt = messages if isinstance(messages, str) else messages[0]["content"]
+        if "Itinerary Compiler" in prompt:
+            answer = json.dumps(itinerary(self.days))
+        else:
+            answer = "1. Old town walk in Alfama, rated 4.6.\n2. Dinner at Taberna Stub, rated 4.4."
+        text = f"Thought: I now know the final answer\nFinal Answer: {answer}"
+        if not self.stream:
+            time.sleep(self.latency)
+            return text
+        pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+        for piece in pieces:
+            time.sleep(self.latency / len(pieces))
+            crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=piece))
+        return text
+
+    def supports_function_calling(self) -> bool:
+        return False
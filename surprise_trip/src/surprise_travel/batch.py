@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+"""Plan many surprise trips without prompts: JSONL profiles in, JSONL itineraries out.
+
+Each input line is a traveler profile::
+
+    {"id": "c-104", "origin": "Boston", "destination": "Lisbon", "age": 34,
+     "dates": "May 3-10", "duration": "7 days", "hotel_style": "boutique"}
+
+``id`` and ``interests`` are optional; without an id the profile's content
+hash is used. Profiles run on ``--concurrency`` crews at once, each a copy
+of the process's template crew, and each result is appended to the output
+as soon as its crew finishes::
+
+    {"id": "c-104", "status": "ok", "source": "crew", "seconds": 81.2, "itinerary": {...}}
+    {"id": "c-105", "status": "error", "seconds": 3.1, "error": "..."}
+
+A line that is not a JSON object gets an error result with the id
+``line-<number>``, and the rest of the batch carries on.
+
+Running again with the same output file skips every id that already has an
+``ok`` line, so an interrupted or partly failed batch resumes where it
+stopped and only retries the failures.
+
+Profiles close to one already in the itinerary store are answered from it
+(``source: "reuse"``) or compiled from it without the research tasks
+(``source: "seed"``), and every new itinerary is added to it; ``--no-store``
+runs the full crew for every profile.
+
+    surprise_travel_batch profiles.jsonl -o itineraries.jsonl -c 8
+    cat profiles.jsonl | surprise_travel_batch - -o -
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Set, TextIO, Union
+
+from surprise_travel.itinerary_store import ItineraryStore, itinerary_store
+from surprise_travel.itinerary_store import profile as store_profile
+
+REQUIRED = ("origin", "destination", "age", "dates", "duration", "hotel_style")
+
+
+def profile_id(profile: Dict[str, Any]) -> str:
+    if profile.get("id") is not None:
+        return str(profile["id"])
+    canonical = json.dumps(profile, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def crew_inputs(profile: Dict[str, Any]) -> Dict[str, str]:
+    """The task variables ``main.run`` builds from its prompts."""
+    missing = [field for field in REQUIRED if profile.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"profile is missing {', '.join(missing)}")
+    origin, destination = str(profile["origin"]), str(profile["destination"])
+    return {
+        'origin': origin,
+        'destination': destination,
+        'age': str(profile["age"]),
+        'hotel_location': f"{profile['hotel_style']} hotel in {destination}",
+        'flight_information': f"Round-trip flights from {origin} to {destination} on {profile['dates']}",
+        'trip_duration': str(profile["duration"]),
+    }
+
+
+class BadLine(NamedTuple):
+    """An input line that is not a JSON object; it gets an error result."""
+    number: int
+    error: str
+
+    def record(self) -> Dict[str, Any]:
+        return {"id": f"line-{self.number}", "status": "error", "seconds": 0.0, "error": self.error}
+
+
+def read_profiles(lines: Iterable[str]) -> Iterator[Union[Dict[str, Any], BadLine]]:
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            profile = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield BadLine(number, f"line {number}: {exc}")
+            continue
+        if not isinstance(profile, dict):
+            yield BadLine(number, f"line {number}: expected a JSON object")
+            continue
+        yield profile
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids with an ``ok`` result in an earlier run's output."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as existing:
+        for line in existing:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short when the last run was killed
+            if record.get("status") == "ok":
+                done.add(str(record["id"]))
+    return done
+
+
+@lru_cache(maxsize=None)
+def quiet_factory():
+    """Crews without console logs, which would interleave across threads.
+
+    Every new crew sets crewai's shared console to its own verbosity, so a
+    verbose copy would switch logging back on for the crews already running.
+    """
+    from surprise_travel.factory import CrewFactory
+
+    return CrewFactory(verbose=False)
+
+
+def default_crew(seeded: bool = False):
+    return quiet_factory().seeded() if seeded else quiet_factory().crew()
+
+
+def plan(profile: Dict[str, Any], make_crew: Callable[..., Any],
+         store: Optional[ItineraryStore] = None) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"id": profile_id(profile)}
+    started = time.perf_counter()
+    try:
+        inputs = crew_inputs(profile)
+        wanted = match = None
+        if store is not None:
+            wanted = store_profile(profile["destination"], profile["duration"], profile["age"],
+                                   profile["hotel_style"], profile.get("interests", ""),
+                                   profile["origin"], profile["dates"])
+            match = store.lookup(wanted)
+        if match is not None and match.kind == "reuse":
+            store.record(match, 0.0)
+            record.update(status="ok", source="reuse", itinerary=match.itinerary)
+        else:
+            if match is not None:
+                inputs["seed_itinerary"] = json.dumps(match.itinerary)
+            result = make_crew(seeded=match is not None).kickoff(inputs=inputs)
+            elapsed = time.perf_counter() - started
+            if match is not None:
+                store.record(match, elapsed)
+            if result.json_dict:
+                record.update(status="ok", source=match.kind if match else "crew", itinerary=result.json_dict)
+                if store is not None:
+                    store.save(wanted, result.json_dict, max(elapsed, match.seconds) if match else elapsed)
+            else:
+                record.update(status="error", error="crew returned no itinerary JSON", raw=result.raw)
+    except Exception as exc:
+        record.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_batch(
+    profiles: Iterable[Union[Dict[str, Any], BadLine]],
+    out: TextIO,
+    concurrency: int = 4,
+    skip: Optional[Set[str]] = None,
+    make_crew: Callable[..., Any] = default_crew,
+    progress: Optional[TextIO] = sys.stderr,
+    store: Optional[ItineraryStore] = None,
+) -> Dict[str, int]:
+    """Plan every profile not in ``skip`` and write one line per result as it lands.
+
+    Profiles are read as crews free up, with at most twice ``concurrency``
+    in flight, so a batch of any size runs in steady memory.
+    """
+    skip = skip or set()
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    seen = set()
+
+    def write(record: Dict[str, Any]) -> None:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        counts[record["status"]] += 1
+        if progress is not None:
+            detail = record.get("error", "")
+            print(f"{record['status']:<5} {record['id']} {record['seconds']:.1f}s {detail}".rstrip(),
+                  file=progress, flush=True)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+        pending = set()
+        for profile in profiles:
+            if isinstance(profile, BadLine):
+                write(profile.record())
+                continue
+            key = profile_id(profile)
+            if key in skip or key in seen:
+                counts["skipped"] += 1
+                continue
+            seen.add(key)
+            pending.add(pool.submit(plan, profile, make_crew, store))
+            while len(pending) >= 2 * concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                write(future.result())
+    return counts
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Plan surprise trips for a JSONL file of traveler profiles.")
+    parser.add_argument("profiles", nargs="?", default="-", help="JSONL profiles, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL results, appended to; - for stdout")
+    parser.add_argument("-c", "--concurrency", type=int,
+                        default=int(os.environ.get("TRAVEL_BATCH_CONCURRENCY", "4")))
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing output file instead of resuming")
+    parser.add_argument("--no-store", action="store_true",
+                        help="plan every profile with the full crew, without reusing stored itineraries")
+    args = parser.parse_args()
+
+    skip = set()
+    if args.output != "-":
+        if not args.fresh:
+            skip = completed_ids(args.output)
+        out = open(args.output, "w" if args.fresh else "a", encoding="utf-8")
+    else:
+        # Results keep the real stdout; anything else printed goes to stderr
+        out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+        sys.stdout = sys.stderr
+    source = sys.stdin if args.profiles == "-" else open(args.profiles, encoding="utf-8")
+    store = None if args.no_store else itinerary_store()
+    started = time.perf_counter()
+    try:
+        counts = run_batch(read_profiles(source), out, max(1, args.concurrency), skip, store=store)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        out.close()
+    print(f"{counts['ok']} planned, {counts['error']} failed, {counts['skipped']} skipped"
+          f" in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    if store is not None:
+        stats = store.stats()
+        print(f"itinerary store: {stats['reused']} reused, {stats['seeded']} seeded, {stats['missed']} missed"
+              f" ({stats['hit_ratio']:.0%} hits), {stats['seconds_saved']:.0f}s of crew time saved",
+              file=sys.stderr)
+    if counts["error"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -5,7 +5,8 @@ from crewai.project import CrewBase, agent, crew, task
 # from surprise_travel.tools.custom_tool import MyCustomTool
 
 # Check our tools documentation for more information on how to use them
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+# Shared instances of SerperDevTool and ScrapeWebsiteTool over one connection pool
+from surprise_travel.tools.registry import scrape_tool, search_tool
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
@@ -40,7 +41,7 @@ class SurpriseTravelCrew():
     def personalized_activity_planner(self) -> Agent:
         return Agent(
             config=self.agents_config['personalized_activity_planner'],
-            tools=[SerperDevTool(), ScrapeWebsiteTool()], # Example of custom tool, loaded at the beginning of file
+            tools=[search_tool(), scrape_tool()], # Example of custom tool, loaded at the beginning of file
             verbose=True,
             allow_delegation=False,
         )
@@ -49,7 +50,7 @@ class SurpriseTravelCrew():
     def restaurant_scout(self) -> Agent:
         return Agent(
             config=self.agents_config['restaurant_scout'],
-            tools=[SerperDevTool(), ScrapeWebsiteTool()],
+            tools=[search_tool(), scrape_tool()],
             verbose=True,
             allow_delegation=False,
         )
@@ -58,7 +59,7 @@ class SurpriseTravelCrew():
     def itinerary_compiler(self) -> Agent:
         return Agent(
             config=self.agents_config['itinerary_compiler'],
-            tools=[SerperDevTool()],
+            tools=[search_tool()],
             verbose=True,
             allow_delegation=False,
         )
@@ -0,0 +1,70 @@
+"""Per-request crews copied from one template crew.
+
+``SurpriseTravelCrew().crew()`` re-reads both YAML configs and validates
+every agent and task from scratch. The factory does that once per process
+and hands out ``Crew.copy()`` clones. Each clone has its own agents, tasks
+and LLM handles, so callbacks, interpolated inputs and outputs never leak
+between concurrent requests. The tools are shared on purpose: they are the
+process-wide pooled instances from ``tools.registry``.
+
+The template itself is never kicked off, so it keeps its uninterpolated
+prompts. ``seeded()`` hands out a copy that only runs the itinerary
+compilation, starting from a stored plan (see ``itinerary_store``).
+``verbose`` overrides the crew's and its agents' console logging
+on the template, and through it on every copy.
+"""
+import threading
+from functools import lru_cache
+from typing import Optional
+
+from crewai import Crew
+
+from surprise_travel.crew import SurpriseTravelCrew
+
+SEED_PROMPT = """
+
+A previously compiled itinerary for a similar traveler is below. Adapt it
+to this traveler instead of researching from scratch: keep what suits them,
+replace what doesn't, and use the search tool only to fill gaps.
+
+{seed_itinerary}"""
+
+
+class CrewFactory:
+    def __init__(self, crew_class=SurpriseTravelCrew, verbose: Optional[bool] = None):
+        self.crew_class = crew_class
+        self.verbose = verbose
+        self._template: Optional[Crew] = None
+        self._lock = threading.Lock()
+
+    @property
+    def template(self) -> Crew:
+        if self._template is None:
+            with self._lock:
+                if self._template is None:
+                    template = self.crew_class().crew()
+                    if self.verbose is not None:
+                        template.verbose = self.verbose
+                        for agent in template.agents:
+                            agent.verbose = self.verbose
+                    self._template = template
+        return self._template
+
+    def crew(self) -> Crew:
+        """A fresh crew, isolated from every other crew handed out."""
+        return self.template.copy()
+
+    def seeded(self, compile_task: str = "itinerary_compilation_task") -> Crew:
+        """A copy running only ``compile_task``, seeded through a ``seed_itinerary`` input."""
+        crew = self.crew()
+        task = next(task for task in crew.tasks if task.name == compile_task)
+        task.context = []
+        task.description += SEED_PROMPT
+        crew.tasks = [task]
+        crew.agents = [task.agent]
+        return crew
+
+
+@lru_cache(maxsize=None)
+def crew_factory() -> CrewFactory:
+    return CrewFactory()
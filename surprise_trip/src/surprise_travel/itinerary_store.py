@@ -0,0 +1,216 @@
+"""Persistent store of generated itineraries, looked up by traveler profile.
+
+Every itinerary the crew produces is saved under its profile: destination,
+trip length in days, age band (decade), hotel style, interests, and the
+trip itself (origin and travel dates). A new profile is matched against
+plans with the same destination and length:
+
+- same trip, age band and hotel style, and interests overlapping by at
+  least ``reuse_threshold`` (Jaccard similarity of the interest words): the
+  stored plan is returned as is (``reuse``). Stored plans carry their
+  flights and dates, so they are only reused for the same trip;
+- same age band and interests overlapping by at least ``seed_threshold``,
+  from any origin and on any dates: the stored plan is handed to
+  ``itinerary_compilation_task`` as a starting point, and the research
+  tasks are skipped (``seed``, see ``CrewFactory.seeded``).
+
+An identical profile is a point lookup. Otherwise both matches come from
+range scans over one covering index: sqlite scores every plan in the
+range and returns the closest, newest first on ties, so lookups grow with
+the plans for one destination, length and age band, not with the store.
+Each plan also records how long it took to generate, so the store can
+report the crew time its hits saved.
+
+``TRAVEL_ITINERARY_STORE_PATH``   sqlite file (default itinerary_store.db)
+``TRAVEL_ITINERARY_REUSE``        reuse threshold (default 0.75)
+``TRAVEL_ITINERARY_SEED``         seed threshold (default 0.25)
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS itineraries ("
+    " id INTEGER PRIMARY KEY, destination TEXT NOT NULL, days INTEGER NOT NULL,"
+    " age_band INTEGER NOT NULL, hotel TEXT NOT NULL, interests TEXT NOT NULL,"
+    " itinerary TEXT NOT NULL, seconds REAL NOT NULL, created REAL NOT NULL, trip TEXT NOT NULL DEFAULT '')",
+    # Stores from before the trip column: their plans can seed but never be reused
+    "DROP INDEX IF EXISTS itineraries_profile",
+    "CREATE UNIQUE INDEX IF NOT EXISTS itineraries_trip_profile"
+    " ON itineraries (destination, days, age_band, hotel, trip, interests)",
+)
+
+_DURATION_RE = re.compile(r"(\d+)\s*(day|night|week)", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"\d+")
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_STOPWORDS = frozenset(
+    "a an and are as at for from i in into is it like love me my of on or some the to with".split()
+)
+
+
+class Profile(NamedTuple):
+    destination: str
+    days: int
+    age_band: int
+    hotel: str
+    interests: FrozenSet[str]
+    trip: str = ""
+
+
+class Match(NamedTuple):
+    kind: str                  # "reuse" or "seed"
+    itinerary: Dict[str, Any]
+    score: float
+    seconds: float             # what generating the stored plan took
+
+
+def profile(destination: str, duration: str, age: Any, hotel: str, interests: str = "",
+            origin: str = "", dates: str = "") -> Profile:
+    """Normalize a traveler profile into the fields plans are indexed on."""
+    match = _DURATION_RE.search(str(duration))
+    days = int(match.group(1)) * (7 if match.group(2).lower() == "week" else 1) if match else 0
+    age_match = _NUMBER_RE.search(str(age))
+    words = _WORD_RE.findall(str(hotel).casefold())
+    return Profile(
+        destination=" ".join(str(destination).split()).casefold(),
+        days=days,
+        age_band=int(age_match.group()) // 10 * 10 if age_match else -1,
+        hotel=words[0] if words else "",
+        interests=frozenset(_WORD_RE.findall(str(interests).casefold())) - _STOPWORDS,
+        trip=" ".join(f"{origin} | {dates}".casefold().split()),
+    )
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@lru_cache(maxsize=4096)
+def _words(interests: str) -> FrozenSet[str]:
+    return frozenset(interests.split())
+
+
+def _interest_score(stored: str, wanted: str) -> float:
+    """``jaccard`` of two stored interest strings, for use inside sqlite."""
+    return jaccard(_words(stored), _words(wanted))
+
+
+class ItineraryStore:
+    def __init__(self, path: str, reuse_threshold: float = 0.75, seed_threshold: float = 0.25):
+        self.path = path
+        self.reuse_threshold = reuse_threshold
+        self.seed_threshold = seed_threshold
+        self.reused = 0
+        self.seeded = 0
+        self.missed = 0
+        self.seconds_saved = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.create_function("interest_score", 2, _interest_score, deterministic=True)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(itineraries)")}
+        if columns and "trip" not in columns:
+            self._conn.execute("ALTER TABLE itineraries ADD COLUMN trip TEXT NOT NULL DEFAULT ''")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    @classmethod
+    def from_env(cls) -> "ItineraryStore":
+        return cls(
+            os.environ.get("TRAVEL_ITINERARY_STORE_PATH", "itinerary_store.db"),
+            float(os.environ.get("TRAVEL_ITINERARY_REUSE", "0.75")),
+            float(os.environ.get("TRAVEL_ITINERARY_SEED", "0.25")),
+        )
+
+    def _best(self, where: str, params: tuple, interests: FrozenSet[str]):
+        """``(id, score)`` of the closest plan matching ``where``, or None."""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT id, interest_score(interests, ?) AS score FROM itineraries WHERE {where}"
+                " ORDER BY score DESC, id DESC LIMIT 1",
+                (" ".join(sorted(interests)), *params),
+            ).fetchone()
+
+    def _count(self, outcome: str):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _match(self, kind: str, row_id: int, score: float) -> Match:
+        with self._lock:
+            itinerary, seconds = self._conn.execute(
+                "SELECT itinerary, seconds FROM itineraries WHERE id = ?", (row_id,)
+            ).fetchone()
+        return Match(kind, json.loads(itinerary), score, seconds)
+
+    def lookup(self, wanted: Profile) -> Optional[Match]:
+        """The closest stored plan for ``wanted``, or None below the seed threshold."""
+        key = (wanted.destination, wanted.days, wanted.age_band, wanted.hotel, wanted.trip)
+        with self._lock:
+            exact = self._conn.execute(
+                "SELECT id FROM itineraries WHERE destination = ? AND days = ? AND age_band = ?"
+                " AND hotel = ? AND trip = ? AND interests = ?", (*key, " ".join(sorted(wanted.interests)))
+            ).fetchone()
+        best = (exact[0], 1.0) if exact else self._best(
+            "destination = ? AND days = ? AND age_band = ? AND hotel = ? AND trip = ?",
+            key, wanted.interests,
+        )
+        if best is not None and best[1] >= self.reuse_threshold:
+            self._count("reused")
+            return self._match("reuse", *best)
+        # Any hotel style, origin and dates will do for a starting point
+        other = self._best("destination = ? AND days = ? AND age_band = ?", key[:3], wanted.interests)
+        if other is not None and (best is None or other[1] > best[1]):
+            best = other
+        if best is not None and best[1] >= self.seed_threshold:
+            self._count("seeded")
+            return self._match("seed", *best)
+        self._count("missed")
+        return None
+
+    def save(self, saved: Profile, itinerary: Dict[str, Any], seconds: float):
+        """Store a generated plan; it replaces any plan for the identical profile."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO itineraries"
+                " (destination, days, age_band, hotel, interests, itinerary, seconds, created, trip)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (saved.destination, saved.days, saved.age_band, saved.hotel,
+                 " ".join(sorted(saved.interests)), json.dumps(itinerary), seconds, time.time(), saved.trip),
+            )
+
+    def record(self, match: Match, seconds: float):
+        """Count the crew time a match saved, given what the request took instead."""
+        with self._lock:
+            self.seconds_saved += max(0.0, match.seconds - seconds)
+
+    def counters(self) -> Dict[str, float]:
+        """Lookup outcomes and crew time saved so far."""
+        with self._lock:
+            return {"reused": self.reused, "seeded": self.seeded, "missed": self.missed,
+                    "seconds_saved": self.seconds_saved}
+
+    def stats(self) -> Dict[str, float]:
+        counters = self.counters()
+        lookups = counters["reused"] + counters["seeded"] + counters["missed"]
+        with self._lock:
+            stored = self._conn.execute("SELECT COUNT(*) FROM itineraries").fetchone()[0]
+        return {
+            "stored": stored,
+            "lookups": lookups,
+            **counters,
+            "hit_ratio": (counters["reused"] + counters["seeded"]) / lookups if lookups else 0.0,
+            "seconds_saved": round(counters["seconds_saved"], 3),
+        }
+
+
+@lru_cache(maxsize=None)
+def itinerary_store() -> ItineraryStore:
+    return ItineraryStore.from_env()
@@ -0,0 +1,251 @@
+"""Incremental parsing of the itinerary compiler's streamed JSON.
+
+``ItineraryParser`` reads ``Itinerary`` JSON in whatever pieces it
+arrives and emits an event for each part of it as soon as the part's
+closing byte is seen:
+
+    {"type": "name", "value": "..."}
+    {"type": "activity", "day": 1, "index": 0, "activity": {...}}
+    {"type": "day", "day": 1, "plan": {...}}
+    {"type": "hotel", "value": "..."}
+
+Days are numbered from 1. Only the day plan being written is buffered, so
+memory stays flat however long the itinerary is. Text before the opening
+brace (the agent's "Thought: ... Final Answer:") is skipped, and a part
+that is not valid JSON is dropped rather than failing the run.
+
+``stream_itinerary(crew, on_event)`` switches the compiler agent's LLM to
+streaming for one kickoff and feeds its chunks through a parser. crewai's
+console listener echoes every chunk to stdout and keeps all of them in a
+buffer for the life of the process. While itineraries stream, that
+handler skips the chunks of the compiler LLMs being parsed, and other LLMs
+are echoed as before; the handler is put back as it was once the last
+stream ends, and each LLM's ``stream`` setting is restored.
+"""
+import json
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+COMPILER_ROLE = "Itinerary Compiler"
+
+
+class ItineraryParser:
+    def __init__(self):
+        self._stack: List[list] = []   # [kind, key or index] per open container
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[List[str]] = None
+        self._want_key = False
+        self._literal = False
+        self._capture: Optional[List[str]] = None   # text of the day plan or top-level value being read
+        self._capture_depth = 0
+        self._capture_field = ""
+        self._day = 0
+        self._activity_start: Optional[int] = None
+        self._activity = 0
+        self._events: List[Dict[str, Any]] = []
+        self.done = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume a piece of text and return the events it completed."""
+        for char in text:
+            if self.done:
+                break
+            if self._in_string:
+                self._string_char(char)
+                continue
+            if self._literal and char in ',}] \t\r\n':
+                self._literal = False
+                self._end_value()
+            if not self._stack and char != '{':
+                continue
+            if char in ' \t\r\n':
+                self._take(char)
+            elif char == '"':
+                if self._want_key:
+                    self._want_key = False
+                    self._key = []
+                else:
+                    self._start_value()
+                self._take(char)
+                self._in_string = True
+            elif char in '{[':
+                self._start_value()
+                self._take(char)
+                self._stack.append([char, None if char == '{' else -1])
+                self._want_key = char == '{'
+            elif char in '}]':
+                self._take(char)
+                self._stack.pop()
+                self._want_key = False
+                self._end_value()
+            elif char == ',':
+                self._take(char)
+                self._want_key = self._stack[-1][0] == '{'
+            elif char == ':':
+                self._take(char)
+            else:
+                if not self._literal:
+                    self._start_value()
+                    self._literal = True
+                self._take(char)
+        events, self._events = self._events, []
+        return events
+
+    def _string_char(self, char: str):
+        self._take(char)
+        if self._escape:
+            self._escape = False
+        elif char == '\\':
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            if self._key is not None:
+                self._stack[-1][1] = json.loads('"' + "".join(self._key) + '"')
+                self._key = None
+            else:
+                self._end_value()
+            return
+        if self._key is not None:
+            self._key.append(char)
+
+    def _take(self, char: str):
+        if self._capture is not None:
+            self._capture.append(char)
+
+    def _path(self) -> tuple:
+        return tuple(frame[1] for frame in self._stack)
+
+    def _start_value(self):
+        if self._stack and self._stack[-1][0] == '[':
+            self._stack[-1][1] += 1
+        if self._capture is None:
+            path = self._path()
+            if len(path) == 2 and path[0] == "day_plans":
+                self._capture_field, self._day = "day_plans", path[1] + 1
+            elif len(path) == 1 and path[0] in ("name", "hotel"):
+                self._capture_field = path[0]
+            else:
+                return
+            self._capture = []
+            self._capture_depth = len(self._stack)
+        elif len(self._stack) == 4 and self._capture_field == "day_plans":
+            path = self._path()
+            if path[2] == "activities":
+                self._activity_start, self._activity = len(self._capture), path[3]
+
+    def _end_value(self):
+        depth = len(self._stack)
+        if not depth:
+            self.done = True
+        elif self._capture is None:
+            return
+        elif depth == self._capture_depth:
+            value = self._parse("".join(self._capture))
+            self._capture = None
+            if self._capture_field == "day_plans":
+                if isinstance(value, dict):
+                    self._events.append({"type": "day", "day": self._day, "plan": value})
+            elif value is not None:
+                self._events.append({"type": self._capture_field, "value": value})
+        elif depth == 4 and self._activity_start is not None:
+            value = self._parse("".join(self._capture[self._activity_start:]))
+            self._activity_start = None
+            if isinstance(value, dict):
+                self._events.append(
+                    {"type": "activity", "day": self._day, "index": self._activity, "activity": value}
+                )
+
+    @staticmethod
+    def _parse(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+
+class _Session:
+    """Parser for one streaming LLM; each new call starts a new parser."""
+
+    def __init__(self, on_event: EventCallback):
+        self.on_event = on_event
+        self.parser = ItineraryParser()
+
+    def restart(self):
+        self.parser = ItineraryParser()
+
+    def feed(self, chunk: str):
+        for event in self.parser.feed(chunk):
+            self.on_event(event)
+
+
+_sessions: Dict[int, _Session] = {}
+_sessions_lock = threading.Lock()
+_console: Dict[Callable, Callable] = {}   # crewai's console chunk handler -> its filtered stand-in
+
+
+@lru_cache(maxsize=None)
+def _listen():
+    """Route stream chunks to their sessions (once per process)."""
+    from crewai.utilities.events import LLMCallStartedEvent, LLMStreamChunkEvent, crewai_event_bus
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _call_started(source, _event):
+        session = _sessions.get(id(source))
+        if session is not None:
+            session.restart()
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _chunk(source, event):
+        session = _sessions.get(id(source))
+        if session is not None and event.tool_call is None:
+            session.feed(event.chunk)
+
+
+def _filter_console(on: bool):
+    """Keep crewai's console from echoing (and buffering) the chunks being parsed.
+
+    Swaps its chunk handler for one that skips LLMs with a session while any
+    session is open, and puts it back after the last; called with the lock held.
+    """
+    from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+
+    handlers = crewai_event_bus._handlers.get(LLMStreamChunkEvent, [])
+    for index, handler in enumerate(handlers):
+        if on and getattr(handler, "__name__", "") == "on_llm_stream_chunk":
+            def filtered(source, event, console=handler):
+                if id(source) not in _sessions:
+                    console(source, event)
+            _console[handler] = handlers[index] = filtered
+        elif not on and handler in _console.values():
+            handlers[index] = next(original for original, stand_in in _console.items() if stand_in is handler)
+    if not on:
+        _console.clear()
+
+
+@contextmanager
+def stream_itinerary(crew: Any, on_event: EventCallback, role: str = COMPILER_ROLE):
+    """Parse the itinerary as ``crew``'s compiler writes it, during the ``with`` block.
+
+    ``on_event`` is called from the thread running the compiler task.
+    """
+    _listen()
+    llm = next(agent.llm for agent in crew.agents if agent.role.strip() == role)
+    streaming = llm.stream
+    llm.stream = True
+    with _sessions_lock:
+        if not _sessions:
+            _filter_console(True)
+        _sessions[id(llm)] = _Session(on_event)
+    try:
+        yield
+    finally:
+        with _sessions_lock:
+            _sessions.pop(id(llm), None)
+            if not _sessions:
+                _filter_console(False)
+        llm.stream = streaming
@@ -1,28 +1,120 @@
 #!/usr/bin/env python
 import sys
 import json
-from surprise_travel.crew import SurpriseTravelCrew
+import importlib
+import threading
+
+# crewai takes seconds to import, so it loads while the questions are answered
+CREW_MODULE = "surprise_travel.crew"
+
+def preload(module):
+    """Import a module on a background thread, which is returned.
+
+    Join it before importing the module on this thread: two threads
+    importing the same modules can deadlock or see them half initialized.
+    """
+    loader = threading.Thread(target=importlib.import_module, args=(module,), daemon=True)
+    loader.start()
+    return loader
+
+def print_title(name):
+    print("\n" + "="*80)
+    print(f"🎪 {(name or 'YOUR SURPRISE ADVENTURE').upper()}")
+    print("="*80)
+
+def print_hotel(hotel):
+    print(f"\n🏨 ACCOMMODATION")
+    print(f"   {hotel}")
+
+def print_day_header(number, date):
+    print(f"\n📅 DAY {number}: {(date or f'Day {number}').upper()}")
+    print("-" * 60)
+
+def print_flight(flight):
+    print(f"✈️  FLIGHT: {flight}")
+    print()
+
+def print_activity(activity):
+    print(f"🎯 {activity.get('name', 'Activity')}")
+    print(f"   📍 Location: {activity.get('location', 'TBD')}")
+    print(f"   📝 {activity.get('description', 'No description')}")
+    
+    # Rating with stars
+    if activity.get('rating'):
+        rating = float(activity['rating'])
+        stars = "⭐" * int(rating)
+        print(f"   {stars} {rating}/5.0")
+    
+    # Reviews
+    reviews = activity.get('reviews', activity.get('review', []))
+    if reviews and len(reviews) > 0:
+        print(f"   💬 \"{reviews[0]}\"")
+    print()
+
+def print_restaurants(restaurants):
+    print("🍽️  DINING OPTIONS:")
+    for restaurant in restaurants:
+        print(f"   • {restaurant}")
+    print()
+
+def print_day_separator():
+    print("─" * 60)
+
+class ItineraryPrinter:
+    """Print itinerary stream events as they arrive: each activity as soon
+    as it is written, then the day's flight and restaurants when it closes"""
+
+    def __init__(self):
+        self.days = 0
+        self.hotel = None
+        self._day_open = False
+
+    def __call__(self, event):
+        if event['type'] == 'name':
+            print_title(event['value'])
+        elif event['type'] == 'hotel':
+            self.hotel = event['value']
+        elif event['type'] == 'activity':
+            self._open_day(event['day'], event['activity'].get('date'))
+            print_activity(event['activity'])
+        elif event['type'] == 'day':
+            plan = event['plan']
+            self._open_day(event['day'], plan.get('date'))
+            # The flight is written after the activities, so it comes last here
+            if plan.get('flight'):
+                print_flight(plan['flight'])
+            if plan.get('restaurants'):
+                print_restaurants(plan['restaurants'])
+            self.days += 1
+            self._day_open = False
+
+    def _open_day(self, number, date):
+        if self._day_open:
+            return
+        if number > 1:
+            print_day_separator()
+        print_day_header(number, date)
+        self._day_open = True
+
+def parse_itinerary(result):
+    """The itinerary dict from a kickoff result, dict or JSON string, or None"""
+    if hasattr(result, 'json_dict') and result.json_dict:
+        return result.json_dict
+    if hasattr(result, 'raw') and result.raw:
+        result = result.raw
+    if isinstance(result, dict):
+        return result
+    if isinstance(result, str):
+        try:
+            return json.loads(result)
+        except ValueError:
+            return None
+    return None
 
 def display_itinerary(result):
     """Display the itinerary in a beautiful, readable format"""
     
-    # Handle different result types
-    itinerary = None
-    
-    if hasattr(result, 'json_dict') and result.json_dict:
-        itinerary = result.json_dict
-    elif hasattr(result, 'raw') and result.raw:
-        try:
-            itinerary = json.loads(result.raw)
-        except:
-            itinerary = None
-    elif isinstance(result, dict):
-        itinerary = result
-    elif isinstance(result, str):
-        try:
-            itinerary = json.loads(result)
-        except:
-            itinerary = None
+    itinerary = parse_itinerary(result)
     
     # If we couldn't parse the itinerary, show what we got
     if not itinerary:
@@ -32,14 +124,11 @@ def display_itinerary(result):
         print(f"\n📋 Raw Result: {result}")
         return
     
-    print("\n" + "="*80)
-    print(f"🎪 {itinerary.get('name', 'YOUR SURPRISE ADVENTURE').upper()}")
-    print("="*80)
+    print_title(itinerary.get('name'))
     
     # Hotel information
     if itinerary.get('hotel'):
-        print(f"\n🏨 ACCOMMODATION")
-        print(f"   {itinerary['hotel']}")
+        print_hotel(itinerary['hotel'])
     
     # Day by day itinerary
     day_plans = itinerary.get('day_plans', [])
@@ -48,47 +137,26 @@ def display_itinerary(result):
         return
         
     for i, day in enumerate(day_plans, 1):
-        print(f"\n📅 DAY {i}: {day.get('date', f'Day {i}').upper()}")
-        print("-" * 60)
+        print_day_header(i, day.get('date'))
         
         # Flight info
         if day.get('flight'):
-            print(f"✈️  FLIGHT: {day['flight']}")
-            print()
+            print_flight(day['flight'])
         
         # Activities
-        activities = day.get('activities', [])
-        if activities:
-            for activity in activities:
-                print(f"🎯 {activity.get('name', 'Activity')}")
-                print(f"   📍 Location: {activity.get('location', 'TBD')}")
-                print(f"   📝 {activity.get('description', 'No description')}")
-                
-                # Rating with stars
-                if activity.get('rating'):
-                    rating = float(activity['rating'])
-                    stars = "⭐" * int(rating)
-                    print(f"   {stars} {rating}/5.0")
-                
-                # Reviews
-                reviews = activity.get('reviews', activity.get('review', []))
-                if reviews and len(reviews) > 0:
-                    print(f"   💬 \"{reviews[0]}\"")
-                print()
+        for activity in day.get('activities', []):
+            print_activity(activity)
         
         # Restaurants
-        restaurants = day.get('restaurants', [])
-        if restaurants:
-            print("🍽️  DINING OPTIONS:")
-            for restaurant in restaurants:
-                print(f"   • {restaurant}")
-            print()
+        if day.get('restaurants'):
+            print_restaurants(day['restaurants'])
         
         # Add separator between days
         if i < len(day_plans):
-            print("─" * 60)
+            print_day_separator()
 
 def run():
+    loader = preload(CREW_MODULE)
     print("🎪 Welcome to Your AI Travel Planning Team!")
     print("=" * 60)
     print("Our specialized agents will collaborate to create your perfect surprise trip\n")
@@ -133,13 +201,22 @@ def run():
     print(f"\n📋 Itinerary Compiler: Creating your {duration} itinerary...")
     print("🔍 Coordinating flights, hotels, and logistics...\n")
     
-    # Run the crew
-    crew = SurpriseTravelCrew()
-    result = crew.crew().kickoff(inputs=inputs)
+    # Run the crew, printing each day as the compiler writes it
+    loader.join()
+    from surprise_travel.crew import SurpriseTravelCrew
+    from surprise_travel.itinerary_stream import stream_itinerary
+    crew = SurpriseTravelCrew().crew()
+    printer = ItineraryPrinter()
+    with stream_itinerary(crew, printer):
+        result = crew.kickoff(inputs=inputs)
     
     # Display beautiful results
     print(f"\n🎉 YOUR SURPRISE TRIP TO {destination.upper()} IS READY!")
-    display_itinerary(result)
+    if printer.days:
+        if printer.hotel:
+            print_hotel(printer.hotel)
+    else:
+        display_itinerary(result)
     
     return result
 
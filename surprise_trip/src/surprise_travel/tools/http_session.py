@@ -0,0 +1,43 @@
+"""One keep-alive HTTP connection pool for every tool in the process.
+
+``TRAVEL_HTTP_POOL_SIZE``  connections kept open per host (default 16)
+``TRAVEL_HTTP_TIMEOUT``    read timeout in seconds (default 15)
+``TRAVEL_HTTP_CONNECT_TIMEOUT``  connect timeout in seconds (default 5)
+``TRAVEL_HTTP_RETRIES``    retries on connection errors, 429 and 5xx (default 2)
+"""
+import os
+from functools import lru_cache
+from typing import Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def timeout() -> Tuple[float, float]:
+    return (
+        float(os.environ.get("TRAVEL_HTTP_CONNECT_TIMEOUT", "5")),
+        float(os.environ.get("TRAVEL_HTTP_TIMEOUT", "15")),
+    )
+
+
+@lru_cache(maxsize=None)
+def session() -> requests.Session:
+    """The shared session; urllib3's pool is safe to use from many threads."""
+    pool_size = int(os.environ.get("TRAVEL_HTTP_POOL_SIZE", "16"))
+    retries = Retry(
+        total=int(os.environ.get("TRAVEL_HTTP_RETRIES", "2")),
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        # Serper searches are POSTs but safe to repeat.
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    pooled = requests.Session()
+    pooled.mount("https://", adapter)
+    pooled.mount("http://", adapter)
+    return pooled
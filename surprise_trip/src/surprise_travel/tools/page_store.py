@@ -0,0 +1,150 @@
+"""Content-addressed store of scraped page text.
+
+Pages are keyed by URL and record when they were fetched, their ETag and
+Last-Modified validators, and the sha256 of their extracted text. The text
+itself is stored zlib-compressed, once per distinct hash, so mirrors and
+URL variants of the same page share one copy. Raw HTML is never kept.
+
+A page fetched within the fresh window is served straight from the store,
+so the activity planner and the restaurant scout share each other's reads
+within a run. After that the page is revalidated with a conditional
+request, and a ``304`` returns the stored text. The compressed text is kept
+under a byte budget by evicting the least recently read pages.
+
+``TRAVEL_PAGE_STORE_PATH``     sqlite file (default page_store.db)
+``TRAVEL_PAGE_STORE_BYTES``    budget for compressed text (default 256 MiB)
+``TRAVEL_PAGE_FRESH_SECONDS``  serve without revalidating (default 21600)
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS page_text ("
+    " hash TEXT PRIMARY KEY, text BLOB NOT NULL, size INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS pages ("
+    " url TEXT PRIMARY KEY, hash TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+    " fetched REAL NOT NULL, accessed REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)",
+    "CREATE INDEX IF NOT EXISTS pages_hash ON pages (hash)",
+)
+
+
+class PageStore:
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, fresh_seconds: float = 6 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.hits = 0
+        self.revalidated = 0
+        self.fetched = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    @classmethod
+    def from_env(cls) -> "PageStore":
+        return cls(
+            os.environ.get("TRAVEL_PAGE_STORE_PATH", "page_store.db"),
+            int(os.environ.get("TRAVEL_PAGE_STORE_BYTES", str(256 * 1024 * 1024))),
+            float(os.environ.get("TRAVEL_PAGE_FRESH_SECONDS", str(6 * 3600))),
+        )
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT p.hash, p.etag, p.last_modified, p.fetched, t.text"
+                " FROM pages p JOIN page_text t ON t.hash = p.hash WHERE p.url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET accessed = ? WHERE url = ?", (time.time(), url))
+        return {
+            "hash": row[0], "etag": row[1], "last_modified": row[2], "fetched": row[3],
+            "text": zlib.decompress(row[4]).decode("utf-8"),
+        }
+
+    def save(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM page_text WHERE hash = ?", (digest,)).fetchone()
+            if exists is None:
+                blob = zlib.compress(text.encode("utf-8"), 6)
+                self._conn.execute(
+                    "INSERT INTO page_text (hash, text, size) VALUES (?, ?, ?)", (digest, blob, len(blob))
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, hash, etag, last_modified, fetched, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, etag, last_modified, now, now),
+            )
+            if exists is None:
+                self._evict()
+        return digest
+
+    def _touch(self, url: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched = ?, accessed = ? WHERE url = ?", (now, now, url))
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM page_text WHERE hash NOT IN (SELECT hash FROM pages)")
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_text").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT p.url, p.hash, t.size FROM pages p JOIN page_text t ON t.hash = p.hash"
+            " ORDER BY p.accessed"
+        ).fetchall()
+        dropped = set()
+        for url, digest, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            if digest not in dropped and self._conn.execute(
+                "SELECT 1 FROM pages WHERE hash = ?", (digest,)
+            ).fetchone() is None:
+                self._conn.execute("DELETE FROM page_text WHERE hash = ?", (digest,))
+                dropped.add(digest)
+                total -= size
+
+    def fetch(self, url: str, get: Callable[[Dict[str, str]], Any], extract: Callable[[Any], str]) -> str:
+        """Text of ``url``. ``get(headers)`` makes the HTTP request and
+        ``extract(response)`` turns a ``200`` into plain text."""
+        cached = self.lookup(url)
+        headers = {}
+        if cached is not None:
+            if time.time() - cached["fetched"] < self.fresh_seconds:
+                self.hits += 1
+                return cached["text"]
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        response = get(headers)
+        if cached is not None and response.status_code == 304:
+            self.revalidated += 1
+            self._touch(url)
+            return cached["text"]
+        self.fetched += 1
+        text = extract(response)
+        if response.status_code == 200:
+            self.save(url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return text
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "revalidated": self.revalidated, "fetched": self.fetched}
+
+
+@lru_cache(maxsize=None)
+def page_store() -> PageStore:
+    return PageStore.from_env()
@@ -0,0 +1,94 @@
+"""Process-wide tool instances for the crew's agents.
+
+``SerperDevTool`` and ``ScrapeWebsiteTool`` call the module-level
+``requests`` functions, which open a new connection for every call. The
+subclasses below make the same requests through the shared pool in
+``http_session``, and ``search_tool()`` / ``scrape_tool()`` hand every
+agent, in every crew built by the process, the same instance. Searches
+also go through the on-disk ``search_cache`` and page reads through the
+``page_store``. Tool names are unchanged,
+so agent prompts and tool metrics stay the same.
+
+``SERPER_BASE_URL`` points searches at another Serper-compatible endpoint,
+such as the benchmarks' stand-in (default https://google.serper.dev).
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any
+
+from bs4 import BeautifulSoup
+from crewai_tools import ScrapeWebsiteTool, SerperDevTool
+
+from surprise_travel.tools.http_session import session, timeout
+from surprise_travel.tools.page_store import page_store
+from surprise_travel.tools.search_cache import search_cache
+
+
+class PooledSerperDevTool(SerperDevTool):
+    def _make_api_request(self, search_query: str, search_type: str) -> dict:
+        payload = {"q": search_query, "num": self.n_results}
+        if self.country != "":
+            payload["gl"] = self.country
+        if self.location != "":
+            payload["location"] = self.location
+        if self.locale != "":
+            payload["hl"] = self.locale
+        headers = {
+            "X-API-KEY": os.environ["SERPER_API_KEY"],
+            "content-type": "application/json",
+        }
+        response = session().post(
+            self._get_search_url(search_type), headers=headers, data=json.dumps(payload), timeout=timeout()
+        )
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            raise ValueError("Empty response from Serper API")
+        return results
+
+
+class CachedSerperDevTool(PooledSerperDevTool):
+    def _make_api_request(self, search_query: str, search_type: str) -> dict:
+        return search_cache().fetch(
+            search_query,
+            lambda: super(CachedSerperDevTool, self)._make_api_request(search_query, search_type),
+            search_type,
+            num=self.n_results, gl=self.country, location=self.location, hl=self.locale,
+        )
+
+
+class PooledScrapeWebsiteTool(ScrapeWebsiteTool):
+    def _run(self, **kwargs: Any) -> Any:
+        website_url = kwargs.get("website_url", self.website_url)
+        return page_store().fetch(
+            website_url,
+            lambda validators: session().get(
+                website_url,
+                timeout=timeout(),
+                headers={**self.headers, **validators},
+                cookies=self.cookies if self.cookies else {},
+            ),
+            page_text,
+        )
+
+
+def page_text(page) -> str:
+    page.encoding = page.apparent_encoding
+    parsed = BeautifulSoup(page.text, "html.parser")
+
+    text = parsed.get_text(" ")
+    text = re.sub("[ \t]+", " ", text)
+    text = re.sub("\\s+\n\\s+", "\n", text)
+    return text
+
+
+@lru_cache(maxsize=None)
+def search_tool() -> SerperDevTool:
+    return CachedSerperDevTool(base_url=os.environ.get("SERPER_BASE_URL", "https://google.serper.dev"))
+
+
+@lru_cache(maxsize=None)
+def scrape_tool() -> ScrapeWebsiteTool:
+    return PooledScrapeWebsiteTool()
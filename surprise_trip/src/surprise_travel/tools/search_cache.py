@@ -0,0 +1,142 @@
+"""On-disk cache of Serper search results, shared by every worker.
+
+Queries are normalized (case, spacing, surrounding punctuation) and keyed
+together with the search type and result options. How long a result stays
+fresh depends on its class: news expires within hours, event-style
+queries ("concerts this week") within a day, and evergreen queries
+("best restaurants in Tokyo") after a month.
+
+``TRAVEL_SEARCH_CACHE_PATH``  sqlite file (default search_cache.db)
+``TRAVEL_SEARCH_CACHE_MODE``  ``record`` (default): serve fresh hits, call
+                              Serper on a miss and store the result;
+                              ``replay``: serve recorded results only, however
+                              old, and fail on a miss (offline runs);
+                              ``off``: always call Serper
+``TRAVEL_SEARCH_TTL_NEWS`` / ``_EVENTS`` / ``_EVERGREEN``  seconds per class
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+RECORD = "record"
+REPLAY = "replay"
+OFF = "off"
+MODES = (RECORD, REPLAY, OFF)
+
+NEWS = "news"
+EVENTS = "events"
+EVERGREEN = "evergreen"
+
+DEFAULT_TTLS = {NEWS: 3 * 3600, EVENTS: 24 * 3600, EVERGREEN: 30 * 24 * 3600}
+
+_EVENT_WORDS = re.compile(
+    r"\b(today|tonight|tomorrow|this (?:week|weekend|month)|next (?:week|weekend|month)|"
+    r"events?|concerts?|festivals?|exhibitions?|shows?|tickets?|weather|open now|"
+    r"schedule|(?:19|20)\d\d)\b"
+)
+_SPACES = re.compile(r"\s+")
+_EDGES = " \t\n\"'`.,;:!?"
+
+
+class SearchNotRecorded(LookupError):
+    """Raised in replay mode for a query that was never recorded."""
+
+
+def normalize_query(query: str) -> str:
+    return _SPACES.sub(" ", str(query).casefold()).strip(_EDGES)
+
+
+def result_class(query: str, search_type: str = "search") -> str:
+    if search_type == "news":
+        return NEWS
+    if _EVENT_WORDS.search(normalize_query(query)):
+        return EVENTS
+    return EVERGREEN
+
+
+def search_key(query: str, search_type: str = "search", **options: Any) -> str:
+    blob = json.dumps(
+        {"q": normalize_query(query), "type": search_type, **{k: v for k, v in options.items() if v}},
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+class SearchCache:
+    def __init__(self, path: str, mode: str = RECORD, ttls: Optional[Dict[str, float]] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown search cache mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " key TEXT PRIMARY KEY, query TEXT NOT NULL, class TEXT NOT NULL,"
+            " value TEXT NOT NULL, created REAL NOT NULL, expires REAL NOT NULL)"
+        )
+
+    @classmethod
+    def from_env(cls) -> "SearchCache":
+        ttls = {
+            kind: float(os.environ[f"TRAVEL_SEARCH_TTL_{kind.upper()}"])
+            for kind in DEFAULT_TTLS if f"TRAVEL_SEARCH_TTL_{kind.upper()}" in os.environ
+        }
+        return cls(
+            os.environ.get("TRAVEL_SEARCH_CACHE_PATH", "search_cache.db"),
+            os.environ.get("TRAVEL_SEARCH_CACHE_MODE", RECORD).lower(),
+            ttls,
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (self.mode != REPLAY and row[1] < time.time()):
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, query: str, kind: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, class, value, created, expires)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, normalize_query(query), kind, json.dumps(value), now, now + self.ttls[kind]),
+            )
+
+    def fetch(self, query: str, search: Callable[[], Any], search_type: str = "search", **options: Any) -> Any:
+        """Cached result for ``query``, calling ``search()`` on a miss."""
+        if self.mode == OFF:
+            return search()
+        key = search_key(query, search_type, **options)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        if self.mode == REPLAY:
+            raise SearchNotRecorded(f"No recorded search result for {normalize_query(query)!r}")
+        value = search()
+        self.set(key, query, result_class(query, search_type), value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache(maxsize=None)
+def search_cache() -> SearchCache:
+    return SearchCache.from_env()
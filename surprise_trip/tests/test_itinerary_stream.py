@@ -0,0 +1,78 @@
+import json
+
+from surprise_travel.itinerary_stream import ItineraryParser
+
+ACTIVITY = {
+    "name": "Pastéis at \"Manteigaria\"",
+    "description": "Order {two} of them; the {queue} moves fast \\ honest",
+}
+ITINERARY = {
+    "name": "A \"Surprise\" Week in {Lisbon}",
+    "day_plans": [
+        {"date": "2025-06-01", "activities": [ACTIVITY, {"name": "Tram 28"}],
+         "restaurants": ["Cervejaria Ramiro"]},
+        {"date": "2025-06-02", "activities": [], "restaurants": []},
+    ],
+    "hotel": "Memmo Alfama",
+}
+
+
+def events(*pieces):
+    parser = ItineraryParser()
+    found = []
+    for piece in pieces:
+        found.extend(parser.feed(piece))
+    return found, parser
+
+
+def expected():
+    first, second = ITINERARY["day_plans"]
+    return [
+        {"type": "name", "value": ITINERARY["name"]},
+        {"type": "activity", "day": 1, "index": 0, "activity": ACTIVITY},
+        {"type": "activity", "day": 1, "index": 1, "activity": {"name": "Tram 28"}},
+        {"type": "day", "day": 1, "plan": first},
+        {"type": "day", "day": 2, "plan": second},
+        {"type": "hotel", "value": "Memmo Alfama"},
+    ]
+
+
+def test_whole_text():
+    found, parser = events(json.dumps(ITINERARY))
+    assert found == expected()
+    assert parser.done
+
+
+def test_one_character_at_a_time():
+    found, parser = events(*json.dumps(ITINERARY, indent=2))
+    assert found == expected()
+    assert parser.done
+
+
+def test_escaped_quotes_and_backslashes_split_across_pieces():
+    text = json.dumps(ITINERARY)
+    cut = text.index('\\"')
+    found, _ = events(text[:cut + 1], text[cut + 1:])
+    assert found == expected()
+
+
+def test_braces_inside_strings_do_not_open_values():
+    found, _ = events(json.dumps({"name": "}{ ] [", "hotel": "{\"}"}))
+    assert found == [{"type": "name", "value": "}{ ] ["},
+                     {"type": "hotel", "value": "{\"}"}]
+
+
+def test_skips_final_answer_prefix_and_trailing_text():
+    text = ("Thought: I now have everything I need.\n"
+            "Final Answer: " + json.dumps(ITINERARY) + "\nThat is the plan.")
+    found, parser = events(text)
+    assert found == expected()
+    assert parser.done
+    assert parser.feed('{"name": "again"}') == []
+
+
+def test_drops_parts_that_are_not_json():
+    found, _ = events('{"name": "Lisbon", "day_plans": [{"date": 2025-06-01}], '
+                      '"hotel": "Memmo"}')
+    assert found == [{"type": "name", "value": "Lisbon"},
+                     {"type": "hotel", "value": "Memmo"}]
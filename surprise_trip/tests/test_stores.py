@@ -0,0 +1,114 @@
+import time
+
+import pytest
+
+from surprise_travel.itinerary_store import ItineraryStore, profile
+from surprise_travel.tools.page_store import PageStore
+from surprise_travel.tools.search_cache import REPLAY, SearchCache, SearchNotRecorded
+
+
+def lisbon(interests, hotel="boutique", origin="Berlin"):
+    return profile("Lisbon", "5 days", 34, hotel, interests, origin, "June 1-5")
+
+
+def test_itinerary_reuse_seed_and_miss(tmp_path):
+    store = ItineraryStore(str(tmp_path / "itineraries.db"))
+    store.save(lisbon("food, museums and music"), {"name": "first"}, 120.0)
+    store.save(lisbon("food, museums and surfing"), {"name": "second"}, 90.0)
+
+    exact = store.lookup(lisbon("Food and Museums and Music"))
+    assert (exact.kind, exact.itinerary, exact.score) == ("reuse", {"name": "first"}, 1.0)
+
+    # Another origin can't reuse the plan, but the closest one seeds it
+    seed = store.lookup(lisbon("food museums music hiking", origin="Paris"))
+    assert (seed.kind, seed.itinerary, seed.score) == ("seed", {"name": "first"}, 0.75)
+
+    assert store.lookup(lisbon("nightlife")) is None
+    assert store.lookup(profile("Porto", "5 days", 34, "boutique", "food")) is None
+    assert store.counters() == {"reused": 1, "seeded": 1, "missed": 2, "seconds_saved": 0.0}
+
+
+def test_itinerary_ties_go_to_the_newest_plan(tmp_path):
+    store = ItineraryStore(str(tmp_path / "itineraries.db"))
+    store.save(lisbon("food music"), {"name": "older"}, 60.0)
+    store.save(lisbon("food surfing"), {"name": "newer"}, 60.0)
+    match = store.lookup(lisbon("food"))
+    assert (match.kind, match.itinerary) == ("seed", {"name": "newer"})
+    store.record(match, 20.0)
+    assert store.stats()["seconds_saved"] == 40.0
+
+
+def test_page_hit_revalidate_and_fetch(tmp_path):
+    store = PageStore(str(tmp_path / "pages.db"), fresh_seconds=60)
+    calls = []
+
+    class Response:
+        def __init__(self, status_code, text=""):
+            self.status_code, self.text = status_code, text
+            self.headers = {"ETag": '"v1"'} if status_code == 200 else {}
+
+    def get(status_code):
+        def call(headers):
+            calls.append(headers)
+            return Response(status_code, "Trams run all day.")
+        return call
+
+    def text(response):
+        return response.text
+
+    assert store.fetch("https://a.example", get(200), text) == "Trams run all day."
+    assert store.fetch("https://a.example", get(500), text) == "Trams run all day."
+    assert calls == [{}]
+
+    store.fresh_seconds = 0
+    assert store.fetch("https://a.example", get(304), text) == "Trams run all day."
+    assert calls[-1] == {"If-None-Match": '"v1"'}
+    assert store.stats() == {"hits": 1, "revalidated": 1, "fetched": 1}
+
+
+def test_page_evicts_least_recently_read(tmp_path):
+    store = PageStore(str(tmp_path / "pages.db"))
+    for name in "abc":
+        store.save(f"https://{name}.example", name * 100)
+        time.sleep(0.01)
+    store.lookup("https://a.example")
+    store.max_bytes = 2 * store._conn.execute(
+        "SELECT MAX(size) FROM page_text").fetchone()[0]
+    store.save("https://d.example", "d" * 100)
+    assert store.lookup("https://b.example") is None
+    assert store.lookup("https://c.example") is None
+    assert store.lookup("https://a.example")["text"] == "a" * 100
+    assert store.lookup("https://d.example")["text"] == "d" * 100
+
+
+def test_page_shares_text_between_urls(tmp_path):
+    store = PageStore(str(tmp_path / "pages.db"))
+    assert store.save("https://a.example", "same") == store.save("https://b.example", "same")
+    assert store._conn.execute("SELECT COUNT(*) FROM page_text").fetchone()[0] == 1
+
+
+def test_search_hit_miss_and_expiry(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.db"), ttls={"evergreen": 60})
+    calls = []
+
+    def search():
+        calls.append(1)
+        return {"organic": [len(calls)]}
+
+    assert cache.fetch("Best  restaurants in Tokyo", search) == {"organic": [1]}
+    assert cache.fetch("best restaurants in tokyo?", search) == {"organic": [1]}
+    assert cache.fetch("best restaurants in tokyo", search, n_results=5) == {"organic": [2]}
+    assert cache.stats() == {"mode": "record", "hits": 1, "misses": 2}
+
+    cache.ttls["evergreen"] = -1
+    cache.fetch("museums in Kyoto", search)
+    assert cache.fetch("museums in Kyoto", search) == {"organic": [4]}
+
+
+def test_search_replay_serves_expired_and_fails_on_miss(tmp_path):
+    path = str(tmp_path / "search.db")
+    SearchCache(path, ttls={"evergreen": -1}).fetch("museums in Kyoto", lambda: {"organic": []})
+    replay = SearchCache(path, REPLAY)
+    assert replay.fetch("museums in Kyoto", lambda: {"organic": ["live"]}) == {"organic": []}
+    with pytest.raises(SearchNotRecorded):
+        replay.fetch("museums in Osaka", lambda: {"organic": ["live"]})
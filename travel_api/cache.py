@@ -0,0 +1,220 @@
+"""Response cache keyed on normalized trip details.
+
+Identical trip parameters (retries from Orchestrate, users asking again)
+are answered from the cache instead of re-running the crew. Lookups go
+through an in-process LRU first and, when ``TRAVEL_CACHE_PATH`` is set, a
+sqlite file that survives restarts and can be shared between workers.
+Async callers use ``aget``/``aset``, which read and write the memory tier
+in place and move only sqlite calls to a worker thread, off the event loop.
+Values must be JSON-serializable and are treated as immutable once cached.
+
+``TRAVEL_CACHE_SIZE``       entries kept in memory (default 1024)
+``TRAVEL_CACHE_TTL``        seconds an entry stays valid (default 3600)
+``TRAVEL_CACHE_PATH``       optional sqlite file for the on-disk tier
+``TRAVEL_CACHE_DISK_SIZE``  entries kept on disk (default 100000)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# How stale a disk entry's LRU timestamp may get before a hit rewrites it
+ACCESS_RESOLUTION = 60.0
+
+
+def cache_key(details: Dict[str, str]) -> str:
+    """Stable key for a details dict: case, spacing and key order don't matter."""
+    normalized = {
+        str(k).strip().lower(): " ".join(str(v).split()).casefold()
+        for k, v in details.items()
+    }
+    blob = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+class MemoryBackend:
+    """LRU dict with per-entry expiry."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entry(key)
+        return entry[0] if entry is not None else None
+
+    def entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """The value under ``key`` and when it expires, if it hasn't."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, expires
+
+    def set(self, key: str, value: Any, expires: float):
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteBackend:
+    """On-disk tier; safe to share between processes through WAL mode.
+    Hits only write when an entry's LRU timestamp is ``ACCESS_RESOLUTION``
+    old, so workers reading the same file rarely wait on each other."""
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS response_cache_accessed ON response_cache (accessed)"
+        )
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entry(key)
+        return entry[0] if entry is not None else None
+
+    def entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """The value under ``key`` and when it expires, if it hasn't."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires, accessed FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            if now - row[2] >= ACCESS_RESOLUTION:
+                self._conn.execute("UPDATE response_cache SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires: float):
+        blob = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires, accessed)"
+                " VALUES (?, ?, ?, ?)",
+                (key, blob, expires, time.time()),
+            )
+            self._writes += 1
+            # Trimming scans the table, so only do it every so often.
+            if self._writes % 64 == 0:
+                self._evict()
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM response_cache WHERE expires < ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM response_cache WHERE key IN ("
+            " SELECT key FROM response_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """Tiered cache with hit/miss counters. Earlier tiers are checked first
+    and are refilled from later tiers on a hit."""
+
+    def __init__(self, tiers: List, ttl: float = 3600.0):
+        self.tiers = tiers
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        tiers = [MemoryBackend(int(os.environ.get("TRAVEL_CACHE_SIZE", "1024")))]
+        path = os.environ.get("TRAVEL_CACHE_PATH")
+        if path:
+            tiers.append(SqliteBackend(path, int(os.environ.get("TRAVEL_CACHE_DISK_SIZE", "100000"))))
+        return cls(tiers, ttl=float(os.environ.get("TRAVEL_CACHE_TTL", "3600")))
+
+    def get(self, details: Dict[str, str]) -> Optional[Any]:
+        key = cache_key(details)
+        for depth, tier in enumerate(self.tiers):
+            entry = tier.entry(key)
+            if entry is not None:
+                return self._hit(key, depth, entry)
+        self.misses += 1
+        return None
+
+    async def aget(self, details: Dict[str, str]) -> Optional[Any]:
+        """``get`` without blocking the event loop on a disk tier."""
+        key = cache_key(details)
+        for depth, tier in enumerate(self.tiers):
+            entry = await asyncio.to_thread(tier.entry, key) if tier.blocking else tier.entry(key)
+            if entry is not None:
+                return self._hit(key, depth, entry)
+        self.misses += 1
+        return None
+
+    def _hit(self, key: str, depth: int, entry: Tuple[Any, float]) -> Any:
+        self.hits += 1
+        # Refilled entries keep their original expiry
+        value, expires = entry
+        for upper in self.tiers[:depth]:
+            upper.set(key, value, expires)
+        return value
+
+    def set(self, details: Dict[str, str], value: Any):
+        key = cache_key(details)
+        expires = time.time() + self.ttl
+        for tier in self.tiers:
+            tier.set(key, value, expires)
+
+    async def aset(self, details: Dict[str, str], value: Any):
+        """``set`` without blocking the event loop on a disk tier."""
+        key = cache_key(details)
+        expires = time.time() + self.ttl
+        for tier in self.tiers:
+            if tier.blocking:
+                await asyncio.to_thread(tier.set, key, value, expires)
+            else:
+                tier.set(key, value, expires)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "entries": len(self.tiers[0]),
+        }
@@ -0,0 +1,246 @@
+"""Blocking trip-planning runners executed on the crew worker pool.
+
+``TRAVEL_CREW_BACKEND`` picks the runner: ``crew`` (default) kicks off the
+real ``SurpriseTravelCrew``; ``stub`` returns a canned itinerary after
+``TRAVEL_STUB_LATENCY`` seconds per task, which stands in for the LLM so
+throughput can be measured offline.
+
+crewai and the crew are imported on the first run, not with this module,
+so the API starts serving in well under a second; ``prewarm()`` loads
+them ahead of time.
+
+Runners accept an optional ``on_event`` callable. It is called from the
+worker thread with a dict for every agent step (``type: "step"``) and
+every finished task (``type: "task"``) so progress can be streamed while
+the crew is still working. While the itinerary is being written it also
+gets its parts as they complete (``name``, ``activity``, ``day`` and
+``hotel``, see ``surprise_travel.itinerary_stream``), with the part as
+JSON in ``text``.
+"""
+import json
+import os
+import re
+import sys
+import time
+from contextlib import nullcontext
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Optional, Union
+
+from travel_api.metrics import task_seconds, tool_seconds
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+# Task name -> role of the agent that runs it, in execution order.
+TASKS = {
+    "personalized_activity_planning_task": "Activity Planner",
+    "restaurant_scenic_location_scout_task": "Restaurant Scout",
+    "itinerary_compilation_task": "Itinerary Compiler",
+}
+
+# Tool name as reported by crewai -> metrics label.
+TOOL_LABELS = {
+    "Search the internet with Serper": "serper_search",
+    "Read website content": "website_scrape",
+}
+
+_DURATION_RE = re.compile(r"(\d+)\s*(day|night|week)", re.IGNORECASE)
+
+
+def crew_inputs(details: Dict[str, str]) -> Dict[str, str]:
+    """Map extracted trip details onto the variables the crew tasks expect."""
+    origin, destination = details['origin'], details['destination']
+    return {
+        'origin': origin,
+        'destination': destination,
+        'age': details['age'],
+        'hotel_location': f"{details['hotel_preference']} hotel in {destination}",
+        'flight_information': f"Round-trip flights from {origin} to {destination}",
+        'trip_duration': details['duration'],
+        'interests': details['interests'],
+        'budget': details['budget'],
+    }
+
+
+def trip_days(duration: str, limit: int = 14) -> int:
+    match = _DURATION_RE.search(duration or "")
+    if not match:
+        return 3
+    days = int(match.group(1)) * (7 if match.group(2).lower() == "week" else 1)
+    return max(1, min(days, limit))
+
+
+def _step_event(on_event: EventCallback, role: str, step: Any):
+    on_event({
+        "type": "step",
+        "agent": role,
+        "tool": getattr(step, "tool", None),
+        "text": getattr(step, "thought", "") or "",
+    })
+
+
+def _itinerary_event(on_event: EventCallback, event: Dict[str, Any]):
+    part = event.get("value", event.get("activity", event.get("plan")))
+    on_event({**event, "agent": TASKS["itinerary_compilation_task"], "text": json.dumps(part)})
+
+
+def _task_done(on_event: Optional[EventCallback], task: Any, output: Any):
+    name = output.name or task.name
+    if task.execution_duration is not None:
+        task_seconds.labels(name).observe(task.execution_duration)
+    if on_event is not None:
+        on_event({
+            "type": "task",
+            "agent": output.agent.strip(),
+            "task": name,
+            "text": output.raw,
+        })
+
+
+@lru_cache(maxsize=None)
+def _watch_tool_calls():
+    """Record every crewai tool call in the tool latency histogram (once per process)."""
+    from crewai.utilities.events import ToolUsageFinishedEvent, crewai_event_bus
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _record(_source, event):
+        tool = TOOL_LABELS.get(event.tool_name, event.tool_name)
+        tool_seconds.labels(tool).observe((event.finished_at - event.started_at).total_seconds())
+
+
+def run_crew(details: Dict[str, str], on_event: Optional[EventCallback] = None) -> Union[Dict[str, Any], str]:
+    """Kick off SurpriseTravelCrew and return the itinerary dict (or raw text).
+
+    A close match in the itinerary store is returned without running the
+    crew, and a looser one seeds a crew that only compiles the itinerary."""
+    from surprise_travel.factory import crew_factory
+    from surprise_travel.itinerary_store import itinerary_store, profile
+    from surprise_travel.itinerary_stream import stream_itinerary
+
+    store = itinerary_store()
+    wanted = profile(details['destination'], details['duration'], details['age'],
+                     details['hotel_preference'], details['interests'],
+                     details['origin'], details.get('dates', ''))
+    match = store.lookup(wanted)
+    if match is not None and match.kind == "reuse":
+        store.record(match, 0.0)
+        if on_event is not None:
+            on_event({"type": "task", "agent": TASKS["itinerary_compilation_task"],
+                      "task": "itinerary_compilation_task", "text": "Reused a stored itinerary"})
+        return match.itinerary
+
+    _watch_tool_calls()
+    started = time.perf_counter()
+    inputs = crew_inputs(details)
+    if match is not None:
+        # A similar trip is stored: compile from it and skip the research
+        crew = crew_factory().seeded()
+        inputs['seed_itinerary'] = json.dumps(match.itinerary)
+    else:
+        # A copy of the process's template crew; configs are parsed only once
+        crew = crew_factory().crew()
+    for task in crew.tasks:
+        task.callback = partial(_task_done, on_event, task)
+    streaming = nullcontext()
+    if on_event is not None:
+        # Per-agent step callbacks, because the step payload does not say
+        # which agent produced it.
+        for agent in crew.agents:
+            agent.step_callback = partial(_step_event, on_event, agent.role.strip())
+        streaming = stream_itinerary(crew, partial(_itinerary_event, on_event))
+    with streaming:
+        result = crew.kickoff(inputs=inputs)
+    elapsed = time.perf_counter() - started
+    if match is not None:
+        store.record(match, elapsed)
+    if result.json_dict:
+        store.save(wanted, result.json_dict, max(elapsed, match.seconds) if match else elapsed)
+    return result.json_dict or result.raw
+
+
+def store_stats() -> Dict[str, float]:
+    """Itinerary store counters; all zero until the crew backend has used the store."""
+    module = sys.modules.get("surprise_travel.itinerary_store")
+    if module is None or not module.itinerary_store.cache_info().currsize:
+        return {"reused": 0, "seeded": 0, "missed": 0, "seconds_saved": 0.0}
+    return module.itinerary_store().counters()
+
+
+def prewarm():
+    """Import crewai and build the template crew before the first request needs them."""
+    if os.environ.get("TRAVEL_CREW_BACKEND", "crew") != "crew":
+        return
+    from surprise_travel.factory import crew_factory
+
+    _watch_tool_calls()
+    crew_factory().template
+
+
+def run_stub(details: Dict[str, str], on_event: Optional[EventCallback] = None) -> Dict[str, Any]:
+    """Offline stand-in for the crew with a fixed per-task latency."""
+    latency = float(os.environ.get("TRAVEL_STUB_LATENCY", "0.5"))
+    itinerary = stub_itinerary(details)
+    for task, role in TASKS.items():
+        if on_event is not None:
+            on_event({"type": "step", "agent": role, "tool": "Search the internet", "text": ""})
+        with task_seconds.labels(task).time():
+            if task == "itinerary_compilation_task" and on_event is not None:
+                _stub_stream(itinerary, latency, partial(_itinerary_event, on_event))
+            else:
+                time.sleep(latency)
+        if on_event is not None:
+            on_event({"type": "task", "agent": role, "task": task, "text": itinerary['name']})
+    return itinerary
+
+
+def _stub_stream(itinerary: Dict[str, Any], latency: float, emit: EventCallback):
+    """Emit the itinerary's parts spread over ``latency``, as a streaming compiler would."""
+    days = itinerary['day_plans']
+    emit({"type": "name", "value": itinerary['name']})
+    for number, day in enumerate(days, 1):
+        time.sleep(latency / len(days))
+        for index, activity in enumerate(day['activities']):
+            emit({"type": "activity", "day": number, "index": index, "activity": activity})
+        emit({"type": "day", "day": number, "plan": day})
+    emit({"type": "hotel", "value": itinerary['hotel']})
+
+
+def stub_itinerary(details: Dict[str, str]) -> Dict[str, Any]:
+    destination = details['destination']
+    day_plans = []
+    for day in range(1, trip_days(details['duration']) + 1):
+        day_plans.append({
+            'date': f"Day {day}",
+            'activities': [
+                {
+                    'name': f"{destination} highlight #{day}",
+                    'location': destination,
+                    'description': f"A local favourite for travellers into {details['interests']}.",
+                    'date': f"Day {day}",
+                    'cousine': "Local",
+                    'why_its_suitable': f"Fits a {details['age']} year old on a {details['budget']} budget.",
+                    'reviews': ["Unforgettable."],
+                    'rating': 4.5,
+                },
+            ],
+            'restaurants': [f"{destination} Bistro", f"{destination} Night Market"],
+            'flight': f"{details['origin']} → {destination}" if day == 1 else None,
+        })
+    return {
+        'name': f"The Great {destination} Surprise",
+        'day_plans': day_plans,
+        'hotel': f"{details['hotel_preference'].title()} hotel in {destination}",
+    }
+
+
+RUNNERS: Dict[str, Callable[..., Any]] = {
+    "crew": run_crew,
+    "stub": run_stub,
+}
+
+
+def runner_from_env() -> Callable[..., Any]:
+    backend = os.environ.get("TRAVEL_CREW_BACKEND", "crew")
+    try:
+        return RUNNERS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown TRAVEL_CREW_BACKEND {backend!r}, expected one of {sorted(RUNNERS)}")
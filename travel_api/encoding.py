@@ -0,0 +1,51 @@
+"""JSON encoding for the OpenAI-compatible payloads we send.
+
+Outbound objects are built here, so they skip pydantic validation
+entirely. Each payload is a byte template, and only its variable strings
+are encoded, by pydantic-core's compiled serializer. Calling ``to_json``
+on a plain ``str`` is several times faster than ``json.dumps`` or than
+building the response models and calling ``model_dump_json``.
+
+``usage`` token counts are estimates at about four characters per token.
+A cached or coalesced answer has no LLM calls of its own to count.
+"""
+from functools import lru_cache
+from typing import Iterable
+
+from pydantic_core import to_json
+
+# Compiled str -> JSON bytes; handles escaping and non-ASCII text.
+json_string = to_json
+
+_COMPLETION = (
+    b'{"id":%b,"object":"chat.completion","created":%d,"model":%b,'
+    b'"choices":[{"index":0,"message":{"role":"assistant","content":%b},"finish_reason":"stop"}],'
+    b'"usage":%b}'
+)
+_USAGE = b'{"prompt_tokens":%d,"completion_tokens":%d,"total_tokens":%d}'
+
+
+@lru_cache(maxsize=64)
+def model_json(model: str) -> bytes:
+    """Model names repeat on every request, so their JSON is cached."""
+    return to_json(model)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def prompt_tokens(contents: Iterable[str]) -> int:
+    return sum(estimate_tokens(content) for content in contents)
+
+
+def usage_json(prompt: int, completion: int) -> bytes:
+    return _USAGE % (prompt, completion, prompt + completion)
+
+
+def completion_json(request_id: str, created: int, model: str, content: str, prompt: int) -> bytes:
+    """A complete ``chat.completion`` body with one assistant choice."""
+    return _COMPLETION % (
+        json_string(request_id), created, model_json(model), json_string(content),
+        usage_json(prompt, estimate_tokens(content)),
+    )
@@ -0,0 +1,103 @@
+"""Bounded worker pool for crew kickoffs.
+
+``Crew.kickoff()`` is synchronous and can run for minutes, so it must never
+run on the event loop. ``CrewExecutor`` hands jobs to a fixed pool of
+threads (crew runs spend nearly all their time waiting on LLM and search
+calls), caps how many jobs may wait for a thread, and gives up on jobs
+that exceed their timeout. The event loop only awaits the result.
+
+Settings are read from the environment by ``CrewExecutor.from_env``:
+
+``TRAVEL_CREW_WORKERS``      concurrent kickoffs (default 4)
+``TRAVEL_CREW_QUEUE_DEPTH``  jobs allowed to wait for a worker (default 32)
+``TRAVEL_CREW_TIMEOUT``      seconds before a job is abandoned (default 600)
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from travel_api.crew_runner import runner_from_env
+
+
+class ExecutorBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class JobTimeout(Exception):
+    """Raised when a job does not finish within the executor timeout."""
+
+
+class CrewExecutor:
+    """Runs blocking crew jobs on a bounded thread pool."""
+
+    def __init__(self, runner: Callable[..., Any], workers: int = 4,
+                 queue_depth: int = 32, timeout: Optional[float] = 600.0):
+        self.runner = runner
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crew-worker")
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+
+    @classmethod
+    def from_env(cls) -> "CrewExecutor":
+        timeout = float(os.environ.get("TRAVEL_CREW_TIMEOUT", "600"))
+        return cls(
+            runner=runner_from_env(),
+            workers=int(os.environ.get("TRAVEL_CREW_WORKERS", "4")),
+            queue_depth=int(os.environ.get("TRAVEL_CREW_QUEUE_DEPTH", "32")),
+            timeout=timeout if timeout > 0 else None,
+        )
+
+    @property
+    def in_flight(self) -> int:
+        """Jobs currently running on a worker thread."""
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        """Jobs admitted but still waiting for a worker thread."""
+        return self._admitted - self._running
+
+    async def run(self, details: Dict[str, str], **kwargs) -> Any:
+        """Run one job and await its result without blocking the loop."""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusy(
+                f"{self.workers} trips running and {self.queue_depth} waiting"
+            )
+        with self._lock:
+            self._admitted += 1
+        try:
+            future = self._pool.submit(self._execute, details, kwargs)
+        except RuntimeError:
+            self._release(None)
+            raise
+        # The slot is returned when the job really ends, even after a timeout,
+        # so abandoned jobs still count against the pool's capacity.
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise JobTimeout(f"trip planning took longer than {self.timeout:g}s") from None
+
+    def _execute(self, details: Dict[str, str], kwargs: Dict[str, Any]) -> Any:
+        with self._lock:
+            self._running += 1
+        try:
+            return self.runner(details, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _release(self, _future):
+        with self._lock:
+            self._admitted -= 1
+        self._slots.release()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
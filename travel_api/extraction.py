@@ -0,0 +1,352 @@
+"""Travel detail extraction for the OpenAI-compatible chat endpoint.
+
+Place names come from a gazetteer that is loaded once per process into a
+token trie. Every user message is scanned a single time with one
+precompiled pattern; each token is fed through the trie and the budget,
+duration, age, interest and hotel rules as it goes by, so the cost of an
+extraction depends on the length of the conversation and not on the
+number of known places.
+
+Extra gazetteer files can be listed in ``TRAVEL_GAZETTEER`` (separated by
+``os.pathsep``). Supported formats are the bundled ``name kind canonical
+country`` TSV, GeoNames ``cities*.txt`` dumps and the OurAirports
+``airports.csv`` export.
+"""
+import csv
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DETAILS = {
+    'origin': 'Boston',
+    'destination': 'Unknown',
+    'age': '25',
+    'interests': 'general travel',
+    'budget': '$2000',
+    'duration': '3 days',
+    'hotel_preference': 'standard'
+}
+
+BUNDLED_GAZETTEER = os.path.join(os.path.dirname(__file__), "data", "gazetteer.tsv")
+
+# Trie node key holding (canonical name, case rule) for a complete place name.
+_END = ""
+
+# Case rules for terminal trie nodes.
+_ANY_CASE = 0
+_CAPITALIZED = 1   # common words such as "Nice" or "Split"
+_UPPERCASE = 2     # abbreviations such as "LA" or "NYC"
+
+# Single-word place names that are also everyday English words. They only
+# count as places when written with a capital letter.
+_AMBIGUOUS_NAMES = frozenset({
+    "nice", "split", "reading", "bath", "mobile", "best", "of", "hope",
+    "independence", "paradise", "temple", "marathon", "surprise", "eagle",
+    "sale", "la", "san", "santa", "commerce", "normal", "chance", "liberty",
+    "delta", "price", "banner", "enterprise", "orange", "sandy", "march",
+})
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+
+# One alternation covers every field, so a message is tokenized exactly once.
+_SCAN_RE = re.compile(r"""
+      \$\s*(?P<money>\d+(?:,\d{3})*(?:\.\d+)?)(?:\s*(?P<money_k>k)\b)?
+    | (?P<money_word>\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:usd|dollars|bucks)\b
+    | (?P<count>\d+)\s*(?:-\s*)?(?P<unit>days?|nights?|weeks?)\b
+    | (?P<age>\d{1,3})\s*(?:-\s*)?(?:years?[\s-]*old|y/?o)\b
+    | (?P<word>[^\W\d_]+(?:['’][^\W\d_]+)*)
+    | (?P<num>\d+)
+""", re.VERBOSE | re.IGNORECASE)
+
+_ORIGIN_CUES = frozenset({"from", "leaving", "departing"})
+_HOME_CUES = frozenset({"live", "living", "based", "reside", "residing", "home"})
+_DESTINATION_CUES = frozenset({
+    "to", "visit", "visiting", "in", "into", "towards", "explore",
+    "exploring", "see", "seeing", "destination",
+})
+_BUDGET_CUES = frozenset({"budget", "spend", "spending", "afford", "under", "max"})
+_AGE_CUES = frozenset({"age", "aged"})
+_LODGING_WORDS = frozenset({"hotel", "hotels", "accommodation", "stay", "stays", "lodging"})
+
+_INTERESTS = {
+    "food": "food", "foodie": "food", "cuisine": "food", "culinary": "food",
+    "restaurants": "food", "eating": "food",
+    "museum": "museums", "museums": "museums",
+    "art": "art", "galleries": "art",
+    "history": "history", "historical": "history",
+    "culture": "culture", "cultural": "culture",
+    "hiking": "hiking", "trekking": "hiking",
+    "beach": "beaches", "beaches": "beaches",
+    "nightlife": "nightlife", "clubs": "nightlife", "bars": "nightlife",
+    "shopping": "shopping",
+    "music": "music", "concerts": "music",
+    "nature": "nature", "wildlife": "nature", "parks": "nature",
+    "adventure": "adventure",
+    "architecture": "architecture",
+    "wine": "wine",
+    "photography": "photography",
+    "anime": "anime",
+    "sports": "sports",
+    "relaxation": "relaxation", "spa": "relaxation",
+}
+
+_HOTEL_STYLES = {
+    "luxury": "luxury", "luxurious": "luxury", "upscale": "luxury",
+    "boutique": "boutique",
+    "hostel": "hostel", "hostels": "hostel",
+    "resort": "resort",
+    "airbnb": "vacation rental",
+}
+
+_CHEAP_STYLES = frozenset({"budget", "cheap", "affordable"})
+
+
+def _fold(word: str) -> str:
+    """Case- and accent-fold a word token so "München" matches "Munchen"."""
+    if word.isascii():
+        return word.lower()
+    decomposed = unicodedata.normalize("NFKD", word)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class Gazetteer:
+    """Token trie of place names plus an index of IATA airport codes."""
+
+    def __init__(self):
+        self._trie: Dict[str, dict] = {}
+        self._codes: Dict[str, str] = {}
+        self.size = 0
+
+    def add(self, name: str, canonical: str):
+        tokens = [_fold(t) for t in _WORD_RE.findall(name)]
+        if not tokens:
+            return
+        if name.isupper():
+            rule = _UPPERCASE
+        elif len(tokens) == 1 and tokens[0] in _AMBIGUOUS_NAMES:
+            rule = _CAPITALIZED
+        else:
+            rule = _ANY_CASE
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _END not in node:
+            node[_END] = (canonical, rule)
+            self.size += 1
+
+    def add_airport(self, code: str, city: str):
+        code = code.strip().upper()
+        if len(code) == 3 and code.isalpha() and code not in self._codes:
+            self._codes[code] = city
+            self.size += 1
+
+    @property
+    def root(self) -> Dict[str, dict]:
+        return self._trie
+
+    def airport(self, token: str) -> Optional[str]:
+        return self._codes.get(token)
+
+    def load(self, path: str) -> "Gazetteer":
+        """Add every entry from a bundled TSV, GeoNames or OurAirports file."""
+        with open(path, encoding="utf-8", newline="") as handle:
+            if path.endswith(".csv"):
+                self._load_ourairports(handle)
+                return self
+            for line in handle:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) == 4:
+                    name, kind, canonical, _country = fields
+                    if kind == "airport":
+                        self.add_airport(name, canonical)
+                    else:
+                        self.add(name, canonical)
+                elif len(fields) >= 9:
+                    # GeoNames: geonameid, name, asciiname, alternatenames, ...
+                    self.add(fields[1], fields[1])
+                    if fields[2] and fields[2] != fields[1]:
+                        self.add(fields[2], fields[1])
+        return self
+
+    def _load_ourairports(self, handle):
+        for row in csv.DictReader(handle):
+            code, city = row.get("iata_code"), row.get("municipality")
+            if not code or not city:
+                continue
+            if row.get("type") in ("large_airport", "medium_airport"):
+                self.add_airport(code, city)
+                self.add(city, city)
+
+
+class _Scan:
+    """Mutable state carried across the messages of one conversation."""
+
+    __slots__ = (
+        "details", "index", "prev", "prev2", "active", "places",
+        "budget_strong", "pending_cheap",
+    )
+
+    def __init__(self):
+        self.details = dict(DEFAULT_DETAILS)
+        self.index = 0
+        self.prev = ""
+        self.prev2 = ""
+        # Partial trie matches: (node, start index, prev word, word before that)
+        self.active: List[Tuple[dict, int, str, str]] = []
+        # Completed place matches: (start, end, canonical, prev word, word before that)
+        self.places: List[Tuple[int, int, str, str, str]] = []
+        self.budget_strong = False
+        self.pending_cheap = False
+
+
+class TravelDetailExtractor:
+    """Pulls origin, destination, budget, duration, age, interests and hotel
+    preference out of free text in one pass over the conversation."""
+
+    def __init__(self, gazetteer: Gazetteer):
+        self.gazetteer = gazetteer
+
+    def extract(self, texts: Iterable[str]) -> Dict[str, str]:
+        scan = _Scan()
+        interests: Dict[str, None] = {}
+        for text in texts:
+            self._scan(text, scan, interests)
+        details = scan.details
+        if interests:
+            details['interests'] = ", ".join(interests)
+        origin, destination = self._resolve_places(scan.places)
+        if origin:
+            details['origin'] = origin
+        if destination:
+            details['destination'] = destination
+        return details
+
+    def _scan(self, text: str, scan: _Scan, interests: Dict[str, None]):
+        details = scan.details
+        for match in _SCAN_RE.finditer(text):
+            kind = match.lastgroup
+            if kind == "money_k":
+                kind = "money"
+            if kind == "word":
+                word = match.group("word")
+                folded = _fold(word)
+                self._feed_place(word, folded, scan)
+                if folded in _INTERESTS:
+                    interests[_INTERESTS[folded]] = None
+                if folded in _HOTEL_STYLES:
+                    details['hotel_preference'] = _HOTEL_STYLES[folded]
+                elif folded in _LODGING_WORDS and scan.pending_cheap:
+                    details['hotel_preference'] = 'budget'
+                elif folded == "star" and scan.prev in ("4", "5"):
+                    details['hotel_preference'] = 'luxury'
+                scan.pending_cheap = folded in _CHEAP_STYLES
+                scan.prev2, scan.prev = scan.prev, folded
+                scan.index += 1
+                continue
+
+            # Anything that is not a word breaks multi-word place names.
+            scan.active.clear()
+            scan.pending_cheap = False
+            if kind == "money" or kind == "money_word":
+                amount = match.group("money") or match.group("money_word")
+                if match.group("money_k"):
+                    amount = f"{float(amount.replace(',', '')) * 1000:g}"
+                strong = scan.prev in _BUDGET_CUES or scan.prev2 in _BUDGET_CUES
+                if strong or not scan.budget_strong:
+                    details['budget'] = f"${amount}"
+                    scan.budget_strong = scan.budget_strong or strong
+            elif kind == "unit":
+                unit = match.group("unit").lower()
+                count = match.group("count")
+                if unit.startswith("week"):
+                    details['duration'] = f"{count} weeks"
+                elif unit.startswith("night"):
+                    details['duration'] = f"{count} nights"
+                else:
+                    details['duration'] = f"{count} days"
+            elif kind == "age":
+                details['age'] = match.group("age")
+            elif kind == "num":
+                number = match.group("num")
+                if scan.prev in _AGE_CUES or scan.prev in ("i'm", "im") or (
+                        scan.prev == "am" and scan.prev2 == "i"):
+                    if len(number) <= 3:
+                        details['age'] = number
+                scan.prev2, scan.prev = scan.prev, number
+                scan.index += 1
+                continue
+            scan.prev2, scan.prev = scan.prev, ""
+            scan.index += 1
+
+    def _feed_place(self, word: str, folded: str, scan: _Scan):
+        index = scan.index
+        advanced = []
+        for node, start, prev, prev2 in scan.active:
+            child = node.get(folded)
+            if child is not None:
+                advanced.append((child, start, prev, prev2))
+        child = self.gazetteer.root.get(folded)
+        if child is not None:
+            advanced.append((child, index, scan.prev, scan.prev2))
+        scan.active = advanced
+        for node, start, prev, prev2 in advanced:
+            entry = node.get(_END)
+            if entry is None:
+                continue
+            canonical, rule = entry
+            if rule == _UPPERCASE and not word.isupper():
+                continue
+            if rule == _CAPITALIZED and start == index and not word[:1].isupper():
+                continue
+            self._add_place(scan.places, (start, index, canonical, prev, prev2))
+        if len(word) == 3 and word.isupper():
+            city = self.gazetteer.airport(word)
+            if city is not None:
+                self._add_place(scan.places, (index, index, city, scan.prev, scan.prev2))
+
+    @staticmethod
+    def _add_place(places, place):
+        start, end = place[0], place[1]
+        # Matches arrive in order of their last token; keep the longest span.
+        while places and places[-1][0] >= start:
+            places.pop()
+        if places and places[-1][0] <= start and places[-1][1] >= end:
+            return
+        places.append(place)
+
+    @staticmethod
+    def _resolve_places(places) -> Tuple[Optional[str], Optional[str]]:
+        origin = None
+        tagged = untagged = None
+        for _start, _end, canonical, prev, prev2 in places:
+            if prev in _ORIGIN_CUES or prev2 in _HOME_CUES or prev in _HOME_CUES:
+                origin = canonical
+            elif prev in _DESTINATION_CUES:
+                tagged = canonical
+            else:
+                untagged = canonical
+        destination = tagged or untagged
+        if destination == origin:
+            destination = None
+            for _start, _end, canonical, _prev, _prev2 in places:
+                if canonical != origin:
+                    destination = canonical
+        return origin, destination
+
+
+def gazetteer_paths() -> List[str]:
+    extra = os.environ.get("TRAVEL_GAZETTEER", "")
+    return [BUNDLED_GAZETTEER] + [p for p in extra.split(os.pathsep) if p]
+
+
+@lru_cache(maxsize=1)
+def default_extractor() -> TravelDetailExtractor:
+    """Process-wide extractor, built the first time it is needed."""
+    gazetteer = Gazetteer()
+    for path in gazetteer_paths():
+        gazetteer.load(path)
+    return TravelDetailExtractor(gazetteer)
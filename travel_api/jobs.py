@@ -0,0 +1,166 @@
+"""Persistent store for asynchronous trip-planning jobs.
+
+A job row holds the request details, its status and, once finished, the
+``Itinerary`` and rendered response. Every crew event (agent steps and
+finished tasks) is appended to ``trip_job_events`` with a per-job
+sequence number, so progress can be polled or streamed by any worker that
+opens the same sqlite file, and results survive worker restarts.
+
+``TRAVEL_JOB_DB`` sets the file (default ``trip_jobs.db``).
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS trip_jobs ("
+    " id TEXT PRIMARY KEY, status TEXT NOT NULL, details TEXT NOT NULL,"
+    " worker TEXT NOT NULL, created REAL NOT NULL, updated REAL NOT NULL,"
+    " itinerary TEXT, response TEXT, error TEXT)",
+    "CREATE TABLE IF NOT EXISTS trip_job_events ("
+    " job_id TEXT NOT NULL, seq INTEGER NOT NULL, type TEXT NOT NULL,"
+    " agent TEXT, task TEXT, tool TEXT, text TEXT, created REAL NOT NULL,"
+    " PRIMARY KEY (job_id, seq))",
+    "CREATE INDEX IF NOT EXISTS trip_jobs_status ON trip_jobs (status)",
+)
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.worker = _worker_id()
+        self._lock = threading.Lock()
+        self._seq: Dict[str, int] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        return cls(os.environ.get("TRAVEL_JOB_DB", "trip_jobs.db"))
+
+    def create(self, details: Dict[str, str]) -> str:
+        job_id = f"trip-{uuid.uuid4().hex[:12]}"
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO trip_jobs (id, status, details, worker, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(details), self.worker, now, now),
+            )
+            self._seq[job_id] = 0
+        return job_id
+
+    def mark_running(self, job_id: str):
+        self._update(job_id, status=RUNNING)
+
+    def succeed(self, job_id: str, itinerary: Any, response: str):
+        self._update(job_id, status=SUCCEEDED, itinerary=json.dumps(itinerary), response=response)
+        self._seq.pop(job_id, None)
+
+    def fail(self, job_id: str, error: str):
+        self._update(job_id, status=FAILED, error=error)
+        self._seq.pop(job_id, None)
+
+    def _update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE trip_jobs SET {columns}, updated = ? WHERE id = ?",
+                (*fields.values(), time.time(), job_id),
+            )
+
+    def add_event(self, job_id: str, event: Dict[str, Any]):
+        """Append a crew event; called from crew worker threads."""
+        with self._lock:
+            seq = self._seq.get(job_id, 0) + 1
+            self._seq[job_id] = seq
+            self._conn.execute(
+                "INSERT INTO trip_job_events (job_id, seq, type, agent, task, tool, text, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, seq, event["type"], event.get("agent"), event.get("task"),
+                 event.get("tool"), event.get("text"), time.time()),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, details, created, updated, itinerary, response, error"
+                " FROM trip_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            tasks = self._conn.execute(
+                "SELECT agent, task, text FROM trip_job_events"
+                " WHERE job_id = ? AND type = 'task' ORDER BY seq", (job_id,)
+            ).fetchall()
+        return {
+            "id": row[0],
+            "status": row[1],
+            "details": json.loads(row[2]),
+            "created": row[3],
+            "updated": row[4],
+            "tasks": [{"agent": agent, "task": task, "output": text} for agent, task, text in tasks],
+            "itinerary": json.loads(row[5]) if row[5] else None,
+            "response": row[6],
+            "error": row[7],
+        }
+
+    def status(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM trip_jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def events_since(self, job_id: str, seq: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, type, agent, task, tool, text, created FROM trip_job_events"
+                " WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, seq)
+            ).fetchall()
+        return [
+            {"seq": s, "type": t, "agent": a, "task": k, "tool": o, "text": x, "created": c}
+            for s, t, a, k, o, x, c in rows
+        ]
+
+    def recover_orphans(self) -> int:
+        """Fail unfinished jobs whose worker process on this host has died."""
+        host = socket.gethostname()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, worker FROM trip_jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchall()
+        orphaned = []
+        for job_id, worker in rows:
+            worker_host, _, pid = worker.rpartition(":")
+            if worker_host == host and worker != self.worker and not _pid_alive(int(pid)):
+                orphaned.append(job_id)
+        for job_id in orphaned:
+            self.fail(job_id, "worker stopped before the trip was planned")
+        return len(orphaned)
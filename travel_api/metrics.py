@@ -0,0 +1,177 @@
+"""Prometheus-style latency metrics for the travel API.
+
+Recording a sample only appends to a deque (atomic under the GIL, no
+lock); samples are sorted into fixed buckets in batches, either when
+enough have piled up or when ``/metrics`` is scraped. Spans are small
+slotted objects around ``perf_counter``, so timing a stage costs well
+under a microsecond and can stay on in production. Gauges and counters
+are read from callbacks only at scrape time.
+"""
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+# Seconds. Covers sub-millisecond parsing up to ten-minute crew runs.
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5,
+    1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)
+
+# Pending samples per histogram before the recording thread buckets them.
+_FLUSH_AT = 1024
+
+# perf_counter() when the current HTTP request reached the app.
+request_started: ContextVar[float] = ContextVar("request_started", default=0.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "_pending", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; the total count is their sum.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        pending = self._pending
+        pending.append(seconds)
+        if len(pending) >= _FLUSH_AT:
+            self.flush()
+
+    def flush(self):
+        """Move pending samples into the buckets."""
+        with self._lock:
+            pending, buckets, counts = self._pending, self.buckets, self.counts
+            total = 0.0
+            for _ in range(len(pending)):
+                seconds = pending.popleft()
+                counts[bisect_left(buckets, seconds)] += 1
+                total += seconds
+            self.sum += total
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        self.flush()
+        with self._lock:
+            return list(self.counts), self.sum
+
+    def time(self) -> "Span":
+        return Span(self)
+
+
+class Span:
+    """Context manager that records its own duration in a histogram."""
+
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self) -> "Span":
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        # Same as Histogram.observe, inlined to save a call per span.
+        pending = self.histogram._pending
+        pending.append(perf_counter() - self.started)
+        if len(pending) >= _FLUSH_AT:
+            self.histogram.flush()
+
+
+class HistogramFamily:
+    """Histograms sharing a name, one per value of a single label."""
+
+    def __init__(self, name: str, help: str, label: str):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._children: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, value: str) -> Histogram:
+        child = self._children.get(value)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(value, Histogram())
+        return child
+
+    def render(self, lines: List[str]):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for value, child in sorted(self._children.items()):
+            counts, total = child.snapshot()
+            count = sum(counts)
+            label = f'{self.label}="{_escape(value)}"'
+            cumulative = 0
+            for bound, bucket in zip(child.buckets, counts):
+                cumulative += bucket
+                lines.append(f'{self.name}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+
+
+class Registry:
+    def __init__(self):
+        self._histograms: List[HistogramFamily] = []
+        self._samples: List[Tuple[str, str, str, Callable[[], float]]] = []
+
+    def histogram(self, name: str, help: str, label: str) -> HistogramFamily:
+        family = HistogramFamily(name, help, label)
+        self._histograms.append(family)
+        return family
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]):
+        self._samples.append((name, help, "gauge", read))
+
+    def counter(self, name: str, help: str, read: Callable[[], float]):
+        self._samples.append((name, help, "counter", read))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._histograms:
+            family.render(lines)
+        for name, help, kind, read in self._samples:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {read():g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+
+stage_seconds = REGISTRY.histogram(
+    "travel_stage_seconds", "Latency of each step of the request path.", "stage")
+task_seconds = REGISTRY.histogram(
+    "travel_crew_task_seconds", "Duration of each SurpriseTravelCrew task.", "task")
+tool_seconds = REGISTRY.histogram(
+    "travel_tool_call_seconds", "Duration of each agent tool call.", "tool")
+
+
+class RequestTimer:
+    """ASGI middleware that stamps the arrival time of every HTTP request,
+    so handlers can tell how long body reading and validation took."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            request_started.set(perf_counter())
+        await self.app(scope, receive, send)
+
+
+def observe_request_parsing(histogram: Histogram):
+    started = request_started.get()
+    if started:
+        histogram.observe(perf_counter() - started)
@@ -0,0 +1,53 @@
+"""Multi-process server for ``watson_x_api``.
+
+    python -m travel_api.serve
+
+Pre-forks one uvicorn worker per available CPU so a single dyno uses all
+of its cores. Workers share the on-disk response cache and the job store
+through sqlite files in WAL mode, so a trip planned by one worker is a
+cache hit in every other. The uvicorn supervisor replaces workers that
+die, restarts them one by one on ``SIGHUP``, and on ``SIGTERM`` each
+worker stops accepting connections and lets open requests and streams
+finish for up to ``TRAVEL_GRACEFUL_TIMEOUT`` seconds.
+
+``PORT`` / ``HOST``             where to listen (default 0.0.0.0:8000)
+``WEB_CONCURRENCY``             worker processes (default: usable CPUs)
+``TRAVEL_CACHE_PATH``           shared cache file (default travel_cache.db)
+``TRAVEL_GRACEFUL_TIMEOUT``     seconds to drain on shutdown (default 30)
+``TRAVEL_MAX_REQUESTS``         recycle a worker after this many requests
+"""
+import os
+
+import uvicorn
+
+DEFAULT_CACHE_PATH = "travel_cache.db"
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on, which can be fewer than the host has."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    return max(1, int(os.environ.get("WEB_CONCURRENCY") or cpu_count()))
+
+
+def main():
+    # Workers inherit the environment, so they all open the same cache file.
+    os.environ.setdefault("TRAVEL_CACHE_PATH", DEFAULT_CACHE_PATH)
+    max_requests = os.environ.get("TRAVEL_MAX_REQUESTS")
+    uvicorn.run(
+        "watson_x_api:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        workers=worker_count(),
+        timeout_graceful_shutdown=int(os.environ.get("TRAVEL_GRACEFUL_TIMEOUT", "30")),
+        limit_max_requests=int(max_requests) if max_requests else None,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Single-flight coalescing of identical in-flight trip plans.
+
+Concurrent callers that ask for the same key share one computation: the
+first caller starts it, later callers attach to it and get the same result
+(or exception). Progress events are fanned out to every attached caller,
+and callers that attach late first get a replay of the events they missed,
+so streaming and non-streaming requests can share a flight.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from travel_api.crew_runner import EventCallback
+
+
+def _replay(listener: EventCallback, events: List[Dict[str, Any]]):
+    for event in events:
+        listener(event)
+
+
+class Flight:
+    """One computation and the callers listening to its progress."""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Future] = None
+        self.events: List[Dict[str, Any]] = []
+        self.listeners: List[EventCallback] = []
+        self._lock = threading.Lock()
+
+    def publish(self, event: Dict[str, Any]):
+        """Record an event and pass it on; safe to call from worker threads.
+        Listeners are called under the lock so every one sees events in order."""
+        with self._lock:
+            self.events.append(event)
+            for listener in self.listeners:
+                listener(event)
+
+    async def attach(self, listener: EventCallback):
+        """Replay the events so far to ``listener``, then subscribe it.
+
+        Listeners may write to disk, so the backlog is replayed in a worker
+        thread, without the lock. Events published meanwhile are replayed
+        under the lock as the listener is subscribed, so none can overtake
+        another."""
+        with self._lock:
+            backlog = list(self.events)
+        if backlog:
+            await asyncio.to_thread(_replay, listener, backlog)
+        with self._lock:
+            _replay(listener, self.events[len(backlog):])
+            self.listeners.append(listener)
+
+    def detach(self, listener: EventCallback):
+        with self._lock:
+            self.listeners.remove(listener)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key."""
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: str, compute: Callable[[EventCallback], Awaitable[Any]],
+                  on_event: Optional[EventCallback] = None) -> Any:
+        """Await ``compute(publish)`` once per key across concurrent callers."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = Flight()
+            self._flights[key] = flight
+            self.started += 1
+            flight.task = asyncio.ensure_future(self._fly(key, flight, compute))
+        else:
+            self.coalesced += 1
+        if on_event is not None:
+            await flight.attach(on_event)
+        try:
+            # A caller that goes away must not cancel the others' result.
+            return await asyncio.shield(flight.task)
+        finally:
+            if on_event is not None:
+                flight.detach(on_event)
+
+    async def _fly(self, key: str, flight: Flight, compute) -> Any:
+        try:
+            return await compute(flight.publish)
+        finally:
+            self._flights.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"started": self.started, "coalesced": self.coalesced, "in_flight": self.in_flight}
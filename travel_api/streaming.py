@@ -0,0 +1,146 @@
+"""Server-sent event streaming for ``/chat/completions``.
+
+Chunks share one pre-serialized envelope per response: only the JSON
+string for the delta content is encoded per chunk (see ``encoding``).
+Progress text coming from the crew worker thread is coalesced by size and
+time window, so a burst of agent steps becomes one chunk and nothing
+waits on a timer when there is text to send.
+
+When the crew streams its itinerary, each activity is sent as soon as the
+compiler has written it, so day 1 shows while later days are still being
+written. The helpers below render the same markdown as the full response.
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from travel_api.encoding import estimate_tokens, json_string, usage_json
+
+DONE = b"data: [DONE]\n\n"
+
+# Human-readable task labels for progress lines.
+TASK_LABELS = {
+    "personalized_activity_planning_task": "activity planning",
+    "restaurant_scenic_location_scout_task": "restaurant scouting",
+    "itinerary_compilation_task": "the itinerary",
+}
+
+
+class ChunkEncoder:
+    """Byte templates for the ``chat.completion.chunk`` objects of one response."""
+
+    def __init__(self, request_id: str, model: str, created: int):
+        head = json.dumps({
+            "id": request_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+        })[:-1]
+        self._content_prefix = f'data: {head}, "choices": [{{"index": 0, "delta": {{"content": '.encode()
+        self._content_suffix = b'}, "finish_reason": null}]}\n\n'
+        self._role = f'data: {head}, "choices": [{{"index": 0, "delta": {{"role": "assistant"}}, "finish_reason": null}}]}}\n\n'.encode()
+        self._stop = f'data: {head}, "choices": [{{"index": 0, "delta": {{}}, "finish_reason": "stop"}}]}}\n\n'.encode()
+        self._usage_prefix = f'data: {head}, "choices": [], "usage": '.encode()
+        self.completion_tokens = 0
+
+    def role(self) -> bytes:
+        return self._role
+
+    def content(self, text: str) -> bytes:
+        self.completion_tokens += estimate_tokens(text)
+        return self._content_prefix + json_string(text) + self._content_suffix
+
+    def stop(self) -> bytes:
+        return self._stop
+
+    def usage(self, prompt_tokens: int) -> bytes:
+        """Final chunk for clients that ask for ``stream_options.include_usage``."""
+        return self._usage_prefix + usage_json(prompt_tokens, self.completion_tokens) + b"}\n\n"
+
+
+def day_heading(number: int, date: str) -> str:
+    return f"**📅 Day {number}: {date or ''}**"
+
+
+def activity_line(activity: Dict[str, Any]) -> str:
+    return (f"• **{activity.get('name', 'Activity')}** ({activity.get('location', 'TBD')}): "
+            f"{activity.get('description', '')}")
+
+
+def day_details(day: Dict[str, Any]) -> List[str]:
+    lines = []
+    if day.get('flight'):
+        lines.append(f"✈️ {day['flight']}")
+    if day.get('restaurants'):
+        lines.append(f"🍽️ {', '.join(day['restaurants'])}")
+    return lines
+
+
+def describe_event(event: Dict[str, Any]) -> str:
+    """One progress line for a runner event, or "" for events not worth showing."""
+    agent = event.get("agent") or "Agent"
+    kind = event["type"]
+    if kind == "name":
+        return f"\n**🗺️ {event['value']}**\n"
+    if kind == "activity":
+        line = activity_line(event["activity"]) + "\n"
+        if event["index"] == 0:
+            line = f"\n{day_heading(event['day'], event['activity'].get('date'))}\n{line}"
+        return line
+    if kind == "day":
+        lines = day_details(event["plan"])
+        if not event["plan"].get("activities"):
+            lines.insert(0, f"\n{day_heading(event['day'], event['plan'].get('date'))}")
+        return "".join(f"{line}\n" for line in lines)
+    if kind == "hotel":
+        return f"\n🏨 {event['value']}\n"
+    if kind == "task":
+        label = TASK_LABELS.get(event.get("task"), event.get("task") or "a task")
+        return f"✅ {agent} finished {label}\n"
+    if event.get("tool"):
+        return f"🔎 {agent}: {event['tool']}\n"
+    return ""
+
+
+async def coalesce(queue: "asyncio.Queue[Optional[str]]", max_chars: int = 512,
+                   window: float = 0.05) -> AsyncIterator[str]:
+    """Yield the text put on ``queue`` in batches of up to ``max_chars``,
+    flushing a partial batch ``window`` seconds after its first fragment.
+    ``None`` ends the stream."""
+    loop = asyncio.get_running_loop()
+    buffer = []
+    size = 0
+    deadline = 0.0
+    while True:
+        if buffer:
+            try:
+                item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                yield "".join(buffer)
+                buffer, size = [], 0
+                continue
+        else:
+            item = await queue.get()
+        if item is None:
+            if buffer:
+                yield "".join(buffer)
+            return
+        if not item:
+            continue
+        if not buffer:
+            deadline = loop.time() + window
+        buffer.append(item)
+        size += len(item)
+        if size >= max_chars:
+            yield "".join(buffer)
+            buffer, size = [], 0
+
+
+def split_text(text: str, max_chars: int = 512):
+    """Cut finished text into chunk-sized pieces on whitespace where possible."""
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars) + 1 or max_chars
+        yield text[:cut]
+        text = text[cut:]
+    if text:
+        yield text
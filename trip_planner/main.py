@@ -1,11 +1,26 @@
-from crewai import Crew
+import importlib
+import threading
 from textwrap import dedent
-from trip_agents import TripAgents
-from trip_tasks import TripTasks
 
 from dotenv import load_dotenv
+
 load_dotenv()
 
+# crewai, langchain and unstructured take seconds to import, so they load
+# in the background while the questions are answered
+HEAVY_MODULES = ("crewai", "trip_agents", "trip_tasks")
+
+def preload(modules):
+  """Import modules on a background thread, which is returned; join it
+  before importing them here, as concurrent imports of one module can
+  deadlock or see it half initialized."""
+  def load():
+    for module in modules:
+      importlib.import_module(module)
+  loader = threading.Thread(target=load, daemon=True)
+  loader.start()
+  return loader
+
 class TripCrew:
 
   def __init__(self, origin, cities, date_range, interests):
@@ -15,6 +30,11 @@ class TripCrew:
     self.date_range = date_range
 
   def run(self):
+    from crewai import Crew
+
+    from trip_agents import TripAgents
+    from trip_tasks import TripTasks
+
     agents = TripAgents()
     tasks = TripTasks()
 
@@ -54,6 +74,7 @@ class TripCrew:
     return result
 
 if __name__ == "__main__":
+  loader = preload(HEAVY_MODULES)
   print("## Welcome to Trip Planner Crew")
   print('-------------------------------')
   location = input(
@@ -73,6 +94,7 @@ if __name__ == "__main__":
       What are some of your high level interests and hobbies?
     """))
   
+  loader.join()
   trip_crew = TripCrew(location, cities, date_range, interests)
   result = trip_crew.run()
   print("\n\n########################")
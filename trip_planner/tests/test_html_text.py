@@ -0,0 +1,79 @@
+from tools.html_text import decoded, html_elements
+
+
+def elements(*pieces, max_chars=16000):
+  return list(html_elements(pieces, max_chars))
+
+
+def test_categories():
+  page = ("<html><head><title>Guide</title></head><body>"
+          "<header><nav><a>Home</a></nav></header>"
+          "<article><header><h1>Lisbon</h1></header><p>Trams run all day.</p>"
+          "<ul><li>Alfama</li><li>Belem</li></ul></article>"
+          "<footer><p>Copyright</p></footer></body></html>")
+  assert elements(page) == [
+      ("Header", "Home"),
+      ("Title", "Lisbon"),
+      ("NarrativeText", "Trams run all day."),
+      ("ListItem", "Alfama"),
+      ("ListItem", "Belem"),
+      ("Footer", "Copyright"),
+  ]
+
+
+def test_skips_scripts_and_styles():
+  page = ("<style>p { color: red }</style>"
+          "<script>var p = '<p>x</p>';</script><p>Text</p>")
+  assert elements(page) == [("NarrativeText", "Text")]
+
+
+def test_head_without_closing_tag():
+  page = "<html><head><title>x</title><body><p>Hello there</p>"
+  assert elements(page) == [("NarrativeText", "Hello there")]
+
+
+def test_head_ends_at_first_body_tag():
+  page = "<head><meta charset=utf-8><link rel=icon href=x><h1>Title</h1><p>Text</p>"
+  assert elements(page) == [("Title", "Title"), ("NarrativeText", "Text")]
+
+
+def test_iframe_without_closing_tag():
+  page = "<p>Before</p><iframe src=x><p>After</p><div>More</div>"
+  assert elements(page) == [
+      ("NarrativeText", "Before"),
+      ("NarrativeText", "After"),
+      ("UncategorizedText", "More"),
+  ]
+
+
+def test_iframe_fallback_text_is_skipped():
+  page = "<p>Before</p><iframe src=x>Your browser can't show this</iframe><p>After</p>"
+  assert elements(page) == [("NarrativeText", "Before"), ("NarrativeText", "After")]
+
+
+def test_unclosed_list_items_and_paragraphs():
+  page = "<ul><li>One<li>Two</ul><p>First<p>Second<div>Block</div>"
+  assert elements(page) == [
+      ("ListItem", "One"), ("ListItem", "Two"),
+      ("NarrativeText", "First"), ("NarrativeText", "Second"),
+      ("UncategorizedText", "Block"),
+  ]
+
+
+def test_pieces_split_anywhere():
+  page = "<p>Trams run <b>all</b> day.</p><h2>Where to eat</h2>"
+  whole = elements(page)
+  assert elements(*page) == whole
+  assert elements(page[:7], page[7:20], page[20:]) == whole
+
+
+def test_long_text_is_cut():
+  page = "<p>" + "<b>word</b> " * 100 + "</p>"
+  texts = [text for _, text in elements(page, max_chars=100)]
+  assert len(texts) > 1
+  assert " ".join(texts).split() == ["word"] * 100
+
+
+def test_decoded_across_blocks():
+  data = "café à Lisboa".encode("utf-8")
+  assert "".join(decoded([data[:4], data[4:5], data[5:]], "utf-8")) == "café à Lisboa"
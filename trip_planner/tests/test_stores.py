@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from tools.page_store import PageStore
+from tools.search_cache import REPLAY, SearchCache, SearchNotRecorded
+
+
+def loader(text, calls):
+  def load():
+    calls.append(1)
+    return text
+  return load
+
+
+def test_page_hit_and_stale(tmp_path):
+  store = PageStore(str(tmp_path / "pages.db"), fresh_seconds=60)
+  calls = []
+  assert store.fetch("https://a.example", loader("Trams run.", calls)) == "Trams run."
+  assert store.fetch("https://a.example", loader("Changed.", calls)) == "Trams run."
+  assert len(calls) == 1
+  store.fresh_seconds = 0
+  assert store.fetch("https://a.example", loader("Changed.", calls)) == "Changed."
+  assert len(calls) == 2
+
+
+def test_page_stream_stores_what_it_reads(tmp_path):
+  store = PageStore(str(tmp_path / "pages.db"))
+  paragraphs = ["Trams run all day.", "Alfama", "Belem"]
+  assert list(store.stream("https://a.example", lambda: iter(paragraphs))) == paragraphs
+  assert list(store.stream("https://a.example", lambda: iter(["other"]))) == paragraphs
+  assert store.fetch("https://a.example", lambda: "other") == "\n\n".join(paragraphs)
+
+
+def test_page_stream_keeps_nothing_when_stopped_early(tmp_path):
+  store = PageStore(str(tmp_path / "pages.db"))
+  pages = store.stream("https://a.example", lambda: iter(["one", "two"]))
+  assert next(pages) == "one"
+  pages.close()
+  assert store.fetch("https://a.example", lambda: "fresh") == "fresh"
+
+
+def test_page_evicts_least_recently_read(tmp_path):
+  store = PageStore(str(tmp_path / "pages.db"))
+  for name in "abc":
+    store.save(f"https://{name}.example", name * 100)
+    time.sleep(0.01)
+  store.fetch("https://a.example", lambda: "reloaded")
+  store.max_bytes = 2 * store._conn.execute(
+      "SELECT MAX(size) FROM page_text").fetchone()[0]
+  store.save("https://d.example", "d" * 100)
+  assert store.fetch("https://a.example", lambda: "reloaded") == "a" * 100
+  assert store.fetch("https://d.example", lambda: "reloaded") == "d" * 100
+  assert store.fetch("https://b.example", lambda: "reloaded") == "reloaded"
+
+
+def test_search_hit_miss_and_expiry(tmp_path):
+  cache = SearchCache(str(tmp_path / "search.db"), ttls={"evergreen": 60})
+  calls = []
+
+  def search():
+    calls.append(1)
+    return {"organic": [len(calls)]}
+
+  assert cache.fetch("Best  restaurants in Tokyo", search) == {"organic": [1]}
+  assert cache.fetch("best restaurants in tokyo?", search) == {"organic": [1]}
+  assert cache.fetch("error", lambda: {"message": "quota"},
+                     store_if=lambda body: "organic" in body) == {"message": "quota"}
+  assert cache.lookup("error") is None
+
+  cache.ttls["evergreen"] = -1
+  cache.fetch("museums in Kyoto", search)
+  assert cache.fetch("museums in Kyoto", search) == {"organic": [3]}
+
+
+def test_search_replay_serves_expired_and_fails_on_miss(tmp_path):
+  path = str(tmp_path / "search.db")
+  SearchCache(path, ttls={"evergreen": -1}).store("museums in Kyoto", {"organic": []})
+  replay = SearchCache(path, REPLAY)
+
+  def live():
+    return {"organic": ["live"]}
+
+  assert replay.fetch("museums in Kyoto", live) == {"organic": []}
+  with pytest.raises(SearchNotRecorded):
+    replay.fetch("museums in Osaka", live)
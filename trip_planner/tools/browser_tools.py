@@ -1,38 +1,39 @@
 import json
 import os
 
-import requests
-from crewai import Agent, Task
-from langchain.tools import tool
-from unstructured.partition.html import partition_html
+from crewai.tools import tool
+
+from tools.chunking import chunker, keep, text_elements
+from tools.html_text import decoded, html_elements
+from tools.http_session import session, timeout
+from tools.page_store import page_store
+from tools.summarizer import summarize
 
 
 class BrowserTools():
 
   @tool("Scrape website content")
-  def scrape_and_summarize_website(website):
+  def scrape_and_summarize_website(website: str):
     """Useful to scrape and summarize a website content"""
-    url = f"https://chrome.browserless.io/content?token={os.environ['BROWSERLESS_API_KEY']}"
+    # Chunks go to the summarizers while the page is still downloading
+    paragraphs = page_store().stream(
+        website, lambda: BrowserTools.page_paragraphs(website))
+    return summarize(chunker().chunks(website, text_elements(paragraphs)))
+
+  @staticmethod
+  def page_paragraphs(website):
+    base_url = os.environ.get('BROWSERLESS_URL', 'https://chrome.browserless.io')
+    url = f"{base_url}/content?token={os.environ['BROWSERLESS_API_KEY']}"
     payload = json.dumps({"url": website})
     headers = {'cache-control': 'no-cache', 'content-type': 'application/json'}
-    response = requests.request("POST", url, headers=headers, data=payload)
-    elements = partition_html(text=response.text)
-    content = "\n\n".join([str(el) for el in elements])
-    content = [content[i:i + 8000] for i in range(0, len(content), 8000)]
-    summaries = []
-    for chunk in content:
-      agent = Agent(
-          role='Principal Researcher',
-          goal=
-          'Do amazing researches and summaries based on the content you are working with',
-          backstory=
-          "You're a Principal Researcher at a big company and you need to do a research about a given topic.",
-          allow_delegation=False)
-      task = Task(
-          agent=agent,
-          description=
-          f'Analyze and summarize the content bellow, make sure to include the most relevant information in the summary, return only the summary nothing else.\n\nCONTENT\n----------\n{chunk}'
-      )
-      summary = task.execute()
-      summaries.append(summary)
-    return "\n\n".join(summaries)
+    with session().post(url, headers=headers, data=payload, timeout=timeout(),
+                        stream=True) as response:
+      # Error pages (401, 429, 5xx) must not be summarized or stored as the page
+      response.raise_for_status()
+      # requests assumes latin-1 for text/html without a charset;
+      # rendered pages are UTF-8
+      charset = 'charset' in response.headers.get('content-type', '')
+      text = decoded(response.iter_content(64 * 1024),
+                     response.encoding if charset else 'utf-8')
+      for _, paragraph in keep(html_elements(text)):
+        yield paragraph
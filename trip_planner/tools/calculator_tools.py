@@ -1,64 +1,284 @@
-from langchain.tools import tool
 import ast
 import operator
 import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from crewai.tools import tool
+
+# Define allowed operators for safe evaluation
+ALLOWED_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.Mod: operator.mod,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+_EXPRESSION_RE = re.compile(r'^[0-9+\-*/().% ]+$')
+
+# Units a line item is charged per; an item with none of them is charged once
+UNITS = ("night", "day", "person")
+_UNIT_RE = re.compile(r'[\s,_/+-]+')
+_ONE_OFF = frozenset({"", "trip", "one", "off", "once", "total", "item"})
+# Words that only join units, as in "per person per night"
+_FILLER = frozenset({"per", "each", "every", "a", "an", "and"})
+
+
+@lru_cache(maxsize=4096)
+def parse_expression(expression):
+    """A checked arithmetic expression, compiled once into a function of no arguments.
+    Raises ValueError or SyntaxError when the expression isn't allowed."""
+    # Parse and validate the expression
+    if not _EXPRESSION_RE.match(expression):
+        raise ValueError("Invalid characters in mathematical expression")
+    return _compile(ast.parse(expression, mode='eval'))
+
+
+def _compile(node):
+    if isinstance(node, ast.Expression):
+        return _compile(node.body)
+    elif isinstance(node, ast.Constant):
+        value = node.value
+        return lambda: value
+    elif isinstance(node, ast.BinOp):
+        left, right = _compile(node.left), _compile(node.right)
+        op = ALLOWED_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        return lambda: op(left(), right())
+    elif isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand)
+        op = ALLOWED_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        return lambda: op(operand())
+    else:
+        raise ValueError(f"Unsupported node type: {type(node).__name__}")
+
+
+def evaluate(expression):
+    return parse_expression(expression.strip())()
+
+
+class Scenario(NamedTuple):
+    name: str
+    days: int
+    nights: int
+    travelers: int
+    total: float
+
+
+class Budget(NamedTuple):
+    currency: str
+    total: float
+    per_person: float
+    by_category: Dict[str, float]
+    by_day: List[float]
+    scenarios: List[Scenario]
+    travelers: int
+    days: int
+    nights: int
+    items: List[Tuple[str, str, float]]   # (name, category, cost)
+
+
+def _units(per):
+    """Exponents of (nights, days, travelers) for an item's ``per``,
+    e.g. "person night"."""
+    words = {word.rstrip('s') for word in _UNIT_RE.split(str(per or "").lower())}
+    words -= _ONE_OFF | _FILLER
+    unknown = words - set(UNITS)
+    if unknown:
+        raise ValueError(f"Unknown unit {per!r}: use night, day, person, "
+                         "a mix like 'person night', or one-off")
+    return tuple(int(unit in words) for unit in UNITS)
+
+
+def _amount(value):
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f"Invalid amount {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(evaluate(str(value)))
+
+
+def plan_budget(items: list, days: int, travelers: int = 1,
+                nights: Optional[int] = None, currency: str = "USD",
+                rates: Optional[dict] = None, scenarios: Optional[list] = None):
+    """Totals, per category and per day breakdowns and what-if scenarios of
+    a trip budget.
+
+    Each item is a dict with ``amount`` (a number or an expression such as
+    ``"3*15"``), ``per`` ("night", "day", "person", combinations such as
+    "person night", or "one-off"), and optionally ``name``, ``category``,
+    ``currency`` and, for one-off items, the ``day`` it falls on (default
+    1). ``rates`` converts other currencies: units of ``currency`` per unit
+    of each. ``nights`` defaults to one less than ``days`` and can't be more
+    than ``days``; per-night costs fall on the first ``nights`` days.
+
+    Scenarios override ``days``, ``nights``, ``travelers`` or ``rates`` and
+    may ``scale`` categories, e.g. ``{"name": "luxury", "scale": {"Lodging": 2}}``.
+    All scenarios are computed at once, as arrays of items by scenarios.
+    """
+    if not items:
+        raise ValueError("No line items")
+    days = int(days)
+    if days < 1:
+        raise ValueError("days must be at least 1")
+    nights = days - 1 if nights is None else int(nights)
+    if not 0 <= nights <= days:
+        raise ValueError(f"nights must be between 0 and days ({days}), not {nights}")
+    travelers = int(travelers)
+    currency = str(currency or "USD").upper()
+    rates = {str(code).upper(): float(rate) for code, rate in (rates or {}).items()}
+
+    names, categories, currencies, amounts, exponents, on_day = [], [], [], [], [], []
+    for number, item in enumerate(items, 1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Item {number} should be an object "
+                             "with an amount and a per")
+        names.append(str(item.get("name") or f"item {number}"))
+        categories.append(str(item.get("category") or "Other"))
+        currencies.append(str(item.get("currency") or currency).upper())
+        amounts.append(_amount(item.get("amount")))
+        exponents.append(_units(item.get("per")))
+        on_day.append(min(max(int(item.get("day") or 1), 1), days))
+
+    plans = [{"name": "base"}]
+    lengths = [(days, nights)]
+    for number, plan in enumerate(scenarios or [], 1):
+        if not isinstance(plan, dict):
+            raise ValueError(f"Scenario {number} should be an object like "
+                             "{\"name\": \"...\", \"travelers\": 3}")
+        plan_length = int(plan.get("days", days))
+        default_nights = nights if "days" not in plan else plan_length - 1
+        plan_nights = int(plan.get("nights", default_nights))
+        if plan_length < 1 or not 0 <= plan_nights <= plan_length:
+            raise ValueError(f"Scenario {number}: needs at least 1 day "
+                             "and between 0 and days nights")
+        plans.append(plan)
+        lengths.append((plan_length, plan_nights))
+    scenario_names = [str(plan.get("name") or f"scenario {number}")
+                      for number, plan in enumerate(plans)]
+    plan_days, plan_nights = np.array(lengths, dtype=float).T
+    plan_travelers = np.array([int(plan.get("travelers", travelers)) for plan in plans],
+                              dtype=float)
+
+    def rate(plan, code):
+        if code == currency:
+            return 1.0
+        overrides = (plan.get("rates") or {}).items()
+        plan_rates = {**rates,
+                      **{str(key).upper(): float(value) for key, value in overrides}}
+        if code not in plan_rates:
+            raise ValueError(f"No exchange rate from {code} to {currency}")
+        return plan_rates[code]
+
+    # plans x items
+    conversion = np.array([[rate(plan, code) for code in currencies] for plan in plans])
+    scale = np.array([[float((plan.get("scale") or {}).get(category, 1))
+                       for category in categories] for plan in plans])
+    per_night, per_day, per_person = np.array(exponents, dtype=float).T
+    unit_costs = (np.array(amounts) * conversion * scale
+                  * plan_travelers[:, None] ** per_person)
+    costs = (unit_costs * plan_nights[:, None] ** per_night
+             * plan_days[:, None] ** per_day)
+    totals = costs.sum(axis=1)
+
+    category_names = list(dict.fromkeys(categories))
+    category_index = np.array([category_names.index(category)
+                               for category in categories])
+    by_category = np.bincount(category_index, weights=costs[0],
+                              minlength=len(category_names))
+
+    # items x days: which days each item is paid on, times what it costs that day
+    day_numbers = np.arange(days)
+    one_off_day = day_numbers == np.array(on_day)[:, None] - 1
+    paid = np.where(per_night[:, None] > 0, day_numbers < nights,
+                    np.where(per_day[:, None] > 0, True, one_off_day))
+    by_day = unit_costs[0] @ paid
+
+    scenario_rows = zip(scenario_names[1:], plan_days[1:], plan_nights[1:],
+                        plan_travelers[1:], totals[1:], strict=True)
+    return Budget(
+        currency=currency,
+        total=float(totals[0]),
+        per_person=float(totals[0] / max(travelers, 1)),
+        by_category={name: float(value)
+                     for name, value in zip(category_names, by_category, strict=True)},
+        by_day=[float(value) for value in by_day],
+        scenarios=[Scenario(name, int(d), int(n), int(t), float(total))
+                   for name, d, n, t, total in scenario_rows],
+        travelers=travelers, days=days, nights=nights,
+        items=[(name, category, float(cost)) for name, category, cost
+               in zip(names, categories, costs[0], strict=True)],
+    )
+
+
+def format_budget(budget):
+    money = lambda value: f"{value:,.2f}"  # noqa: E731
+    lines = [f"Total: {money(budget.total)} {budget.currency} for {budget.days} days, "
+             f"{budget.nights} nights, "
+             f"{budget.travelers} traveler{'s' if budget.travelers != 1 else ''} "
+             f"({money(budget.per_person)} per person)", "By category:"]
+    lines += [f"  {category}: {money(value)}"
+              for category, value in budget.by_category.items()]
+    lines.append("By day:")
+    lines += [f"  Day {number}: {money(value)}"
+              for number, value in enumerate(budget.by_day, 1)]
+    lines.append("Line items:")
+    lines += [f"  {name} ({category}): {money(cost)}"
+              for name, category, cost in budget.items]
+    if budget.scenarios:
+        lines.append("Scenarios:")
+        lines += [f"  {scenario.name}: {money(scenario.total)} "
+                  f"({money(scenario.total / max(scenario.travelers, 1))} per person, "
+                  f"{scenario.total - budget.total:+,.2f}; {scenario.days} days, "
+                  f"{scenario.nights} nights, {scenario.travelers} travelers)"
+                  for scenario in budget.scenarios]
+    return "\n".join(lines)
+
 
 class CalculatorTools():
 
     @tool("Make a calculation")
-    def calculate(operation):
-        """Useful to perform any mathematical calculations, 
+    def calculate(operation: str):
+        """Useful to perform any mathematical calculations,
         like sum, minus, multiplication, division, etc.
-        The input to this tool should be a mathematical 
+        The input to this tool should be a mathematical
         expression, a couple examples are `200*7` or `5000/2*10`
         """
         try:
-            # Define allowed operators for safe evaluation
-            allowed_operators = {
-                ast.Add: operator.add,
-                ast.Sub: operator.sub,
-                ast.Mult: operator.mul,
-                ast.Div: operator.truediv,
-                ast.Pow: operator.pow,
-                ast.Mod: operator.mod,
-                ast.USub: operator.neg,
-                ast.UAdd: operator.pos,
-            }
-            
-            # Parse and validate the expression
-            if not re.match(r'^[0-9+\-*/().% ]+$', operation):
-                return "Error: Invalid characters in mathematical expression"
-            
-            # Parse the expression
-            tree = ast.parse(operation, mode='eval')
-            
-            def _eval_node(node):
-                if isinstance(node, ast.Expression):
-                    return _eval_node(node.body)
-                elif isinstance(node, ast.Constant):  # Python 3.8+
-                    return node.value
-                elif isinstance(node, ast.Num):  # Python < 3.8
-                    return node.n
-                elif isinstance(node, ast.BinOp):
-                    left = _eval_node(node.left)
-                    right = _eval_node(node.right)
-                    op = allowed_operators.get(type(node.op))
-                    if op is None:
-                        raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
-                    return op(left, right)
-                elif isinstance(node, ast.UnaryOp):
-                    operand = _eval_node(node.operand)
-                    op = allowed_operators.get(type(node.op))
-                    if op is None:
-                        raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
-                    return op(operand)
-                else:
-                    raise ValueError(f"Unsupported node type: {type(node).__name__}")
-            
-            result = _eval_node(tree)
-            return result
-            
+            return evaluate(operation)
         except (SyntaxError, ValueError, ZeroDivisionError, TypeError) as e:
             return f"Error: {str(e)}"
-        except Exception as e:
+        except Exception:
             return "Error: Invalid mathematical expression"
+
+    @tool("Calculate a trip budget")
+    def calculate_budget(items: list, days: int, travelers: int = 1,
+                         nights: Optional[int] = None, currency: str = "USD",
+                         rates: Optional[dict] = None,
+                         scenarios: Optional[list] = None):
+        """Useful to compute a whole trip budget in one call: the total, the
+        cost per person, per category and per day, and what-if scenarios.
+        `items` is a list of line items like
+        {"name": "Hotel", "category": "Lodging", "amount": 120, "per": "night",
+        "currency": "EUR"};
+        `per` is night, day, person, a mix like "person day", or one-off,
+        and `amount` may be an expression like "3*15".
+        `rates` gives units of `currency` per unit of other currencies,
+        e.g. {"EUR": 1.08}.
+        `nights` defaults to days - 1 and can't be more than days.
+        Each scenario may change days, nights, travelers or rates and scale
+        categories, e.g. {"name": "3 travelers", "travelers": 3} or
+        {"name": "luxury", "scale": {"Lodging": 2}}.
+        """
+        try:
+            return format_budget(plan_budget(items, days, travelers, nights,
+                                             currency, rates, scenarios))
+        except (SyntaxError, ValueError, ZeroDivisionError, TypeError) as e:
+            return f"Error: {str(e)}"
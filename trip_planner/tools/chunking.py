@@ -0,0 +1,240 @@
+"""Cut scraped pages into fewer, denser chunks for the summarizer.
+
+Pages arrive as ``(category, text)`` elements, the categories being
+``partition_html``'s, which ``tools.html_text`` also uses (``None`` when
+unknown). Before chunking:
+
+- headers, footers, images, captions and the like are dropped, and so
+  are list items and loose text of only a few words: menus, breadcrumbs,
+  "Sign in", "Accept cookies";
+- an element repeated on the same page is kept once;
+- an element already seen on TRAVEL_BOILERPLATE_PAGES other pages of the
+  same site is dropped as boilerplate (navigation, cookie banners,
+  newsletter boxes). Sites are remembered per process.
+
+What is left is packed into chunks of at most TRAVEL_CHUNK_TOKENS tokens
+(about four characters each), breaking between elements, or between
+sentences when one element is too long on its own. A chunk that mostly
+repeats one of the page's last 1024 is dropped; chunks are compared by a
+min-hash sketch of their word 5-grams, banded so that a chunk is only
+checked against the few that could match.
+
+Only elements of up to 500 characters are tracked as boilerplate
+candidates, at most 2000 per site, so memory is bounded whatever the
+size or number of pages.
+
+``chunks`` is a generator: each chunk is yielded as soon as it is full,
+while the rest of the page is still being read.
+
+TRAVEL_CHUNK_TOKENS       tokens per chunk (default 2000, about the old 8000 characters)
+TRAVEL_BOILERPLATE_PAGES  pages an element must appear on to be boilerplate (default 2)
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+LOW_VALUE = frozenset({
+    "Header", "Footer", "Image", "PageBreak", "FigureCaption", "EmailAddress",
+    "Formula",
+})
+# Categories that are only worth keeping when they say something
+SHORT_CATEGORIES = frozenset({"UncategorizedText", "ListItem"})
+MIN_WORDS = 4
+# Near-duplicate chunks: min-hash bins, and bands of them to look chunks up by
+BINS = 64
+BANDS = 16
+_MASK = (1 << 64) - 1
+_EMPTY = 1 << 64   # above every hash: a bin no 5-gram fell in
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_SPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokens(text):
+  return (len(text) + 3) // 4
+
+
+def keep(elements):
+  """Elements worth summarizing, in order."""
+  for category, text in elements:
+    text = _SPACE_RE.sub(" ", text).strip()
+    if not text or category in LOW_VALUE:
+      continue
+    if category in SHORT_CATEGORIES and len(text.split()) < MIN_WORDS:
+      continue
+    yield category, text
+
+
+def text_elements(paragraphs):
+  """Elements of a page stored as text, from its paragraphs."""
+  return ((None, paragraph) for paragraph in paragraphs)
+
+
+def _digest(text):
+  return hashlib.blake2b(text.casefold().encode("utf-8"), digest_size=8).digest()
+
+
+def _sketch(text, size=5):
+  """Min-hash of the text's word 5-grams: the smallest hash in each of BINS bins."""
+  words = _WORD_RE.findall(text.casefold())
+  sketch = [_EMPTY] * BINS
+  for i in range(max(1, len(words) - size + 1)):
+    value = hash(tuple(words[i:i + size])) & _MASK
+    slot = value % BINS
+    if value < sketch[slot]:
+      sketch[slot] = value
+  return tuple(sketch)
+
+
+def _similarity(a, b):
+  """Jaccard similarity estimated from two sketches."""
+  filled = [x == y for x, y in zip(a, b, strict=True) if x != _EMPTY or y != _EMPTY]
+  return sum(filled) / len(filled) if filled else 1.0
+
+
+class _Sketches():
+  """The sketches of a page's last ``window`` chunks, indexed by band.
+
+  Sketches are cut into BANDS bands; two chunks at ``similarity`` 0.8
+  almost surely (over 99.9%) agree on a whole band, so a new chunk is only
+  compared with the chunks it shares a band with rather than with all.
+  """
+
+  def __init__(self, similarity, window):
+    self.similarity = similarity
+    self.window = window
+    self._sketches = OrderedDict()                # chunk number -> sketch
+    self._bands = [{} for _ in range(BANDS)]      # band values -> chunk numbers
+    self._count = 0
+
+  @staticmethod
+  def _keys(sketch):
+    rows = BINS // BANDS
+    return [sketch[band * rows:(band + 1) * rows] for band in range(BANDS)]
+
+  def repeats(self, sketch):
+    """Whether ``sketch`` is close to a kept one; keeps it when it is not."""
+    keys = self._keys(sketch)
+    candidates = {number for band, key in zip(self._bands, keys, strict=True)
+                  for number in band.get(key, ())}
+    if any(_similarity(sketch, self._sketches[number]) >= self.similarity
+           for number in candidates):
+      return True
+    self._count += 1
+    self._sketches[self._count] = sketch
+    for band, key in zip(self._bands, keys, strict=True):
+      band.setdefault(key, set()).add(self._count)
+    if len(self._sketches) > self.window:
+      old, old_sketch = self._sketches.popitem(last=False)
+      for band, key in zip(self._bands, self._keys(old_sketch), strict=True):
+        band[key].discard(old)
+        if not band[key]:
+          del band[key]
+    return False
+
+
+class Chunker():
+
+  def __init__(self, budget=2000, boilerplate_pages=2, similarity=0.8, sites=256,
+               elements_per_site=2000, boilerplate_chars=500, window=1024):
+    self.budget = budget
+    self.boilerplate_pages = boilerplate_pages
+    self.similarity = similarity
+    self.sites = sites
+    self.elements_per_site = elements_per_site
+    self.boilerplate_chars = boilerplate_chars
+    self.window = window
+    # site -> OrderedDict(element digest -> tuple of page digests)
+    self._seen = OrderedDict()
+    self._lock = threading.Lock()
+
+  @classmethod
+  def from_env(cls):
+    return cls(int(os.environ.get("TRAVEL_CHUNK_TOKENS", "2000")),
+               int(os.environ.get("TRAVEL_BOILERPLATE_PAGES", "2")))
+
+  def chunks(self, url, elements):
+    """Chunks of the page at ``url`` to summarize, as they fill up."""
+    sketches = _Sketches(self.similarity, self.window)
+    for chunk in self._pack(self._content(url, (text for _, text in keep(elements)))):
+      if not sketches.repeats(_sketch(chunk)):
+        yield chunk
+
+  def _site(self, site):
+    with self._lock:
+      elements = self._seen.pop(site, None) or OrderedDict()
+      self._seen[site] = elements
+      while len(self._seen) > self.sites:
+        self._seen.popitem(last=False)
+      return elements
+
+  def _content(self, url, texts):
+    """Drop repeats within the page and elements that are boilerplate on its site."""
+    parts = urlsplit(url)
+    elements = self._site(parts.netloc.lower())
+    page = _digest(parts.path + "?" + parts.query)
+    on_page = OrderedDict()
+    for text in texts:
+      digest = _digest(text)
+      if digest in on_page:
+        continue
+      on_page[digest] = None
+      if len(on_page) > self.window * 16:
+        on_page.popitem(last=False)
+      if len(text) > self.boilerplate_chars:
+        # Menus, banners and footers are short; long text is the page's own
+        yield text
+        continue
+      with self._lock:
+        pages = elements.get(digest, ())
+        others = sum(1 for other in pages if other != page)
+        boilerplate = others >= self.boilerplate_pages
+        if page not in pages and len(pages) <= self.boilerplate_pages:
+          elements[digest] = pages + (page,)
+          if len(elements) > self.elements_per_site:
+            elements.popitem(last=False)
+      if not boilerplate:
+        yield text
+
+  def _pieces(self, text):
+    if tokens(text) <= self.budget:
+      yield text
+      return
+    for sentence in _SENTENCE_RE.split(text):
+      if tokens(sentence) <= self.budget:
+        yield sentence
+        continue
+      piece, length = [], 0
+      for word in sentence.split(" "):
+        word = word[:self.budget * 4]
+        if piece and (length + len(word) + 3) // 4 > self.budget:
+          yield " ".join(piece)
+          piece, length = [], 0
+        piece.append(word)
+        length += len(word) + 1
+      if piece:
+        yield " ".join(piece)
+
+  def _pack(self, blocks):
+    current, size = [], 0
+    for block in blocks:
+      for piece in self._pieces(block):
+        cost = tokens(piece) + (1 if current else 0)
+        if current and size + cost > self.budget:
+          yield "\n\n".join(current)
+          current, size = [], 0
+          cost = tokens(piece)
+        current.append(piece)
+        size += cost
+    if current:
+      yield "\n\n".join(current)
+
+
+@lru_cache(maxsize=None)
+def chunker():
+  return Chunker.from_env()
@@ -0,0 +1,186 @@
+"""Streaming HTML-to-text for pages that can be many megabytes.
+
+``html_elements`` takes the page as an iterable of text pieces (say, an
+HTTP body read 64 KB at a time) and yields ``(category, text)`` elements
+as soon as each one closes, with ``partition_html``'s category names:
+
+    h1-h6 -> Title, p -> NarrativeText, li -> ListItem,
+    anything inside nav, or a header outside article/main/section -> Header,
+    a footer outside them -> Footer,
+    figcaption -> FigureCaption, address -> Address,
+    other text -> UncategorizedText
+
+script, style, svg and similar contents are skipped. List items and
+paragraphs left open end where HTML ends them: at the next item, the end
+of the list or the next block. So does a head without ``</head>``, at the
+first tag that can't be in a head, and an iframe left open, at the next
+block. Only the element being read and the
+elements open around it are held, and one element is cut every
+``max_chars`` characters, so memory does not depend on the size of the
+page.
+"""
+import codecs
+from html.parser import HTMLParser
+
+CATEGORIES = {
+    **{f"h{level}": "Title" for level in range(1, 7)},
+    "p": "NarrativeText",
+    "li": "ListItem",
+    "dt": "ListItem",
+    "dd": "ListItem",
+    "figcaption": "FigureCaption",
+    "address": "Address",
+}
+# Tags that end the text before them
+BLOCKS = frozenset(CATEGORIES) | frozenset({
+    "div", "section", "article", "main", "aside", "blockquote", "pre", "table", "tr",
+    "td", "th", "ul", "ol", "dl", "form", "header", "nav", "footer", "figure", "br",
+    "hr", "body", "title",
+})
+SKIP = frozenset({
+    "script", "style", "noscript", "svg", "template", "iframe", "canvas", "head",
+    "select",
+})
+# Tags a head may hold; any other tag starts the body, </head> or not
+HEAD = frozenset({
+    "base", "link", "meta", "title", "style", "script", "noscript", "template",
+})
+CONTEXTS = {"header": "Header", "nav": "Header", "footer": "Footer"}
+# A header or footer inside these belongs to the content, like an article's title
+SECTIONS = frozenset({"article", "main", "section"})
+LISTS = frozenset({"ul", "ol", "dl"})
+# Tags a new one of closes, when left open: <li>a<li>b
+SIBLINGS = {
+    "li": frozenset({"li"}),
+    "dt": frozenset({"dt", "dd"}),
+    "dd": frozenset({"dt", "dd"}),
+}
+# Blocks that can't sit inside a <p>, so they close an open one
+INLINE_BLOCKS = frozenset({
+    "br", "li", "dt", "dd", "td", "th", "tr", "figcaption", "title", "body",
+})
+# Open elements kept at most, whatever the markup forgets to close
+MAX_DEPTH = 256
+
+
+class _Extractor(HTMLParser):
+
+  def __init__(self, max_chars):
+    super().__init__(convert_charrefs=True)
+    self.max_chars = max_chars
+    self.elements = []
+    self._text = []
+    self._size = 0
+    self._open = []      # open lists and blocks that have a category, innermost last
+    self._skipping = []  # open skipped tags, innermost last
+    self._sections = 0
+    self._contexts = []  # category of each open header/nav/footer; None inside content
+
+  def _category(self):
+    chrome = next((context for context in reversed(self._contexts) if context), None)
+    if chrome:
+      return chrome
+    return next((CATEGORIES[tag] for tag in reversed(self._open) if tag in CATEGORIES),
+                "UncategorizedText")
+
+  def _flush(self):
+    text = " ".join("".join(self._text).split())
+    if text:
+      self.elements.append((self._category(), text))
+    self._text, self._size = [], 0
+
+  def _close(self, tags, stop=LISTS):
+    """Close the innermost open tag in ``tags`` and what is open inside it,
+    unless a ``stop`` tag is open inside it."""
+    for index in range(len(self._open) - 1, -1, -1):
+      if self._open[index] in tags:
+        del self._open[index:]
+        return
+      if self._open[index] in stop:
+        return
+
+  def _unskip(self, tag):
+    """End a head or an iframe that ``tag`` shows was left open, and what is
+    open inside it; an iframe holds only fallback text, never blocks."""
+    for index, skipped in enumerate(self._skipping):
+      if skipped == "head" and tag not in HEAD or skipped == "iframe" and tag in BLOCKS:
+        del self._skipping[index:]
+        return
+
+  def handle_starttag(self, tag, _attrs):
+    if self._skipping:
+      self._unskip(tag)
+    if tag in SKIP:
+      self._skipping.append(tag)
+      if len(self._skipping) > MAX_DEPTH:
+        del self._skipping[0]
+    elif tag in BLOCKS:
+      self._flush()
+      if tag in SIBLINGS:
+        self._close(SIBLINGS[tag])
+      if tag not in INLINE_BLOCKS and self._open and self._open[-1] == "p":
+        self._open.pop()
+      if tag in CATEGORIES or tag in LISTS:
+        self._open.append(tag)
+        if len(self._open) > MAX_DEPTH:
+          del self._open[0]
+      if tag in SECTIONS:
+        self._sections += 1
+      if tag in CONTEXTS:
+        chrome = tag == "nav" or not self._sections
+        self._contexts.append(CONTEXTS[tag] if chrome else None)
+
+  def handle_startendtag(self, tag, _attrs):
+    if self._skipping:
+      self._unskip(tag)
+    if tag in BLOCKS:
+      self._flush()
+
+  def handle_endtag(self, tag):
+    if tag in SKIP:
+      for index in range(len(self._skipping) - 1, -1, -1):
+        if self._skipping[index] == tag:
+          del self._skipping[index:]
+          break
+    elif tag in BLOCKS:
+      self._flush()
+      if tag in LISTS:
+        self._close({tag}, stop=())
+      elif tag in CATEGORIES:
+        self._close({tag})
+      if tag in SECTIONS:
+        self._sections = max(0, self._sections - 1)
+      if tag in CONTEXTS and self._contexts:
+        self._contexts.pop()
+
+  def handle_data(self, data):
+    if self._skipping:
+      return
+    self._text.append(data)
+    self._size += len(data)
+    if self._size >= self.max_chars:
+      self._flush()
+
+
+def html_elements(pieces, max_chars=16000):
+  """``(category, text)`` elements of an HTML document given in pieces."""
+  parser = _Extractor(max_chars)
+  for piece in pieces:
+    parser.feed(piece)
+    yield from parser.elements
+    parser.elements.clear()
+  parser.close()
+  parser._flush()
+  yield from parser.elements
+
+
+def decoded(blocks, encoding):
+  """Text of a stream of bytes, decoded across block boundaries."""
+  decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+  for block in blocks:
+    text = decoder.decode(block)
+    if text:
+      yield text
+  tail = decoder.decode(b"", final=True)
+  if tail:
+    yield tail
@@ -0,0 +1,40 @@
+"""One keep-alive HTTP connection pool shared by all trip planner tools.
+
+TRAVEL_HTTP_POOL_SIZE, TRAVEL_HTTP_TIMEOUT, TRAVEL_HTTP_CONNECT_TIMEOUT and
+TRAVEL_HTTP_RETRIES configure it, with the same defaults as the surprise
+travel crew.
+"""
+import os
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def timeout():
+  return (
+      float(os.environ.get("TRAVEL_HTTP_CONNECT_TIMEOUT", "5")),
+      float(os.environ.get("TRAVEL_HTTP_TIMEOUT", "15")),
+  )
+
+
+@lru_cache(maxsize=None)
+def session():
+  pool_size = int(os.environ.get("TRAVEL_HTTP_POOL_SIZE", "16"))
+  retries = Retry(
+      total=int(os.environ.get("TRAVEL_HTTP_RETRIES", "2")),
+      backoff_factor=0.5,
+      status_forcelist=RETRY_STATUSES,
+      allowed_methods=frozenset({"GET", "POST"}),
+      respect_retry_after_header=True,
+      raise_on_status=False,
+  )
+  adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                        max_retries=retries)
+  pooled = requests.Session()
+  pooled.mount("https://", adapter)
+  pooled.mount("http://", adapter)
+  return pooled
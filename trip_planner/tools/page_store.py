@@ -0,0 +1,144 @@
+"""Content-addressed store of scraped page text for BrowserTools.
+
+Same layout and settings as the surprise travel crew's page store
+(TRAVEL_PAGE_STORE_PATH, TRAVEL_PAGE_STORE_BYTES, TRAVEL_PAGE_FRESH_SECONDS):
+pages keyed by URL point at zlib-compressed text stored once per sha256,
+and the least recently read pages are evicted past the byte budget.
+Browserless returns rendered HTML without the origin's validators, so
+pages are only served from the store within the fresh window; there is
+no conditional revalidation here. ``stream`` reads and writes a page
+paragraph by paragraph, for pages too big to hold in memory.
+"""
+import codecs
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS page_text ("
+    " hash TEXT PRIMARY KEY, text BLOB NOT NULL, size INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS pages ("
+    " url TEXT PRIMARY KEY, hash TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+    " fetched REAL NOT NULL, accessed REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)",
+)
+
+
+class PageStore():
+
+  def __init__(self, path, max_bytes=256 * 1024 * 1024,
+               fresh_seconds: float = 6 * 3600):
+    self.max_bytes = max_bytes
+    self.fresh_seconds = fresh_seconds
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    for statement in _SCHEMA:
+      self._conn.execute(statement)
+
+  @classmethod
+  def from_env(cls):
+    return cls(os.environ.get("TRAVEL_PAGE_STORE_PATH", "page_store.db"),
+               int(os.environ.get("TRAVEL_PAGE_STORE_BYTES", str(256 * 1024 * 1024))),
+               float(os.environ.get("TRAVEL_PAGE_FRESH_SECONDS", str(6 * 3600))))
+
+  def _fresh(self, url, now):
+    """Compressed text of ``url`` when it is stored and fresh, else None."""
+    with self._lock:
+      row = self._conn.execute(
+          "SELECT p.fetched, t.text FROM pages p JOIN page_text t ON t.hash = p.hash"
+          " WHERE p.url = ?", (url,)).fetchone()
+      if row is not None and now - row[0] < self.fresh_seconds:
+        self._conn.execute("UPDATE pages SET accessed = ? WHERE url = ?", (now, url))
+        return row[1]
+    return None
+
+  def fetch(self, url, load):
+    """Text of ``url``, calling ``load()`` when it isn't stored or is stale."""
+    blob = self._fresh(url, time.time())
+    if blob is not None:
+      return zlib.decompress(blob).decode("utf-8")
+    text = load()
+    self.save(url, text)
+    return text
+
+  def stream(self, url, load, max_blob=4 * 1024 * 1024):
+    """Paragraphs of ``url``'s text, from ``load()`` when it isn't stored or is stale.
+
+    Neither path holds the whole text: stored pages are decompressed as
+    they are read, and loaded paragraphs are compressed into the store as
+    they pass. A page whose compressed text passes ``max_blob`` bytes is
+    not stored. Nothing is stored if the reader stops early.
+    """
+    blob = self._fresh(url, time.time())
+    if blob is not None:
+      yield from _paragraphs(blob)
+      return
+    digest, writer, parts, size = hashlib.sha256(), zlib.compressobj(6), [], 0
+    for number, paragraph in enumerate(load()):
+      data = ("\n\n" if number else "").encode("utf-8") + paragraph.encode("utf-8")
+      if parts is not None:
+        digest.update(data)
+        parts.append(writer.compress(data))
+        size += len(parts[-1])
+        if size > max_blob:
+          parts = None
+      yield paragraph
+    if parts is not None:
+      parts.append(writer.flush())
+      self._put(url, digest.hexdigest(), b"".join(parts))
+
+  def save(self, url, text):
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    self._put(url, digest, zlib.compress(text.encode("utf-8"), 6))
+
+  def _put(self, url, digest, blob):
+    now = time.time()
+    with self._lock:
+      self._conn.execute(
+          "INSERT OR IGNORE INTO page_text (hash, text, size) VALUES (?, ?, ?)",
+          (digest, blob, len(blob)))
+      self._conn.execute(
+          "INSERT OR REPLACE INTO pages (url, hash, fetched, accessed)"
+          " VALUES (?, ?, ?, ?)",
+          (url, digest, now, now))
+      self._evict()
+
+  def _evict(self):
+    total = self._orphans()
+    while total > self.max_bytes:
+      oldest = self._conn.execute(
+          "SELECT url FROM pages ORDER BY accessed LIMIT 1").fetchone()
+      if oldest is None:
+        return
+      self._conn.execute("DELETE FROM pages WHERE url = ?", oldest)
+      total = self._orphans()
+
+  def _orphans(self):
+    """Drop text no URL points at; returns the bytes of text left."""
+    self._conn.execute(
+        "DELETE FROM page_text WHERE hash NOT IN (SELECT hash FROM pages)")
+    return self._conn.execute(
+        "SELECT COALESCE(SUM(size), 0) FROM page_text").fetchone()[0]
+
+
+def _paragraphs(blob, block=64 * 1024):
+  """Paragraphs of stored text, decompressed a block at a time."""
+  reader = zlib.decompressobj()
+  decoder = codecs.getincrementaldecoder("utf-8")()
+  pending = ""
+  for start in range(0, len(blob), block):
+    pending += decoder.decode(reader.decompress(blob[start:start + block]))
+    *paragraphs, pending = pending.split("\n\n")
+    yield from paragraphs
+  pending += decoder.decode(reader.flush(), final=True)
+  yield from pending.split("\n\n")
+
+
+@lru_cache(maxsize=None)
+def page_store():
+  return PageStore.from_env()
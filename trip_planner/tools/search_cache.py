@@ -0,0 +1,129 @@
+"""On-disk cache of Serper search results for SearchTools.
+
+Same settings as the surprise travel crew: TRAVEL_SEARCH_CACHE_PATH
+(default search_cache.db), TRAVEL_SEARCH_CACHE_MODE (record, replay or
+off) and TRAVEL_SEARCH_TTL_NEWS / _EVENTS / _EVERGREEN in seconds.
+Entries are keyed like surprise_travel's ``search_key``, on the request
+sent to Serper: the query, the search type and ``RESULTS`` results, what
+the surprise travel search tool asks for by default. Both crews share
+one key space in the file, and hit each other's entries. Replay mode
+serves recorded results however old and fails on a miss, so the crew can
+run offline.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+RECORD = "record"
+REPLAY = "replay"
+OFF = "off"
+MODES = (RECORD, REPLAY, OFF)
+
+DEFAULT_TTLS = {"news": 3 * 3600, "events": 24 * 3600, "evergreen": 30 * 24 * 3600}
+# Results asked of Serper per query; part of every key
+RESULTS = 10
+
+_EVENT_WORDS = re.compile(
+    r"\b(today|tonight|tomorrow|this (?:week|weekend|month)|"
+    r"next (?:week|weekend|month)|events?|concerts?|festivals?|exhibitions?|shows?|"
+    r"tickets?|weather|open now|schedule|(?:19|20)\d\d)\b"
+)
+_SPACES = re.compile(r"\s+")
+_EDGES = " \t\n\"'`.,;:!?"
+
+
+class SearchNotRecorded(LookupError):
+  """Raised in replay mode for a query that was never recorded."""
+
+
+def normalize_query(query):
+  return _SPACES.sub(" ", str(query).casefold()).strip(_EDGES)
+
+
+def _key(normalized):
+  # surprise_travel.tools.search_cache.search_key(query, "search", num=RESULTS)
+  blob = json.dumps({"q": normalized, "type": "search", "num": RESULTS},
+                    sort_keys=True, separators=(",", ":"))
+  return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+def result_class(query):
+  return "events" if _EVENT_WORDS.search(normalize_query(query)) else "evergreen"
+
+
+class SearchCache():
+
+  def __init__(self, path, mode=RECORD, ttls=None):
+    if mode not in MODES:
+      raise ValueError(
+          f"Unknown search cache mode {mode!r}, expected one of {', '.join(MODES)}")
+    self.mode = mode
+    self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute(
+        "CREATE TABLE IF NOT EXISTS search_cache ("
+        " key TEXT PRIMARY KEY, query TEXT NOT NULL, class TEXT NOT NULL,"
+        " value TEXT NOT NULL, created REAL NOT NULL, expires REAL NOT NULL)")
+
+  @classmethod
+  def from_env(cls):
+    ttls = {
+        kind: float(os.environ[f"TRAVEL_SEARCH_TTL_{kind.upper()}"])
+        for kind in DEFAULT_TTLS if f"TRAVEL_SEARCH_TTL_{kind.upper()}" in os.environ
+    }
+    return cls(os.environ.get("TRAVEL_SEARCH_CACHE_PATH", "search_cache.db"),
+               os.environ.get("TRAVEL_SEARCH_CACHE_MODE", RECORD).lower(), ttls)
+
+  def fetch(self, query, search, store_if=None):
+    """Cached Serper response for ``query``, calling ``search()`` on a miss.
+    Results failing ``store_if`` (error bodies) are returned but not kept."""
+    if self.mode == OFF:
+      return search()
+    value = self.lookup(query)
+    if value is not None:
+      return value
+    value = search()
+    if store_if is None or store_if(value):
+      self.store(query, value)
+    return value
+
+  def lookup(self, query):
+    """Stored response for ``query`` if it is still fresh, else None.
+    Raises SearchNotRecorded on a miss in replay mode."""
+    if self.mode == OFF:
+      return None
+    normalized = normalize_query(query)
+    with self._lock:
+      row = self._conn.execute(
+          "SELECT value, expires FROM search_cache WHERE key = ?",
+          (_key(normalized),)).fetchone()
+    if row is not None and (self.mode == REPLAY or row[1] >= time.time()):
+      return json.loads(row[0])
+    if self.mode == REPLAY:
+      raise SearchNotRecorded(f"No recorded search result for {normalized!r}")
+    return None
+
+  def store(self, query, value):
+    if self.mode != RECORD:
+      return
+    normalized = normalize_query(query)
+    kind = result_class(query)
+    now = time.time()
+    with self._lock:
+      self._conn.execute(
+          "INSERT OR REPLACE INTO search_cache"
+          " (key, query, class, value, created, expires) VALUES (?, ?, ?, ?, ?, ?)",
+          (_key(normalized), normalized, kind, json.dumps(value), now,
+           now + self.ttls[kind]))
+
+
+@lru_cache(maxsize=None)
+def search_cache():
+  return SearchCache.from_env()
@@ -0,0 +1,175 @@
+"""Async Serper client for SearchTools: a batch of queries at once.
+
+Queries go out concurrently on one pooled ``httpx.AsyncClient``, driven
+by an event loop on a background thread, so the blocking crew tools can
+call ``search_many`` directly. A 429 or 5xx reply, a reply that isn't
+JSON, a timeout or a dropped connection is retried with jittered
+exponential backoff (or after the reply's Retry-After), and each query
+has a deadline it can't overrun.
+Replies are parsed once into ``SearchResult`` records.
+
+TRAVEL_SEARCH_CONCURRENCY  queries in flight at once (default 8)
+TRAVEL_SEARCH_DEADLINE     seconds a query may take, retries included (default 30)
+
+Timeouts and retries otherwise follow ``tools.http_session``:
+TRAVEL_HTTP_CONNECT_TIMEOUT, TRAVEL_HTTP_TIMEOUT and TRAVEL_HTTP_RETRIES.
+"""
+import asyncio
+import os
+import random
+import threading
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+import httpx
+
+from tools.http_session import RETRY_STATUSES, timeout
+from tools.search_cache import RESULTS
+
+MAX_RETRY_AFTER = 30.0
+
+
+class SearchError(Exception):
+  """A query that failed for good: a client error, or retries ran out."""
+
+
+class SearchResult(NamedTuple):
+  title: str
+  link: str
+  snippet: str
+
+
+class Answer(NamedTuple):
+  query: str
+  results: Tuple[SearchResult, ...]
+  error: Optional[str] = None
+
+
+def parse(query, body):
+  """The ``Answer`` in a Serper reply; results missing a field are skipped."""
+  if not isinstance(body, dict) or "organic" not in body:
+    message = body.get("message") if isinstance(body, dict) else None
+    return Answer(query, (), message or "no organic results")
+  results = tuple(
+      SearchResult(result["title"], result["link"], result["snippet"])
+      for result in body["organic"]
+      if isinstance(result, dict)
+      and all(isinstance(result.get(key), str) for key in SearchResult._fields))
+  return Answer(query, results)
+
+
+class SearchClient():
+
+  def __init__(self, base_url, api_key, concurrency=8, retries=2, backoff=0.5,
+               timeouts=(5.0, 15.0), deadline=30.0):
+    self.url = f"{base_url.rstrip('/')}/search"
+    self.api_key = api_key
+    self.concurrency = concurrency
+    self.retries = retries
+    self.backoff = backoff
+    self.timeouts = timeouts
+    self.deadline = deadline
+    connect, read = timeouts
+    # Neither binds to an event loop until first used, which is on self._loop
+    self._client = httpx.AsyncClient(
+        timeout=httpx.Timeout(read, connect=connect),
+        limits=httpx.Limits(max_connections=concurrency,
+                            max_keepalive_connections=concurrency),
+        headers={"X-API-KEY": api_key, "content-type": "application/json"})
+    self._slots = asyncio.Semaphore(concurrency)
+    self._loop = asyncio.new_event_loop()
+    threading.Thread(target=self._loop.run_forever, name="search", daemon=True).start()
+
+  @classmethod
+  def from_env(cls):
+    return cls(os.environ.get("SERPER_BASE_URL", "https://google.serper.dev"),
+               os.environ.get("SERPER_API_KEY", ""),
+               int(os.environ.get("TRAVEL_SEARCH_CONCURRENCY", "8")),
+               int(os.environ.get("TRAVEL_HTTP_RETRIES", "2")),
+               timeouts=timeout(),
+               deadline=float(os.environ.get("TRAVEL_SEARCH_DEADLINE", "30")))
+
+  def search_many(self, queries, cache=None):
+    """Answers to ``queries``, in order. Queries ``cache`` holds are not sent;
+    answers with results are stored in it."""
+    answers = {}
+    misses = []
+    for query in dict.fromkeys(queries):
+      body = cache.lookup(query) if cache is not None else None
+      if body is None:
+        misses.append(query)
+      else:
+        answers[query] = parse(query, body)
+    bodies = []
+    if misses:
+      bodies = asyncio.run_coroutine_threadsafe(
+          self._batch(misses), self._loop).result()
+    for query, body in zip(misses, bodies, strict=True):
+      if isinstance(body, SearchError):
+        answers[query] = Answer(query, (), str(body))
+        continue
+      answers[query] = parse(query, body)
+      if cache is not None and isinstance(body, dict) and "organic" in body:
+        cache.store(query, body)
+    return [answers[query] for query in queries]
+
+  def search(self, query, cache=None):
+    return self.search_many([query], cache)[0]
+
+  def close(self):
+    asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+    self._loop.call_soon_threadsafe(self._loop.stop)
+
+  async def _batch(self, queries):
+    return await asyncio.gather(*(self._deadline(query) for query in queries))
+
+  async def _deadline(self, query):
+    try:
+      return await asyncio.wait_for(self._post(query), self.deadline)
+    except asyncio.TimeoutError:
+      return SearchError(f"search for {query!r} took over {self.deadline:g}s")
+    except SearchError as error:
+      return error
+
+  async def _post(self, query):
+    problem = "no attempt made"
+    for attempt in range(self.retries + 1):
+      wait = None
+      try:
+        async with self._slots:
+          response = await self._client.post(
+              self.url, json={"q": query, "num": RESULTS})
+      except httpx.TransportError as error:
+        # timeouts, refused and dropped connections
+        problem = f"{type(error).__name__}: {error}"
+      else:
+        if response.status_code < 400:
+          try:
+            return response.json()
+          except ValueError:
+            # an error page from a proxy on the way
+            problem = "reply is not JSON"
+        elif response.status_code in RETRY_STATUSES:
+          problem = f"HTTP {response.status_code}"
+          wait = _retry_after(response)
+        else:
+          raise SearchError(f"search for {query!r} failed: "
+                            f"HTTP {response.status_code} {response.text[:200]}")
+      if attempt < self.retries:
+        if wait is None:
+          wait = random.uniform(0, self.backoff * 2 ** attempt)
+        await asyncio.sleep(wait)
+    raise SearchError(f"search for {query!r} failed after "
+                      f"{self.retries + 1} attempts: {problem}")
+
+
+def _retry_after(response):
+  try:
+    return min(float(response.headers["retry-after"]), MAX_RETRY_AFTER)
+  except (KeyError, ValueError):
+    return None
+
+
+@lru_cache(maxsize=None)
+def search_client():
+  return SearchClient.from_env()
@@ -1,37 +1,32 @@
-import json
-import os
+from crewai.tools import tool
 
-import requests
-from langchain.tools import tool
+from tools.search_cache import search_cache
+from tools.search_client import search_client
+
+TOP_RESULTS = 4
 
 
 class SearchTools():
 
   @tool("Search the internet")
-  def search_internet(query):
+  def search_internet(query: str):
     """Useful to search the internet
-    about a a given topic and return relevant results"""
-    top_result_to_return = 4
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({"q": query})
-    headers = {
-        'X-API-KEY': os.environ['SERPER_API_KEY'],
-        'content-type': 'application/json'
-    }
-    response = requests.request("POST", url, headers=headers, data=payload)
-    # check if there is an organic key
-    if 'organic' not in response.json():
-      return "Sorry, I couldn't find anything about that, there could be an error with you serper api key."
-    else:
-      results = response.json()['organic']
-      string = []
-      for result in results[:top_result_to_return]:
-        try:
-          string.append('\n'.join([
-              f"Title: {result['title']}", f"Link: {result['link']}",
-              f"Snippet: {result['snippet']}", "\n-----------------"
-          ]))
-        except KeyError:
-          next
+    about a a given topic and return relevant results.
+    Several related queries can be searched at once, one per line."""
+    queries = [line.strip() for line in query.splitlines() if line.strip()] or [query]
+    answers = search_client().search_many(queries, search_cache())
+    if len(answers) == 1:
+      return SearchTools.format(answers[0])
+    return '\n\n'.join(f"Results for: {answer.query}\n{SearchTools.format(answer)}"
+                       for answer in answers)
 
-      return '\n'.join(string)
+  @staticmethod
+  def format(answer):
+    if answer.error:
+      return f"Sorry, the search failed: {answer.error}"
+    if not answer.results:
+      return "Sorry, I couldn't find anything about that."
+    return '\n'.join('\n'.join([
+        f"Title: {result.title}", f"Link: {result.link}",
+        f"Snippet: {result.snippet}", "\n-----------------"
+    ]) for result in answer.results[:TOP_RESULTS])
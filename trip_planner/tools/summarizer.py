@@ -0,0 +1,141 @@
+"""Map-reduce summaries of scraped pages for BrowserTools.
+
+Every chunk of a page is summarized on one bounded thread pool shared by
+the process, so a page takes about as long as its slowest chunk instead
+of the sum of all of them. Chunks are read from the page only as the
+pool gets through them, at most two per worker ahead, so a page that
+downloads faster than it is summarized is not held in memory. Each pool
+thread builds its summarizer agent once and reuses it for every chunk it
+handles.
+
+When the chunk summaries together are longer than
+TRAVEL_SUMMARY_MAX_CHARS, they are merged into one of about that length.
+A merge prompt holds at most TRAVEL_SUMMARY_MERGE_CHARS of summaries, so
+a long page is merged in rounds: groups of summaries that fit, merged on
+the pool, then groups of those, until one is left or they fit together.
+
+TRAVEL_SUMMARY_WORKERS      chunks summarized at once (default 8)
+TRAVEL_SUMMARY_MAX_CHARS    longest summary returned without merging
+                            (default 4000; 0 never merges)
+TRAVEL_SUMMARY_MERGE_CHARS  summaries passed to one merge (default 32000)
+"""
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from crewai import Agent, Task
+from crewai.utilities.events.event_listener import event_listener
+
+_local = threading.local()
+
+
+def workers():
+  return int(os.environ.get("TRAVEL_SUMMARY_WORKERS", "8"))
+
+
+@lru_cache(maxsize=None)
+def summary_pool():
+  return ThreadPoolExecutor(max_workers=workers(), thread_name_prefix="summarize")
+
+
+def max_chars():
+  return int(os.environ.get("TRAVEL_SUMMARY_MAX_CHARS", "4000"))
+
+
+def merge_chars():
+  return int(os.environ.get("TRAVEL_SUMMARY_MERGE_CHARS", "32000"))
+
+
+def summarizer(llm=None):
+  """This thread's summarizer agent; agents keep per-run state, so threads
+  don't share one."""
+  agents = getattr(_local, "agents", None)
+  if agents is None:
+    agents = _local.agents = {}
+  key = id(llm)
+  if key not in agents:
+    agents[key] = Agent(
+        role='Principal Researcher',
+        goal=
+        'Do amazing researches and summaries based on the content you are working with',
+        backstory=
+        "You're a Principal Researcher at a big company and you need to do a research "
+        "about a given topic.",
+        allow_delegation=False,
+        **({'llm': llm} if llm is not None else {}))
+  return agents[key]
+
+
+def run(task, agent):
+  try:
+    return task.execute_sync(agent=agent).raw
+  finally:
+    # crewai's event listener keeps every task it has seen, chunk text and all
+    event_listener.execution_spans.pop(task, None)
+
+
+def summarize_chunk(chunk, llm=None):
+  agent = summarizer(llm)
+  task = Task(
+      agent=agent,
+      description=
+      'Analyze and summarize the content bellow, make sure to include the most '
+      'relevant information in the summary, return only the summary nothing else.'
+      f'\n\nCONTENT\n----------\n{chunk}',
+      expected_output='A summary of the most relevant information in the content.')
+  return run(task, agent)
+
+
+def merge(summaries, limit, llm=None):
+  agent = summarizer(llm)
+  joined = "\n\n".join(summaries)
+  task = Task(
+      agent=agent,
+      description=
+      'Merge the summaries bellow, all taken from the same web page, into one summary '
+      f'of at most {limit} characters. Keep the most relevant information, drop '
+      'repetition, return only the summary nothing else.'
+      f'\n\nSUMMARIES\n----------\n{joined}',
+      expected_output=f'One summary of at most {limit} characters.')
+  return run(task, agent)
+
+
+def summarize(chunks, llm=None):
+  """Summarize ``chunks`` concurrently, in order, merging them when they run long."""
+  window = 2 * workers()
+  pending, summaries = deque(), []
+  for chunk in chunks:
+    if len(pending) >= window:
+      summaries.append(pending.popleft().result())
+    pending.append(summary_pool().submit(summarize_chunk, chunk, llm))
+  summaries.extend(future.result() for future in pending)
+  return merge_all(summaries, max_chars(), llm)
+
+
+def groups(summaries, budget):
+  """Consecutive ``summaries`` in groups whose joined length fits ``budget``.
+  Each summary is cut to half the budget, so every group but a last one
+  left over holds at least two and a round of merges always shortens the
+  list."""
+  group, size = [], 0
+  for summary in summaries:
+    summary = summary[:budget // 2 - 2]
+    if len(group) >= 2 and size + 2 + len(summary) > budget:
+      yield group
+      group, size = [], 0
+    size += len(summary) + (2 if group else 0)
+    group.append(summary)
+  if group:
+    yield group
+
+
+def merge_all(summaries, limit, llm=None):
+  """Merge ``summaries`` in rounds until they fit ``limit`` together."""
+  budget = max(merge_chars(), 2 * limit)
+  while limit and len(summaries) > 1 and len("\n\n".join(summaries)) > limit:
+    summaries = list(summary_pool().map(
+        lambda group: merge(group, limit, llm) if len(group) > 1 else group[0],
+        groups(summaries, budget)))
+  return "\n\n".join(summaries)
@@ -43,5 +43,6 @@ class TripAgents():
             SearchTools.search_internet,
             BrowserTools.scrape_and_summarize_website,
             CalculatorTools.calculate,
+            CalculatorTools.calculate_budget,
         ],
         verbose=True)
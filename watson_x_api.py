@@ -1,22 +1,108 @@
 from dotenv import load_dotenv
 import os
 import asyncio
+import logging
 from datetime import datetime
 
 load_dotenv()
 
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
-from typing import Dict, Any, List, Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from typing import Dict, Any, List, Optional, Union
 from pydantic import BaseModel
 import json
 import uuid
 
+from travel_api.cache import ResponseCache, cache_key
+from travel_api.crew_runner import EventCallback, prewarm, store_stats
+from travel_api.encoding import completion_json, prompt_tokens
+from travel_api.executor import CrewExecutor, ExecutorBusy, JobTimeout
+from travel_api.extraction import default_extractor
+from travel_api.jobs import FINISHED, QUEUED, JobStore
+from travel_api.metrics import REGISTRY, RequestTimer, observe_request_parsing, stage_seconds
+from travel_api.singleflight import SingleFlight
+from travel_api.streaming import (DONE, ChunkEncoder, activity_line, coalesce, day_heading, describe_event,
+                                  split_text)
+
+# Gazetteer is loaded once per process, not per request
+travel_extractor = default_extractor()
+
+# Crew kickoffs block for minutes, so they run on a bounded worker pool
+crew_executor = CrewExecutor.from_env()
+
+# Finished responses keyed on the normalized trip details
+response_cache = ResponseCache.from_env()
+
+# Concurrent requests for the same trip share one crew run
+trip_flights = SingleFlight()
+
+# Asynchronous trip jobs, shared by every worker that opens the same file
+job_store = JobStore.from_env()
+job_tasks = set()
+# Jobs wait here, queued, for a crew worker instead of overflowing the pool
+job_slots = asyncio.Semaphore(crew_executor.workers)
+JOB_BUSY_RETRY_SECONDS = 5.0
+JOB_EVENT_POLL_SECONDS = 0.5
+# Background jobs get this long to finish when a worker stops
+JOB_DRAIN_SECONDS = float(os.environ.get("TRAVEL_GRACEFUL_TIMEOUT", "30"))
+
+# TRAVEL_PREWARM=1 loads crewai in the background once the server is up,
+# instead of on the first trip request
+PREWARM = os.environ.get("TRAVEL_PREWARM", "").lower() in ("1", "true", "yes")
+PREWARM_DELAY_SECONDS = 1.0
+
+# Pre-resolved histograms for the hot path
+PARSE_SECONDS = stage_seconds.labels("request_parsing")
+EXTRACT_SECONDS = stage_seconds.labels("extract_travel_details")
+CREW_SECONDS = stage_seconds.labels("crew_run")
+SERIALIZE_SECONDS = stage_seconds.labels("response_serialization")
+
+REGISTRY.gauge("travel_crew_queue_depth", "Trips waiting for a crew worker.", lambda: crew_executor.queued)
+REGISTRY.gauge("travel_crew_in_flight", "Trips running on a crew worker.", lambda: crew_executor.in_flight)
+REGISTRY.gauge("travel_single_flight_in_flight", "Distinct trips being planned.", lambda: trip_flights.in_flight)
+REGISTRY.counter("travel_single_flight_coalesced_total", "Requests that joined a trip already being planned.",
+                 lambda: trip_flights.coalesced)
+REGISTRY.counter("travel_cache_hits_total", "Response cache hits.", lambda: response_cache.hits)
+REGISTRY.counter("travel_cache_misses_total", "Response cache misses.", lambda: response_cache.misses)
+REGISTRY.gauge("travel_cache_hit_ratio", "Response cache hit ratio since start.", lambda: response_cache.hit_ratio)
+REGISTRY.counter("travel_itinerary_reused_total", "Trips answered with a stored itinerary.",
+                 lambda: store_stats()["reused"])
+REGISTRY.counter("travel_itinerary_seeded_total", "Trips compiled from a similar stored itinerary.",
+                 lambda: store_stats()["seeded"])
+REGISTRY.counter("travel_itinerary_missed_total", "Trips with no similar stored itinerary.",
+                 lambda: store_stats()["missed"])
+REGISTRY.counter("travel_itinerary_seconds_saved_total", "Crew seconds saved by stored itineraries.",
+                 lambda: store_stats()["seconds_saved"])
+
+async def prewarm_crew():
+    # Startup finishes (and the socket starts listening) before this runs
+    await asyncio.sleep(PREWARM_DELAY_SECONDS)
+    try:
+        await asyncio.to_thread(prewarm)
+    except Exception:
+        logging.getLogger(__name__).exception("Crew prewarm failed")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(job_store.recover_orphans)
+    warming = asyncio.create_task(prewarm_crew()) if PREWARM else None
+    yield
+    if warming is not None:
+        warming.cancel()
+    if job_tasks:
+        await asyncio.wait(list(job_tasks), timeout=JOB_DRAIN_SECONDS)
+    for task in list(job_tasks):
+        task.cancel()
+    crew_executor.shutdown()
+
 app = FastAPI(
     title="AI Travel Planning Team for watsonx Orchestrate",
     description="OpenAI-compatible external agent for surprise travel planning",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+app.add_middleware(RequestTimer)
 
 # OpenAI-compatible request/response models
 class ChatMessage(BaseModel):
@@ -27,6 +113,7 @@ class ChatCompletionRequest(BaseModel):
     messages: List[ChatMessage]
     model: Optional[str] = "travel-agent"
     stream: Optional[bool] = False
+    stream_options: Optional[Dict[str, Any]] = None
     temperature: Optional[float] = 0.7
     max_tokens: Optional[int] = 1000
 
@@ -35,12 +122,19 @@ class ChatCompletionChoice(BaseModel):
     message: ChatMessage
     finish_reason: str
 
+class Usage(BaseModel):
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+# Documents the response shape; bodies are encoded by travel_api.encoding
 class ChatCompletionResponse(BaseModel):
     id: str
     object: str = "chat.completion"
     created: int
     model: str
     choices: List[ChatCompletionChoice]
+    usage: Optional[Usage] = None
 
 class StreamingChunk(BaseModel):
     id: str
@@ -49,68 +143,44 @@ class StreamingChunk(BaseModel):
     model: str
     choices: List[Dict[str, Any]]
 
+def legacy_details(request: Dict[str, Any]) -> Dict[str, str]:
+    """Build the details dict from a direct /plan-surprise-trip style body"""
+    return {
+        'origin': request.get('origin', 'Boston'),
+        'destination': request.get('destination', 'Unknown'),
+        'age': str(request.get('age', '25')),
+        'interests': request.get('interests', 'general travel'),
+        'budget': request.get('budget', '$2000'),
+        'duration': request.get('trip_duration') or request.get('duration', '3 days'),
+        'hotel_preference': request.get('hotel_preference', 'standard')
+    }
+
 def extract_travel_details(messages: List[ChatMessage]) -> Dict[str, str]:
     """Extract travel details from the conversation messages"""
-    user_content = ""
-    for msg in messages:
-        if msg.role == "user":
-            user_content += " " + msg.content
-    
-    # Simple keyword extraction - you could enhance this with NLP
-    details = {
-        'origin': 'Boston',  # default
-        'destination': 'Unknown',
-        'age': '25',
-        'interests': 'general travel',
-        'budget': '$2000',
-        'duration': '3 days',
-        'hotel_preference': 'standard'
-    }
-    
-    content_lower = user_content.lower()
-    
-    # Extract destination
-    if 'tokyo' in content_lower:
-        details['destination'] = 'Tokyo'
-    elif 'paris' in content_lower:
-        details['destination'] = 'Paris'
-    elif 'london' in content_lower:
-        details['destination'] = 'London'
-    elif 'new york' in content_lower:
-        details['destination'] = 'New York'
-    
-    # Extract origin
-    if 'from boston' in content_lower:
-        details['origin'] = 'Boston'
-    elif 'from new york' in content_lower:
-        details['origin'] = 'New York'
-    
-    # Extract budget
-    import re
-    budget_match = re.search(r'\$(\d+,?\d*)', content_lower)
-    if budget_match:
-        details['budget'] = f"${budget_match.group(1)}"
-    
-    # Extract duration
-    duration_patterns = [
-        r'(\d+)\s*days?',
-        r'(\d+)\s*weeks?',
-        r'(\d+)\s*day\s*trip'
-    ]
-    for pattern in duration_patterns:
-        match = re.search(pattern, content_lower)
-        if match:
-            num = match.group(1)
-            if 'week' in pattern:
-                details['duration'] = f"{num} weeks"
-            else:
-                details['duration'] = f"{num} days"
-            break
-    
-    return details
+    with EXTRACT_SECONDS.time():
+        return travel_extractor.extract(msg.content for msg in messages if msg.role == "user")
 
-def generate_travel_response(details: Dict[str, str]) -> str:
+def format_itinerary(itinerary: Union[Dict[str, Any], str]) -> str:
+    """Render the crew's Itinerary as markdown"""
+    if not isinstance(itinerary, dict):
+        return str(itinerary)
+
+    lines = [f"**🗺️ {itinerary.get('name', 'Your Surprise Itinerary')}**"]
+    if itinerary.get('hotel'):
+        lines.append(f"🏨 {itinerary['hotel']}")
+    for i, day in enumerate(itinerary.get('day_plans', []), 1):
+        lines.append("")
+        lines.append(day_heading(i, day.get('date', '')))
+        if day.get('flight'):
+            lines.append(f"✈️ {day['flight']}")
+        lines.extend(activity_line(activity) for activity in day.get('activities', []))
+        if day.get('restaurants'):
+            lines.append(f"🍽️ {', '.join(day['restaurants'])}")
+    return "\n".join(lines)
+
+def generate_travel_response(details: Dict[str, str], itinerary: Union[Dict[str, Any], str, None] = None) -> str:
     """Generate the travel planning response"""
+    plan = f"\n\n{format_itinerary(itinerary)}\n" if itinerary else ""
     return f"""🎪 **AI Travel Team Results**
 
 Your {details['duration']} adventure from {details['origin']} to {details['destination']} is ready!
@@ -125,144 +195,219 @@ Your {details['duration']} adventure from {details['origin']} to {details['desti
 • Duration: {details['duration']}
 • Budget: {details['budget']}
 • Interests: {details['interests']}
-• Hotel Preference: {details['hotel_preference']}
+• Hotel Preference: {details['hotel_preference']}{plan}
 
 **🚀 Next Steps:**
 Your personalized itinerary includes handpicked activities, restaurant reservations, and optimal travel times. The team has coordinated everything for your perfect trip!
 
 Ready for your adventure? 🌟"""
 
-async def generate_streaming_response(response_text: str, request_id: str, model: str):
-    """Generate streaming response chunks compatible with OpenAI format"""
-    
-    # Split response into words for streaming effect
-    words = response_text.split()
-    
-    for i, word in enumerate(words):
-        chunk_data = {
-            "id": request_id,
-            "object": "chat.completion.chunk",
-            "created": int(datetime.now().timestamp()),
-            "model": model,
-            "choices": [{
-                "index": 0,
-                "delta": {
-                    "content": word + " " if i < len(words) - 1 else word
-                },
-                "finish_reason": None
-            }]
-        }
-        
-        # Format as Server-Sent Events
-        yield f"data: {json.dumps(chunk_data)}\n\n"
-        await asyncio.sleep(0.05)  # Small delay for streaming effect
-    
-    # Final chunk to signal completion
-    final_chunk = {
-        "id": request_id,
-        "object": "chat.completion.chunk", 
-        "created": int(datetime.now().timestamp()),
-        "model": model,
-        "choices": [{
-            "index": 0,
-            "delta": {},
-            "finish_reason": "stop"
-        }]
-    }
-    
-    yield f"data: {json.dumps(final_chunk)}\n\n"
-    yield "data: [DONE]\n\n"
+async def plan_trip(details: Dict[str, str], on_event: Optional[EventCallback] = None) -> Dict[str, Any]:
+    """Run the crew on the worker pool; returns the itinerary and response text"""
+    cached = await response_cache.aget(details)
+    if cached is not None:
+        return cached
+
+    async def compute(publish: EventCallback) -> Dict[str, Any]:
+        try:
+            with CREW_SECONDS.time():
+                itinerary = await crew_executor.run(details, on_event=publish)
+        except ExecutorBusy as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+        except JobTimeout as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        plan = {"itinerary": itinerary, "response": generate_travel_response(details, itinerary)}
+        await response_cache.aset(details, plan)
+        return plan
 
-@app.post("/chat/completions")
+    # Identical trips already being planned are joined, not started again
+    return await trip_flights.run(cache_key(details), compute, on_event)
+
+async def generate_streaming_response(details: Dict[str, str], request_id: str, model: str,
+                                      prompt: Optional[int] = None):
+    """Stream crew progress, then the final answer, as OpenAI-format SSE chunks.
+    A usage chunk is sent before [DONE] when ``prompt`` tokens are given."""
+    encoder = ChunkEncoder(request_id, model, int(datetime.now().timestamp()))
+    yield encoder.role()
+
+    loop = asyncio.get_running_loop()
+    progress: asyncio.Queue = asyncio.Queue()
+    streamed_days = []
+
+    def on_event(event: Dict[str, Any]):
+        # Called from the crew worker thread
+        if event["type"] == "day":
+            streamed_days.append(event["day"])
+        loop.call_soon_threadsafe(progress.put_nowait, describe_event(event))
+
+    job = asyncio.ensure_future(plan_trip(details, on_event))
+    job.add_done_callback(lambda _: progress.put_nowait(None))
+    try:
+        async for text in coalesce(progress):
+            with SERIALIZE_SECONDS.time():
+                chunk = encoder.content(text)
+            yield chunk
+        plan = await job
+        # Days already streamed are not repeated in the final answer
+        response_text = generate_travel_response(details) if streamed_days else plan["response"]
+    except HTTPException as e:
+        response_text = f"❌ Error processing travel request: {e.detail}"
+    except Exception as e:
+        response_text = f"❌ Error processing travel request: {str(e)}"
+    finally:
+        job.cancel()
+
+    for piece in split_text(response_text):
+        with SERIALIZE_SECONDS.time():
+            chunk = encoder.content(piece)
+        yield chunk
+    yield encoder.stop()
+    if prompt is not None:
+        yield encoder.usage(prompt)
+    yield DONE
+
+@app.post("/chat/completions", responses={200: {"model": ChatCompletionResponse}})
 async def chat_completions(request: ChatCompletionRequest):
     """
     OpenAI-compatible chat completions endpoint for watsonx Orchestrate
     """
+    observe_request_parsing(PARSE_SECONDS)
     try:
         # Extract travel details from messages
         details = extract_travel_details(request.messages)
         
-        # Generate response
-        response_text = generate_travel_response(details)
-        
         request_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
-        created_time = int(datetime.now().timestamp())
+        prompt = prompt_tokens(msg.content for msg in request.messages)
         
         if request.stream:
-            # Return streaming response
+            # Stream progress while the crew works
+            include_usage = bool((request.stream_options or {}).get("include_usage"))
             return StreamingResponse(
-                generate_streaming_response(response_text, request_id, request.model or "travel-agent"),
-                media_type="text/plain",
+                generate_streaming_response(details, request_id, request.model or "travel-agent",
+                                            prompt if include_usage else None),
+                media_type="text/event-stream",
                 headers={
                     "Cache-Control": "no-cache",
                     "Connection": "keep-alive",
-                    "Content-Type": "text/plain; charset=utf-8"
+                    "X-Accel-Buffering": "no"
                 }
             )
         else:
+            # Run the crew without blocking the event loop
+            response_text = (await plan_trip(details))["response"]
+            created_time = int(datetime.now().timestamp())
+            
             # Return complete response
-            response = ChatCompletionResponse(
-                id=request_id,
-                created=created_time,
-                model=request.model or "travel-agent",
-                choices=[
-                    ChatCompletionChoice(
-                        index=0,
-                        message=ChatMessage(role="assistant", content=response_text),
-                        finish_reason="stop"
-                    )
-                ]
-            )
-            return response
+            with SERIALIZE_SECONDS.time():
+                body = completion_json(request_id, created_time, request.model or "travel-agent",
+                                       response_text, prompt)
+            return Response(content=body, media_type="application/json")
             
+    except HTTPException:
+        raise
     except Exception as e:
         # Return error in OpenAI format
-        error_response = ChatCompletionResponse(
-            id=f"chatcmpl-error-{uuid.uuid4().hex[:8]}",
-            created=int(datetime.now().timestamp()),
-            model=request.model or "travel-agent",
-            choices=[
-                ChatCompletionChoice(
-                    index=0,
-                    message=ChatMessage(role="assistant", content=f"❌ Error processing travel request: {str(e)}"),
-                    finish_reason="stop"
-                )
-            ]
+        body = completion_json(
+            f"chatcmpl-error-{uuid.uuid4().hex[:8]}",
+            int(datetime.now().timestamp()),
+            request.model or "travel-agent",
+            f"❌ Error processing travel request: {str(e)}",
+            0
         )
-        return error_response
+        return Response(content=body, media_type="application/json")
 
 # Keep original endpoint for direct testing
 @app.post("/plan-surprise-trip")
 async def plan_surprise_trip(request: Dict[str, Any]):
     """Legacy endpoint for direct testing"""
+    observe_request_parsing(PARSE_SECONDS)
     try:
-        # Extract fields
-        origin = request.get('origin', 'Boston')
-        destination = request.get('destination', 'Unknown')
-        age = str(request.get('age', '25'))
-        interests = request.get('interests', 'general travel')
-        budget = request.get('budget', '$2000')
-        duration = request.get('trip_duration') or request.get('duration', '3 days')
-        hotel_pref = request.get('hotel_preference', 'standard')
-        
-        details = {
-            'origin': origin,
-            'destination': destination,
-            'age': age,
-            'interests': interests,
-            'budget': budget,
-            'duration': duration,
-            'hotel_preference': hotel_pref
-        }
-        
-        return generate_travel_response(details)
+        details = legacy_details(request)
+        return (await plan_trip(details))["response"]
         
+    except HTTPException:
+        raise
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
+async def run_trip_job(job_id: str, details: Dict[str, str]):
+    """Plan a trip in the background, recording progress in the job store.
+    The job stays queued until a crew worker is free for it."""
+    async with job_slots:
+        # sqlite calls block, so they run off the event loop
+        await asyncio.to_thread(job_store.mark_running, job_id)
+        while True:
+            try:
+                plan = await plan_trip(details, on_event=lambda event: job_store.add_event(job_id, event))
+            except HTTPException as e:
+                if e.status_code == 503:
+                    # Chat requests filled the crew pool; wait for room rather than fail
+                    await asyncio.sleep(JOB_BUSY_RETRY_SECONDS)
+                    continue
+                await asyncio.to_thread(job_store.fail, job_id, str(e.detail))
+            except Exception as e:
+                await asyncio.to_thread(job_store.fail, job_id, str(e))
+            else:
+                await asyncio.to_thread(job_store.succeed, job_id, plan["itinerary"], plan["response"])
+            return
+
+@app.post("/trip-jobs", status_code=202)
+async def create_trip_job(request: Dict[str, Any]):
+    """Start planning a trip and return its job id right away"""
+    observe_request_parsing(PARSE_SECONDS)
+    details = legacy_details(request)
+    job_id = await asyncio.to_thread(job_store.create, details)
+    task = asyncio.create_task(run_trip_job(job_id, details))
+    job_tasks.add(task)
+    task.add_done_callback(job_tasks.discard)
+    return {
+        "id": job_id,
+        "status": QUEUED,
+        "links": {"self": f"/trip-jobs/{job_id}", "events": f"/trip-jobs/{job_id}/events"}
+    }
+
+@app.get("/trip-jobs/{job_id}")
+async def get_trip_job(job_id: str):
+    """Job status, finished task outputs and, when done, the Itinerary"""
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown trip job {job_id}")
+    return job
+
+async def stream_job_events(job_id: str, after: int):
+    """Poll the job store so any worker can serve a job's progress"""
+    while True:
+        status = await asyncio.to_thread(job_store.status, job_id)
+        for event in await asyncio.to_thread(job_store.events_since, job_id, after):
+            after = event["seq"]
+            yield f"id: {after}\nevent: progress\ndata: {json.dumps(event)}\n\n"
+        if status in FINISHED:
+            yield f"event: done\ndata: {json.dumps({'id': job_id, 'status': status})}\n\n"
+            return
+        await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+
+@app.get("/trip-jobs/{job_id}/events")
+async def trip_job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """Server-sent per-task progress events for a trip job"""
+    if await asyncio.to_thread(job_store.status, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown trip job {job_id}")
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        stream_job_events(job_id, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "agents_ready": True, "endpoints": ["/chat/completions", "/plan-surprise-trip"]}
+    return {"status": "healthy", "agents_ready": True, "worker": job_store.worker,
+            "endpoints": ["/chat/completions", "/plan-surprise-trip", "/trip-jobs"],
+            "cache": response_cache.stats(), "single_flight": trip_flights.stats()}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of stage latencies, pool and cache state"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def root():
@@ -273,7 +418,9 @@ async def root():
         "endpoints": {
             "chat_completions": "/chat/completions",
             "legacy": "/plan-surprise-trip",
+            "trip_jobs": "/trip-jobs",
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -1,3 +1,5 @@
+import os
+
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai_tools import SerperDevTool
@@ -16,7 +18,9 @@ class WriteBookChapterCrew:
 
     @agent
     def researcher(self) -> Agent:
-        search_tool = SerperDevTool()
+        search_tool = SerperDevTool(
+            base_url=os.environ.get("SERPER_BASE_URL", "https://google.serper.dev")
+        )
         return Agent(
             config=self.agents_config["researcher"],
             tools=[search_tool],
@@ -5,12 +5,10 @@ from typing import List
 from crewai.flow.flow import Flow, listen, start
 from pydantic import BaseModel
 
-from write_a_book_with_flows.crews.write_book_chapter_crew.write_book_chapter_crew import (
-    WriteBookChapterCrew,
-)
 from write_a_book_with_flows.types import Chapter, ChapterOutline
 
-from write_a_book_with_flows.crews.outline_book_crew.outline_crew import OutlineCrew
+# The crews pull in crewai_tools and langchain_openai, which take seconds to
+# import. plot() never needs them, so each step imports its crew when it runs.
 
 
 class BookState(BaseModel):
@@ -34,6 +32,8 @@ class BookFlow(Flow[BookState]):
 
     @start()
     def generate_book_outline(self):
+        from write_a_book_with_flows.crews.outline_book_crew.outline_crew import OutlineCrew
+
         print("Kickoff the Book Outline Crew")
         output = (
             OutlineCrew()
@@ -49,6 +49,10 @@ class BookFlow(Flow[BookState]):
 
     @listen(generate_book_outline)
     async def write_chapters(self):
+        from write_a_book_with_flows.crews.write_book_chapter_crew.write_book_chapter_crew import (
+            WriteBookChapterCrew,
+        )
+
         print("Writing Book Chapters")
         tasks = []
 